@@ -0,0 +1,298 @@
+"""
+Vault agent: unlocks a vault once and answers lookups over a local Unix
+socket, so tools don't each pay for key derivation and decryption
+(like ssh-agent for keys).
+
+    python agent.py [--vault vault.enc] [--socket PATH] [--timeout 300]
+
+The protocol is line-delimited JSON, as for cli.py batch: one request
+per line, one response per line, any number per connection.
+
+    {"op": "get", "ref": "Gmail"}
+    {"op": "search", "query": "mail", "limit": 10}
+    {"op": "list"}
+    {"op": "lock"}
+
+By default the socket lives in a directory only the user can enter
+(see default_socket_path), like ssh-agent's, and clients refuse a socket
+owned by another user.
+
+The agent is read-only. Every request counts as activity for
+core's auto-lock; once the vault has been idle for the timeout (or gets
+a lock request) the key is wiped and the agent exits.
+"""
+
+import argparse
+import json
+import os
+import socket
+import socketserver
+import stat
+import sys
+import tempfile
+import threading
+
+import core
+from cli import CliError, read_password, run_op, DEFAULT_PASSWORD_ENV
+from vault import Vault
+
+
+# Operations served; everything else is refused
+READ_OPS = ("get", "search", "list")
+
+DEFAULT_TIMEOUT = 300  # seconds, as in the GUI
+
+SOCKET_NAME = "agent.sock"
+
+
+def default_socket_path() -> str:
+    """
+    The socket inside a directory only the user may enter (see
+    make_socket_dir): password-vault under $XDG_RUNTIME_DIR, else
+    password-vault-<uid> in the temp directory.
+    """
+
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+
+    if runtime_dir:
+        directory = os.path.join(runtime_dir, "password-vault")
+    else:
+        directory = os.path.join(tempfile.gettempdir(), f"password-vault-{os.getuid()}")
+
+    return os.path.join(directory, SOCKET_NAME)
+
+
+def make_socket_dir(directory: str):
+    """
+    Create directory with mode 0700, or check an existing one. Its name
+    is predictable, so another user may have created it first.
+    """
+
+    try:
+        os.mkdir(directory, 0o700)
+    except FileExistsError:
+        pass
+
+    check_socket_dir(directory)
+
+
+def check_socket_dir(directory: str):
+    """
+    Raise PermissionError unless directory is a real directory (not a
+    symlink) owned by the user and closed to everyone else.
+    """
+
+    st = os.lstat(directory)
+
+    if not stat.S_ISDIR(st.st_mode) or st.st_uid != os.getuid():
+        raise PermissionError(f"{directory} is not a directory owned by you.")
+    if st.st_mode & 0o077:
+        raise PermissionError(f"{directory} is open to other users (chmod 700 it).")
+
+
+def check_socket(socket_path: str):
+    """
+    Raise PermissionError unless socket_path is a socket owned by the
+    user, i.e. served by one of the user's own agents.
+    """
+
+    st = os.lstat(socket_path)
+
+    if not stat.S_ISSOCK(st.st_mode) or st.st_uid != os.getuid():
+        raise PermissionError(f"{socket_path} is not a socket owned by you.")
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        agent = self.server.agent
+
+        for line in self.rfile:
+            if not line.strip():
+                continue
+
+            response = agent.handle_line(line)
+            self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+            self.wfile.flush()
+
+
+class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True  # don't wait for idle clients on shutdown
+
+
+class VaultAgent:
+    """
+    Serves an unlocked vault on a Unix socket, one thread per connection.
+
+    Lookups take microseconds, so they run one at a time under a lock:
+    the vault and its search index are not thread-safe, and connection
+    threads only overlap on socket I/O.
+    """
+
+    def __init__(self, vault: Vault, socket_path: str, timeout: int = DEFAULT_TIMEOUT):
+        self.vault = vault
+        self.socket_path = socket_path
+        self.timeout = timeout
+
+        self._lock = threading.Lock()  # the vault
+        self._server = None
+
+    def serve(self):
+        """
+        Serve until locked (idle timeout or a lock request).
+        """
+
+        self._remove_stale_socket()
+
+        # Build the search index now rather than inside the first request
+        self.vault.build_search_index()
+
+        # Only the owner may connect
+        old_umask = os.umask(0o077)
+        try:
+            self._server = _Server(self.socket_path, _Handler)
+        finally:
+            os.umask(old_umask)
+
+        self._server.agent = self
+
+        core.register_auto_lock_callback(self.lock)
+        core.set_auto_lock_timeout(self.timeout)
+        core.start_auto_lock_timer()
+
+        try:
+            self._server.serve_forever()
+        finally:
+            core.stop_auto_lock_timer()
+            self._server.server_close()
+
+            with self._lock:
+                self.vault.lock()
+
+            try:
+                os.unlink(self.socket_path)
+            except FileNotFoundError:
+                pass
+
+    def lock(self):
+        """
+        Wipe the key and stop serving. Called from another thread (the
+        auto-lock scheduler or a connection).
+        """
+
+        with self._lock:
+            self.vault.lock()
+
+        # shutdown() waits for serve_forever, so never block the caller on it
+        threading.Thread(target=self._server.shutdown, daemon=True).start()
+
+    def handle_line(self, line: bytes) -> dict:
+        core.touch_activity()
+
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise CliError("A request must be a JSON object.")
+
+            op = request.get("op")
+
+            if op == "lock":
+                self.lock()
+                return {"ok": True}
+
+            if op not in READ_OPS:
+                raise CliError(f"Unsupported op {op!r}.")
+
+            with self._lock:
+                if not self.vault.is_unlocked:
+                    raise CliError("The vault is locked.")
+
+                return {"ok": True, **run_op(self.vault, request)}
+        except (CliError, ValueError) as e:
+            return {"ok": False, "error": str(e)}
+
+    def _remove_stale_socket(self):
+        """
+        Clear a socket left by an agent that died; refuse if one is live.
+        """
+
+        if not os.path.exists(self.socket_path):
+            return
+
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(self.socket_path)
+        except OSError:
+            os.unlink(self.socket_path)
+        else:
+            raise OSError(f"An agent is already listening on {self.socket_path}.")
+        finally:
+            probe.close()
+
+
+# ====================================
+# Client
+# ====================================
+
+class AgentClient:
+    """
+    One connection to an agent; requests on it are answered in order.
+    """
+
+    def __init__(self, socket_path: str = None):
+        if socket_path is None:
+            socket_path = default_socket_path()
+            check_socket_dir(os.path.dirname(socket_path))
+
+        # Never send a request (or trust an answer) to someone else's agent
+        check_socket(socket_path)
+
+        self.socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.socket.connect(socket_path)
+        self._reader = self.socket.makefile("rb")
+
+    def request(self, op: str, **fields) -> dict:
+        self.socket.sendall(json.dumps({"op": op, **fields}).encode("utf-8") + b"\n")
+        return json.loads(self._reader.readline())
+
+    def close(self):
+        self._reader.close()
+        self.socket.close()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Keep a vault unlocked and serve lookups on a Unix socket.")
+    parser.add_argument("--vault", default="vault.enc", help="vault file (default: vault.enc)")
+    parser.add_argument("--socket", default=None, help=f"socket path (default: {default_socket_path()})")
+    parser.add_argument("--timeout", type=int, default=DEFAULT_TIMEOUT, help="idle seconds before locking")
+    parser.add_argument("--password-env", default=DEFAULT_PASSWORD_ENV, metavar="NAME",
+                        help=f"environment variable holding the master password (default: {DEFAULT_PASSWORD_ENV})")
+    args = parser.parse_args(argv)
+
+    socket_path = args.socket or default_socket_path()
+
+    # Everything stays in memory for the agent's lifetime
+    vault = Vault(args.vault)
+
+    if not os.path.exists(args.vault):
+        parser.exit(1, f"error: no vault at {args.vault}\n")
+
+    try:
+        if args.socket is None:
+            make_socket_dir(os.path.dirname(socket_path))
+
+        vault.load(read_password(args.password_env))
+        agent = VaultAgent(vault, socket_path, args.timeout)
+
+        print(f"Serving {args.vault} on {socket_path}", flush=True)
+        agent.serve()
+    except KeyboardInterrupt:
+        pass  # serve() has already locked and cleaned up
+    except (CliError, ValueError, OSError) as e:
+        vault.lock()
+        parser.exit(1, f"error: {e}\n")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
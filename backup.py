@@ -0,0 +1,465 @@
+"""
+Encrypted backup snapshots of a vault, deduplicated per record.
+
+A snapshot is the vault file as of a save: its header plus the sealed
+INDEX/BODY frame pair of every live record, copied without decrypting
+anything. Backups are encrypted exactly like the vault, open with the
+master password that was current when they were taken, and need no
+password to take.
+
+Saves only re-seal the records that changed, so an unchanged record
+keeps the same bytes from one snapshot to the next and each frame pair
+is stored once however many snapshots hold it:
+
+    <vault>.backups/
+        <n>.pack : frame pairs first stored by snapshot n, back to back
+        <n>.idx  : digest | offset | length of every pair in <n>.pack
+        <n>.snap : JSON manifest: creation time, the vault header and
+                   the pack byte ranges that, concatenated, give its records
+
+Pairs stored next to each other collapse into one range, so a manifest
+holds a range per edit rather than an entry per record.
+
+Retention keeps the newest `keep` snapshots. A pack no kept snapshot
+uses is deleted, and the ones that are mostly unused (old versions of
+edited or deleted records) are merged into one holding only the ranges
+still used.
+
+One process at a time should write to a store.
+"""
+
+import bisect
+import hashlib
+import json
+import os
+import struct
+import threading
+import time
+
+import fileio
+import vault_format
+from vault_format import FRAME_HEADER
+
+
+# Snapshots kept by default
+DEFAULT_KEEP = 100
+
+# Packs less than this fraction used are merged into a new one
+REPACK_RATIO = 0.5
+
+# digest | offset in the pack | length
+INDEX_ENTRY = struct.Struct(">16sQI")
+
+DIGEST_SIZE = 16
+
+
+def default_backup_dir(vault_path: str) -> str:
+    return vault_path + ".backups"
+
+
+def pair_digest(pair) -> bytes:
+    return hashlib.blake2b(pair, digest_size=DIGEST_SIZE).digest()
+
+
+def read_sealed_records(blob):
+    """
+    The parts of a vault file a snapshot keeps.
+    Returns: (header including the key check, list of frame pairs as
+    memoryviews of blob, in file order)
+    """
+
+    info = vault_format.read_header(blob)
+
+    # Without COMMIT frames, pairs plus a COMMIT would not read back the same
+    if info["version"] < vault_format.COMMIT_FRAMES_VERSION:
+        raise ValueError("Open the vault once to upgrade it before backing it up.")
+
+    offset = info["offset"]
+    live, _, _ = vault_format.replay(vault_format.iter_frames(blob, offset), info["version"])
+
+    view = memoryview(blob)
+    pairs = []
+
+    for index_span, body_span in live.values():
+        start = index_span[0] - FRAME_HEADER.size
+
+        # The BODY frame always directly follows its INDEX frame
+        if body_span[0] - FRAME_HEADER.size != index_span[1]:
+            raise ValueError("Vault file has a BODY frame out of place.")
+
+        pairs.append(view[start:body_span[1]])
+
+    return bytes(view[:offset]), pairs
+
+
+class BackupStore:
+    """
+    A directory of deduplicated snapshots of one vault file.
+    Snapshots are numbered in the order they were taken.
+    """
+
+    def __init__(self, directory: str, keep: int = DEFAULT_KEEP):
+        self.directory = directory
+        self.keep = keep
+
+    # ====================================
+    # Snapshots
+    # ====================================
+
+    def snapshot(self, vault_path: str):
+        """
+        Back up the vault file as last saved, then apply retention.
+        Returns the new snapshot number, or None if nothing changed
+        since the latest snapshot.
+        """
+
+        with open(vault_path, "rb") as f:
+            blob = f.read()
+
+        header, pairs = read_sealed_records(blob)
+
+        os.makedirs(self.directory, mode=0o700, exist_ok=True)
+
+        stored = self._load_indexes()
+        number = self._next_number()
+
+        new_pack = bytearray()
+        new_index = bytearray()
+        ranges = []
+
+        for pair in pairs:
+            digest = pair_digest(pair)
+            location = stored.get(digest)
+
+            if location is None:
+                location = (number, len(new_pack), len(pair))
+                new_index += INDEX_ENTRY.pack(digest, len(new_pack), len(pair))
+                new_pack += pair
+                stored[digest] = location
+
+            pack, start, length = location
+
+            # Extend the last range when this pair follows it in the same pack
+            if ranges and ranges[-1][0] == pack and ranges[-1][2] == start:
+                ranges[-1][2] = start + length
+            else:
+                ranges.append([pack, start, start + length])
+
+        latest = self.latest()
+        if latest is not None:
+            manifest = self.manifest(latest)
+            if manifest["header"] == header.hex() and manifest["ranges"] == ranges:
+                return None
+
+        if new_pack:
+            # Pack first, then its index, then the manifest using them
+            fileio.atomic_write(self._path(number, "pack"), new_pack)
+            fileio.atomic_write(self._path(number, "idx"), new_index)
+
+        self._write_manifest(number, {
+            "created": time.time(),
+            "header": header.hex(),
+            "records": len(pairs),
+            "size": len(header) + sum(len(pair) for pair in pairs) + FRAME_HEADER.size,
+            "ranges": ranges,
+        })
+
+        self.prune()
+        return number
+
+    def restore(self, number: int, path: str):
+        """
+        Write snapshot number out as a vault file at path.
+        """
+
+        manifest = self.manifest(number)
+
+        out = bytearray(bytes.fromhex(manifest["header"]))
+        packs = {}
+
+        try:
+            for pack, start, end in manifest["ranges"]:
+                if pack not in packs:
+                    packs[pack] = open(self._path(pack, "pack"), "rb")
+
+                f = packs[pack]
+                f.seek(start)
+                chunk = f.read(end - start)
+
+                if len(chunk) != end - start:
+                    raise ValueError(f"Backup pack {pack} is truncated.")
+
+                out += chunk
+        finally:
+            for f in packs.values():
+                f.close()
+
+        out += vault_format.pack_commit()
+        fileio.atomic_write(path, out)
+
+    def snapshots(self) -> list:
+        """
+        Snapshot numbers, oldest first.
+        """
+
+        return sorted(self._numbers("snap"))
+
+    def latest(self):
+        numbers = self.snapshots()
+        return numbers[-1] if numbers else None
+
+    def manifest(self, number: int) -> dict:
+        try:
+            with open(self._path(number, "snap"), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            raise ValueError(f"No backup snapshot {number}.")
+
+    def disk_usage(self) -> int:
+        """
+        Bytes used by the store's files.
+        """
+
+        if not os.path.isdir(self.directory):
+            return 0
+
+        return sum(entry.stat().st_size for entry in os.scandir(self.directory) if entry.is_file())
+
+    # ====================================
+    # Retention
+    # ====================================
+
+    def prune(self):
+        """
+        Drop all but the newest `keep` snapshots, then delete the packs
+        they no longer use and merge the mostly unused ones into one.
+        """
+
+        numbers = self.snapshots()
+
+        for number in numbers[:max(0, len(numbers) - self.keep)]:
+            os.remove(self._path(number, "snap"))
+
+        manifests = {number: self.manifest(number) for number in self.snapshots()}
+
+        # Pack -> [start, end) intervals still in use
+        used = {}
+        for manifest in manifests.values():
+            for pack, start, end in manifest["ranges"]:
+                used.setdefault(pack, []).append((start, end))
+
+        sparse = {}
+        for pack in self._numbers("pack"):
+            intervals = _merge(used.get(pack, []))
+
+            if not intervals:
+                self._remove_pack(pack)
+                continue
+
+            live = sum(end - start for start, end in intervals)
+
+            if live < os.path.getsize(self._path(pack, "pack")) * REPACK_RATIO:
+                sparse[pack] = intervals
+
+        if sparse:
+            self._repack(sparse, manifests)
+
+    def _repack(self, sparse: dict, manifests: dict):
+        """
+        Copy the used intervals of the packs in sparse into one new pack,
+        point the manifests at it, then delete the old packs. A crash
+        part way leaves old and new packs, each still consistent.
+        """
+
+        new = self._next_number()
+        out = bytearray()
+        index = bytearray()
+        moves = {}  # old pack -> (interval starts, their new offsets, intervals)
+
+        for pack, intervals in sparse.items():
+            starts = [start for start, _ in intervals]
+            offsets = []
+
+            with open(self._path(pack, "pack"), "rb") as f:
+                for start, end in intervals:
+                    f.seek(start)
+                    offsets.append(len(out))
+                    out += f.read(end - start)
+
+            moves[pack] = (starts, offsets, intervals)
+
+            for digest, offset, length in self._read_index(pack):
+                i = bisect.bisect_right(starts, offset) - 1
+                if i >= 0 and offset + length <= intervals[i][1]:
+                    index += INDEX_ENTRY.pack(digest, offsets[i] + offset - starts[i], length)
+
+        def relocate(pack: int, start: int, end: int) -> list:
+            starts, offsets, _ = moves[pack]
+            i = bisect.bisect_right(starts, start) - 1
+            moved = offsets[i] + start - starts[i]
+            return [new, moved, moved + end - start]
+
+        fileio.atomic_write(self._path(new, "pack"), out)
+        fileio.atomic_write(self._path(new, "idx"), index)
+
+        for number, manifest in manifests.items():
+            if not any(pack in moves for pack, _, _ in manifest["ranges"]):
+                continue
+
+            manifest["ranges"] = [
+                relocate(pack, start, end) if pack in moves else [pack, start, end]
+                for pack, start, end in manifest["ranges"]
+            ]
+            self._write_manifest(number, manifest)
+
+        for pack in sparse:
+            self._remove_pack(pack)
+
+    def _remove_pack(self, pack: int):
+        for kind in ("idx", "pack"):
+            try:
+                os.remove(self._path(pack, kind))
+            except FileNotFoundError:
+                pass
+
+    # ====================================
+    # Files
+    # ====================================
+
+    def _path(self, number: int, kind: str) -> str:
+        return os.path.join(self.directory, f"{number}.{kind}")
+
+    def _numbers(self, kind: str) -> list:
+        if not os.path.isdir(self.directory):
+            return []
+
+        numbers = []
+        for name in os.listdir(self.directory):
+            stem, _, extension = name.partition(".")
+            if extension == kind and stem.isdigit():
+                numbers.append(int(stem))
+
+        return numbers
+
+    def _next_number(self) -> int:
+        used = self._numbers("snap") + self._numbers("pack")
+        return max(used, default=0) + 1
+
+    def _read_index(self, pack: int):
+        try:
+            with open(self._path(pack, "idx"), "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return []
+
+        usable = len(data) - len(data) % INDEX_ENTRY.size
+        return list(INDEX_ENTRY.iter_unpack(data[:usable]))
+
+    def _load_indexes(self) -> dict:
+        """
+        digest -> (pack, offset, length) for every stored pair.
+        """
+
+        stored = {}
+        for pack in self._numbers("pack"):
+            for digest, offset, length in self._read_index(pack):
+                stored[digest] = (pack, offset, length)
+
+        return stored
+
+    def _write_manifest(self, number: int, manifest: dict):
+        data = json.dumps(manifest, separators=(",", ":")).encode("utf-8")
+        fileio.atomic_write(self._path(number, "snap"), data)
+
+
+def _merge(intervals: list) -> list:
+    merged = []
+
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+
+    return merged
+
+
+class BackgroundBackups:
+    """
+    Takes snapshots on a worker thread after saves, at most one every
+    `interval` seconds, so a burst of saves costs one snapshot of the
+    final state.
+
+    Call request() after each successful write and close() before the
+    vault is locked. on_result(error) is called on the worker thread
+    after each snapshot, with None on success.
+    """
+
+    def __init__(self, store: BackupStore, vault_path: str, interval: float = 60.0, on_result=None):
+        self.store = store
+        self.vault_path = vault_path
+        self.interval = interval
+        self.on_result = on_result
+        self.last_error = None
+
+        self._cond = threading.Condition()
+        self._requested = False
+        self._last_run = None  # monotonic time of the last snapshot
+        self._closed = False
+
+        self._thread = threading.Thread(target=self._run, name="vault-backups", daemon=True)
+        self._thread.start()
+
+    def request(self):
+        with self._cond:
+            self._requested = True
+            self._cond.notify_all()
+
+    def close(self, timeout: float = None):
+        """
+        Take any requested snapshot right away and stop the worker.
+        """
+
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+        self._thread.join(timeout)
+
+    def _run(self):
+        while self._wait_until_due():
+            try:
+                self.store.snapshot(self.vault_path)
+                error = None
+            except Exception as e:
+                error = e
+
+            self.last_error = error
+
+            if self.on_result is not None:
+                self.on_result(error)
+
+    def _wait_until_due(self) -> bool:
+        """
+        Wait until a requested snapshot is due and claim it.
+        Returns False once closed with nothing left to take.
+        """
+
+        with self._cond:
+            while True:
+                if self._requested:
+                    if self._last_run is None or self._closed:
+                        wait = 0
+                    else:
+                        wait = self._last_run + self.interval - time.monotonic()
+
+                    if wait <= 0:
+                        self._requested = False
+                        self._last_run = time.monotonic()
+                        return True
+
+                    self._cond.wait(wait)
+                elif self._closed:
+                    return False
+                else:
+                    self._cond.wait()
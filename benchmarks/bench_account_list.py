@@ -0,0 +1,74 @@
+"""
+Account list refresh time: rebuilding a plain Listbox with every name
+(old behaviour) versus the virtualized list, which only draws the
+visible rows. Also times redrawing a single edited row.
+
+Needs a display (Tk). Run from the repository root:
+    python -m benchmarks.bench_account_list [entries ...]
+"""
+
+import sys
+import time
+import tkinter as tk
+
+from ui.virtual_list import VirtualList
+
+
+ROUNDS = 5
+
+
+def _time(root, fn) -> float:
+    start = time.perf_counter()
+
+    for _ in range(ROUNDS):
+        fn()
+        root.update_idletasks()  # include the redraw
+
+    return (time.perf_counter() - start) / ROUNDS * 1000
+
+
+def main():
+    sizes = [int(n) for n in sys.argv[1:]] or [10_000, 100_000]
+
+    try:
+        root = tk.Tk()
+    except tk.TclError as e:
+        print(f"Needs a display: {e}")
+        return
+
+    print(f"{'entries':>8}  {'full Listbox':>13} {'virtual list':>13} {'one row':>9}")
+
+    for entries in sizes:
+        names = {i: f"Site {i} account" for i in range(entries)}
+        keys = list(names)
+
+        listbox = tk.Listbox(root, height=20)
+        listbox.pack()
+
+        def rebuild():
+            listbox.delete(0, tk.END)
+            for key in keys:
+                listbox.insert(tk.END, names[key])
+
+        virtual = VirtualList(root, height=20, label=names.__getitem__)
+        virtual.pack()
+
+        full = _time(root, rebuild)
+        virtualized = _time(root, lambda: virtual.set_items(list(keys)))
+
+        def edit_one():
+            names[5] = names[5] + "!"
+            virtual.refresh([5])
+
+        one_row = _time(root, edit_one)
+
+        print(f"{entries:>8}  {full:>10.1f} ms {virtualized:>10.2f} ms {one_row:>6.2f} ms")
+
+        listbox.destroy()
+        virtual.destroy()
+
+    root.destroy()
+
+
+if __name__ == "__main__":
+    main()
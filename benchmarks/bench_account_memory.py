@@ -0,0 +1,79 @@
+"""
+Memory held per account after unlock: the previous Account (a plain
+object with a per-instance __dict__) versus the current one (__slots__,
+interned usernames and categories). Measured with tracemalloc and
+including the field strings, which are decoded fresh for every record
+just as the vault load does.
+
+Run from the repository root:
+    python -m benchmarks.bench_account_memory [entries]
+"""
+
+import json
+import sys
+import tracemalloc
+
+from models import Account
+
+
+CATEGORIES = ["Personal", "Work", "Finance", "Social", "Shopping"]
+
+# Most people reuse a handful of logins across sites
+USERNAMES = 40
+
+
+class DictAccount:
+    """
+    What models.Account looked like before __slots__ and interning.
+    """
+
+    def __init__(self, name, username, password, notes="", category="", id=None):
+        self.name = name
+        self.username = username
+        self.password = password
+        self.notes = notes
+        self.category = category
+        self.id = id
+
+
+def make_payloads(entries: int) -> list:
+    return [
+        json.dumps({
+            "name": f"Site {i}",
+            "username": f"user{i % USERNAMES}@example.com",
+            "password": f"pw-{i:08d}-secret",
+            "notes": "",
+            "category": CATEGORIES[i % len(CATEGORIES)],
+        }).encode()
+        for i in range(entries)
+    ]
+
+
+def measure(cls, payloads: list) -> float:
+    tracemalloc.start()
+
+    accounts = []
+    for i, payload in enumerate(payloads):
+        data = json.loads(payload)
+        accounts.append(cls(**data, id=i.to_bytes(16, "big")))
+
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return current / len(payloads)
+
+
+def main():
+    entries = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    payloads = make_payloads(entries)
+
+    before = measure(DictAccount, payloads)
+    after = measure(Account, payloads)
+
+    print(f"{entries} entries")
+    print(f"  __dict__ objects        : {before:8.0f} bytes/entry")
+    print(f"  __slots__ + interning   : {after:8.0f} bytes/entry  ({1 - after / before:.0%} less)")
+
+
+if __name__ == "__main__":
+    main()
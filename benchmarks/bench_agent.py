@@ -0,0 +1,123 @@
+"""
+Load test for agent.py: many concurrent connections doing lookups
+against one agent process. Reports requests/s and latency percentiles,
+next to what a tool pays to unlock the vault itself.
+
+Run from the repository root:
+    python -m benchmarks.bench_agent [entries] [connections] [requests per connection]
+"""
+
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from agent import AgentClient
+from benchmarks.synthetic import PASSWORD, make_vault
+from crypto_utils import DEFAULT_KDF_PARAMS
+from vault import Vault
+
+
+# One in this many requests is a search instead of a get
+SEARCH_EVERY = 10
+
+
+def _percentile(sorted_values: list, fraction: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+def _wait_for(path: str, process, timeout: float = 30):
+    deadline = time.monotonic() + timeout
+
+    while not os.path.exists(path):
+        if process.poll() is not None or time.monotonic() > deadline:
+            raise RuntimeError("agent did not start")
+        time.sleep(0.05)
+
+
+def main():
+    entries = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    connections = int(sys.argv[2]) if len(sys.argv) > 2 else 64
+    per_connection = int(sys.argv[3]) if len(sys.argv) > 3 else 100
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "vault.enc")
+        socket_path = os.path.join(tmp, "agent.sock")
+
+        # The real KDF: the agent saves every tool its cost
+        vault = make_vault(path, entries, kdf_params=DEFAULT_KDF_PARAMS)
+        ids = [account_id.hex() for account_id in vault.account_ids()]
+        vault.lock()
+
+        # What every tool pays without the agent
+        start = time.perf_counter()
+        Vault(path).load(PASSWORD)
+        unlock_ms = (time.perf_counter() - start) * 1000
+
+        agent = subprocess.Popen(
+            [sys.executable, "agent.py", "--vault", path, "--socket", socket_path],
+            env=dict(os.environ, VAULT_PASSWORD=PASSWORD), stdout=subprocess.DEVNULL,
+        )
+
+        try:
+            _wait_for(socket_path, agent)
+
+            latencies = []
+            failures = []
+            ready = threading.Barrier(connections + 1)
+
+            def client(seed: int):
+                rng = random.Random(seed)
+                conn = AgentClient(socket_path)
+                mine = []
+
+                ready.wait()
+                for n in range(per_connection):
+                    start = time.perf_counter()
+
+                    if n % SEARCH_EVERY == 0:
+                        response = conn.request("search", query=f"site {rng.randrange(entries)}", limit=10)
+                    else:
+                        response = conn.request("get", ref=rng.choice(ids))
+
+                    mine.append((time.perf_counter() - start) * 1000)
+                    if not response.get("ok"):
+                        failures.append(response)
+
+                conn.close()
+                latencies.extend(mine)
+
+            threads = [threading.Thread(target=client, args=(i,)) for i in range(connections)]
+            for t in threads:
+                t.start()
+
+            ready.wait()
+            start = time.perf_counter()
+            for t in threads:
+                t.join()
+            elapsed = time.perf_counter() - start
+
+            AgentClient(socket_path).request("lock")
+            agent.wait(timeout=10)
+        finally:
+            if agent.poll() is None:
+                agent.kill()
+
+    assert not failures, failures[:3]
+
+    latencies.sort()
+    total = len(latencies)
+
+    print(f"{entries} entries, {connections} connections x {per_connection} requests "
+          f"(1 in {SEARCH_EVERY} a search)")
+    print(f"  unlock per tool (no agent) : {unlock_ms:8.1f} ms")
+    print(f"  throughput                 : {total / elapsed:8.0f} requests/s")
+    print(f"  latency p50                : {_percentile(latencies, 0.50):8.2f} ms")
+    print(f"  latency p99                : {_percentile(latencies, 0.99):8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Startup cost of the headless CLI versus the GUI path, each in a fresh
+interpreter:
+
+- imports: python -c "import cli" versus "import main" (tkinter and the
+  ui package), and the GUI path up to its first window when there is
+  a display
+- end to end: cli.py list and a batch of operations on a vault, from
+  process start to exit, key derivation included
+
+Also checks that the CLI never loads tkinter.
+
+Run from the repository root:
+    python -m benchmarks.bench_cli_startup [entries]
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.synthetic import PASSWORD, make_vault
+from crypto_utils import DEFAULT_KDF_PARAMS
+
+
+RUNS = 5
+BATCH_OPS = 200
+
+
+def _median_ms(command, env=None, stdin=None) -> float:
+    timings = []
+
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        subprocess.run(command, env=env, input=stdin, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        timings.append((time.perf_counter() - start) * 1000)
+
+    timings.sort()
+    return timings[len(timings) // 2]
+
+
+def main():
+    entries = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000
+
+    loaded = subprocess.run(
+        [sys.executable, "-c", "import sys, cli; print('tkinter' in sys.modules)"],
+        capture_output=True, text=True, check=True,
+    ).stdout.strip()
+    assert loaded == "False", "cli imported tkinter"
+
+    bare = _median_ms([sys.executable, "-c", "pass"])
+    cli_import = _median_ms([sys.executable, "-c", "import cli"])
+    gui_import = _median_ms([sys.executable, "-c", "import main"])
+
+    try:
+        gui_window = _median_ms([sys.executable, "-c", "import main, tkinter; tkinter.Tk().destroy()"])
+    except subprocess.CalledProcessError:
+        gui_window = None  # no display
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "vault.enc")
+
+        vault = make_vault(path, entries, kdf_params=DEFAULT_KDF_PARAMS)
+        ids = [account_id.hex() for account_id in vault.account_ids()]
+        vault.lock()
+
+        env = dict(os.environ, VAULT_PASSWORD=PASSWORD)
+        cli = [sys.executable, "cli.py", "--vault", path]
+
+        listing = _median_ms(cli + ["list"], env=env)
+
+        ops = "".join(
+            json.dumps({"op": "update", "ref": ids[i % entries], "fields": {"password": f"new-{i}"}}) + "\n"
+            for i in range(BATCH_OPS)
+        ).encode()
+        batch = _median_ms(cli + ["batch"], env=env, stdin=ops)
+
+    print(f"median of {RUNS} runs, fresh interpreter each")
+    print(f"  python -c pass           : {bare:8.1f} ms")
+    print(f"  import cli               : {cli_import:8.1f} ms  (tkinter not loaded)")
+    print(f"  import main (GUI path)   : {gui_import:8.1f} ms")
+    if gui_window is None:
+        print("  GUI path to first window : needs a display")
+    else:
+        print(f"  GUI path to first window : {gui_window:8.1f} ms")
+    print(f"  cli list, {entries} entries : {listing:8.1f} ms  (includes key derivation)")
+    print(f"  cli batch, {BATCH_OPS} updates  : {batch:8.1f} ms  (one unlock, one save)")
+
+
+if __name__ == "__main__":
+    main()
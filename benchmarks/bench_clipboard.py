@@ -0,0 +1,68 @@
+"""
+Per-copy latency of each clipboard backend, including the read-back the
+clear step does. Backends that can't run here (no display, no
+xclip/xsel) are reported as unavailable.
+
+Run from the repository root:
+    python -m benchmarks.bench_clipboard [copies]
+"""
+
+import sys
+import time
+
+from clipboard import MemoryClipboard, PyperclipClipboard, TkClipboard
+
+
+def _time(backend, copies: int):
+    """
+    Median and worst ms for one copy, and for one paste.
+    """
+
+    copy_times, paste_times = [], []
+
+    for i in range(copies):
+        start = time.perf_counter()
+        backend.copy(f"pw-{i:08d}")
+        copy_times.append((time.perf_counter() - start) * 1000)
+
+        start = time.perf_counter()
+        backend.paste()
+        paste_times.append((time.perf_counter() - start) * 1000)
+
+    copy_times.sort()
+    paste_times.sort()
+
+    return copy_times[len(copy_times) // 2], copy_times[-1], paste_times[len(paste_times) // 2]
+
+
+def _backends():
+    yield "memory", MemoryClipboard
+
+    def tk_backend():
+        import tkinter as tk
+        return TkClipboard(tk.Tk())
+
+    yield "tk", tk_backend
+    yield "pyperclip", PyperclipClipboard
+
+
+def main():
+    copies = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+
+    print(f"{copies} copies per backend")
+    print(f"  {'backend':<10} {'copy median':>12} {'copy worst':>12} {'paste median':>13}")
+
+    for name, make in _backends():
+        try:
+            backend = make()
+            backend.copy("warm-up")
+            median, worst, paste = _time(backend, copies)
+        except Exception as e:
+            print(f"  {name:<10} unavailable: {e}")
+            continue
+
+        print(f"  {name:<10} {median:>9.3f} ms {worst:>9.3f} ms {paste:>10.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Serialize/parse throughput of the payload codecs for Account records
+(INDEX + BODY payload per account, as written by Vault).
+
+Run from the repository root:
+    python -m benchmarks.bench_codec [entries ...]
+"""
+
+import sys
+import time
+
+from models import Account
+from payload_codec import CODECS
+from vault import INDEX_FIELDS, BODY_FIELDS
+
+
+NOTES = "Recovery codes and security questions. " * 4
+
+
+def make_records(entries: int):
+    return [
+        Account(f"Site {i}", f"user{i}@example.com", f"pw-{i:08d}-secret", NOTES, f"Group {i % 20}").to_dict()
+        for i in range(entries)
+    ]
+
+
+def run(codec, records):
+    start = time.perf_counter()
+    payloads = [
+        (codec.encode(r, INDEX_FIELDS), codec.encode(r, BODY_FIELDS))
+        for r in records
+    ]
+    encode_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for index, body in payloads:
+        codec.decode(index, INDEX_FIELDS)
+        codec.decode(body, BODY_FIELDS)
+    decode_s = time.perf_counter() - start
+
+    size = sum(len(i) + len(b) for i, b in payloads)
+    return encode_s, decode_s, size
+
+
+def main():
+    sizes = [int(n) for n in sys.argv[1:]] or [10_000, 100_000]
+
+    print(f"{'entries':>8}  {'codec':<7} {'encode rec/s':>13} {'decode rec/s':>13} {'MB/s parse':>11} {'bytes':>12}")
+
+    for entries in sizes:
+        records = make_records(entries)
+
+        for name, codec in CODECS.items():
+            encode_s, decode_s, size = run(codec, records)
+            print(
+                f"{entries:>8}  {name:<7} {entries / encode_s:>13,.0f} {entries / decode_s:>13,.0f}"
+                f" {size / decode_s / 1e6:>11.1f} {size:>12,}"
+            )
+
+
+if __name__ == "__main__":
+    main()
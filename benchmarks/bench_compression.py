@@ -0,0 +1,77 @@
+"""
+File size and save/load time of a vault with long notes, with and
+without BODY compression.
+
+Run from the repository root:
+    python -m benchmarks.bench_compression [entries]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+from benchmarks.synthetic import PASSWORD, FAST_KDF, make_accounts
+from vault import Vault
+
+
+WORDS = (
+    "account recovery code backup phone security question answer pin "
+    "billing address renewal expires support ticket shared family admin"
+).split()
+
+SETTINGS = [
+    ("none", None),
+    ("zlib-1", {"algorithm": "zlib", "level": 1}),
+    ("zlib-6", {"algorithm": "zlib", "level": 6}),
+    ("lzma-6", {"algorithm": "lzma", "level": 6}),
+]
+
+
+def accounts_with_prose(entries: int) -> list:
+    """
+    Synthetic accounts with notes of 50 to 300 random words. The notes of
+    make_accounts repeat one filler string, which would compress far
+    better than anything a user writes.
+    """
+
+    rng = random.Random(42)
+    accounts = list(make_accounts(entries, note_size=0, categories=20))
+
+    for account in accounts:
+        account.notes = " ".join(rng.choice(WORDS) for _ in range(rng.randint(50, 300)))
+
+    return accounts
+
+
+def main():
+    entries = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    accounts = accounts_with_prose(entries)
+
+    print(f"{entries} entries with long notes")
+    print(f"  {'compression':<12} {'file bytes':>12} {'save ms':>9} {'load ms':>9}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, compression in SETTINGS:
+            path = os.path.join(tmp, f"{label}.enc")
+
+            vault = Vault(path)
+            vault.create_new(PASSWORD, FAST_KDF, compression=compression)
+            vault.add_accounts(accounts)
+
+            start = time.perf_counter()
+            vault.save()
+            save_ms = (time.perf_counter() - start) * 1000
+            vault.lock()
+
+            start = time.perf_counter()
+            vault.load(PASSWORD)
+            load_ms = (time.perf_counter() - start) * 1000
+            vault.lock()
+
+            print(f"  {label:<12} {os.path.getsize(path):>12,} {save_ms:>9.1f} {load_ms:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+"""
+Fault injection for the save paths: wherever a crash cuts a write short,
+the vault must load as the state before the save or the state after it,
+never fail or mix the two.
+
+- an appended change group (fileio.append_durably) cut at every byte
+  offset loads as the old state, eagerly and lazily, with the same count
+  of stale frames (the compaction trigger), and the next save appends
+  cleanly over the torn tail
+- a compaction (fileio.atomic_write) interrupted before os.replace loads
+  as the old state and load() removes the leftover .tmp, whole or torn;
+  interrupted after the rename, it loads as the new state
+- a compaction keeps the vault file's permissions
+
+Run from the repository root:
+    python -m benchmarks.bench_crash_recovery [entries]
+"""
+
+import contextlib
+import os
+import sys
+import tempfile
+
+import fileio
+from benchmarks.synthetic import PASSWORD, make_vault
+from models import Account
+from vault import Vault
+
+
+class _Crash(BaseException):
+    """
+    The process dying mid-write: nothing after it runs.
+    """
+
+
+@contextlib.contextmanager
+def _crash_at(module, name: str):
+    """
+    Make module.name raise _Crash. The dying process doesn't get to clean
+    up its temp file either.
+    """
+
+    def crash(*args, **kwargs):
+        raise _Crash(name)
+
+    original = getattr(module, name)
+    discard_temp = fileio.discard_temp
+    setattr(module, name, crash)
+    fileio.discard_temp = lambda path: None
+
+    try:
+        yield
+    except _Crash:
+        pass
+    else:
+        raise AssertionError(f"the write never reached {name}")
+    finally:
+        setattr(module, name, original)
+        fileio.discard_temp = discard_temp
+
+
+def _fields(account: Account) -> tuple:
+    return account.name, account.username, account.password, account.notes, account.category
+
+
+def _load(path: str, lazy: bool = False):
+    """
+    A fresh vault loaded from path, and its accounts as {id: fields}.
+    """
+
+    vault = Vault(path, lazy=lazy)
+    vault.load(PASSWORD)
+
+    state = {}
+    for record_id in vault.account_ids():
+        state[record_id] = _fields(vault.reveal(record_id))
+
+    return vault, state
+
+
+def _write(path: str, data: bytes):
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+def check_torn_append(path: str, entries: int) -> int:
+    """
+    Cut the change group of one save at every offset. Returns the group size.
+    """
+
+    vault = make_vault(path, entries)
+    ids = vault.account_ids()
+
+    with open(path, "rb") as f:
+        before = f.read()
+    old_vault, old_state = _load(path)
+    old_stale = old_vault._stale_frames
+
+    vault.update_account(ids[0], Account("Edited", "edited@example.com", "new-pw", "new notes"))
+    vault.delete_account(ids[1])
+    vault.add_account(Account("Added", "added@example.com", "added-pw", "added notes", "New"))
+    vault.save()
+    new_stale = vault._stale_frames
+    vault.lock()
+
+    with open(path, "rb") as f:
+        after = f.read()
+    _, new_state = _load(path)
+
+    assert after[:len(before)] == before, "the save rewrote the file instead of appending"
+    assert new_state != old_state
+    group = after[len(before):]
+
+    for cut in range(len(group) + 1):
+        expected = new_state if cut == len(group) else old_state
+        stale = new_stale if cut == len(group) else old_stale
+
+        for lazy in (False, True):
+            _write(path, before + group[:cut])
+
+            vault, state = _load(path, lazy)
+            assert state == expected, f"cut at {cut}/{len(group)} (lazy={lazy}) loaded the wrong state"
+            assert vault._stale_frames == stale, \
+                f"cut at {cut}/{len(group)}: {vault._stale_frames} stale frames, expected {stale}"
+
+            # The next save must land after the last complete group, not the torn bytes
+            record_id = vault.add_account(Account("Recovered", "r@example.com", f"pw-{cut}", "", ""))
+            vault.save()
+            vault.lock()
+
+            _, state = _load(path, lazy)
+            assert state == {**expected, record_id: ("Recovered", "r@example.com", f"pw-{cut}", "", "")}, \
+                f"save after a cut at {cut}/{len(group)} (lazy={lazy}) lost data"
+
+    return len(group)
+
+
+def check_interrupted_compaction(path: str, entries: int):
+    tmp = fileio.temp_path(path)
+
+    vault = make_vault(path, entries)
+    vault.lock()
+    _, old_state = _load(path)
+
+    def compact_with_edit():
+        vault, state = _load(path)
+        record_id = vault.account_ids()[0]
+        vault.update_account(record_id, Account("Compacted", "c@example.com", "compacted-pw", ""))
+        vault.compact()
+
+    # Before the rename: the old file is intact, the new one sits in .tmp
+    with open(path, "rb") as f:
+        old = f.read()
+
+    with _crash_at(os, "replace"):
+        compact_with_edit()
+
+    assert os.path.exists(tmp), "the crash left no temp file"
+    with open(path, "rb") as f:
+        assert f.read() == old, "the vault changed before the rename"
+
+    _, state = _load(path)
+    assert state == old_state, "interrupted compaction changed the loaded state"
+    assert not os.path.exists(tmp), "load() left the temp file behind"
+
+    # A temp file cut short mid-write is discarded the same way
+    with open(path, "rb") as f:
+        _write(tmp, f.read()[:len(old) // 2])
+
+    _, state = _load(path)
+    assert state == old_state
+    assert not os.path.exists(tmp), "load() left a torn temp file behind"
+
+    # After the rename, before the directory fsync: the new file is in place
+    with _crash_at(fileio, "fsync_directory"):
+        compact_with_edit()
+
+    assert not os.path.exists(tmp)
+    _, state = _load(path)
+    assert state != old_state
+    assert state == {**old_state, next(iter(old_state)): ("Compacted", "c@example.com", "compacted-pw", "", "")}
+
+
+def check_permissions(path: str, entries: int):
+    make_vault(path, entries).lock()
+    assert os.stat(path).st_mode & 0o777 == fileio.NEW_FILE_MODE, "a new vault isn't owner-only"
+
+    for mode in (0o600, 0o640):
+        os.chmod(path, mode)
+
+        vault, _ = _load(path)
+        vault.compact()
+        vault.lock()
+
+        assert os.stat(path).st_mode & 0o777 == mode, f"compaction changed mode {oct(mode)}"
+
+
+def main():
+    entries = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+
+    with tempfile.TemporaryDirectory() as tmp:
+        group = check_torn_append(os.path.join(tmp, "append.enc"), entries)
+        print(f"torn append       : ok, {group + 1} cuts of a {group}-byte group, eager and lazy")
+
+        check_interrupted_compaction(os.path.join(tmp, "compact.enc"), entries)
+        print("interrupted write : ok, before and after the rename, torn temp file")
+
+        if os.name == "posix":
+            check_permissions(os.path.join(tmp, "mode.enc"), entries)
+            print("permissions       : ok, kept across compaction")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Export and backup costs on a large vault:
+
+- export: the streaming exporter on a lazily loaded vault versus what
+  cli.py export did before (load everything, build the whole JSON
+  document, write it); time and peak memory (tracemalloc), unlock
+  included
+- backups: time per snapshot and disk used by a store holding many
+  snapshots of a vault with a few edits between saves, versus copying
+  vault.enc each time
+
+Run from the repository root:
+    python -m benchmarks.bench_export_backup [entries] [snapshots] [edits per save]
+"""
+
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from backup import BackupStore
+from benchmarks.synthetic import PASSWORD, make_vault
+from exporter import export_file
+from models import Account
+from vault import Vault
+
+
+NOTE_SIZE = 48
+
+
+def _measure(work):
+    """
+    Time one run, then peak memory over another (tracemalloc slows
+    allocations down too much to time the same run).
+    """
+
+    start = time.perf_counter()
+    work()
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    work()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return elapsed, peak
+
+
+def export_materialized(vault_path: str, out: str):
+    vault = Vault(vault_path)
+    vault.load(PASSWORD)
+
+    data = json.dumps({"accounts": [vault.reveal(i).to_dict() for i in vault.account_ids()]}, indent=2)
+    with open(out, "w", encoding="utf-8") as f:
+        f.write(data + "\n")
+
+    vault.lock()
+
+
+def export_streaming(vault_path: str, out: str):
+    vault = Vault(vault_path, lazy=True)
+    vault.load(PASSWORD)
+    export_file(vault, out)
+    vault.lock()
+
+
+def main():
+    entries = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    snapshots = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    edits = int(sys.argv[3]) if len(sys.argv) > 3 else 10
+
+    rng = random.Random(1)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "vault.enc")
+
+        vault = make_vault(path, entries, NOTE_SIZE)
+        vault_size = os.path.getsize(path)
+
+        print(f"{entries:,} entries, vault file {vault_size / 1e6:.1f} MB")
+
+        for label, work in (("materialized JSON", export_materialized), ("streaming JSON", export_streaming)):
+            out = os.path.join(tmp, "export.json")
+            elapsed, peak = _measure(lambda: work(path, out))
+            print(f"  export, {label:<18}: {elapsed:6.2f} s, peak {peak / 1e6:7.1f} MB")
+
+        out = os.path.join(tmp, "export.csv")
+        elapsed, peak = _measure(lambda: export_streaming(path, out))
+        print(f"  export, {'streaming CSV':<18}: {elapsed:6.2f} s, peak {peak / 1e6:7.1f} MB")
+
+        store = BackupStore(os.path.join(tmp, "backups"), keep=snapshots)
+        ids = vault.account_ids()
+
+        start = time.perf_counter()
+        store.snapshot(path)
+        first = time.perf_counter() - start
+
+        timings = []
+        for n in range(snapshots - 1):
+            for account_id in rng.sample(ids, edits):
+                account = vault.get(account_id)
+                vault.update_account(account_id, Account(
+                    account.name, account.username, f"changed-{n}", account.notes, account.category
+                ))
+            vault.save()
+
+            start = time.perf_counter()
+            store.snapshot(path)
+            timings.append(time.perf_counter() - start)
+
+        timings.sort()
+        usage = store.disk_usage()
+
+        # Check the oldest snapshot still opens
+        restored = os.path.join(tmp, "restored.enc")
+        store.restore(store.snapshots()[0], restored)
+        check = Vault(restored, lazy=True)
+        check.load(PASSWORD)
+        assert len(check) == entries
+        check.lock()
+
+        print(f"  backups, {edits} edits between saves:")
+        print(f"    first snapshot           : {first * 1000:8.1f} ms")
+        print(f"    later snapshot (median)  : {timings[len(timings) // 2] * 1000:8.1f} ms")
+        print(f"    {len(store.snapshots())} snapshots on disk    : {usage / 1e6:8.1f} MB "
+              f"({usage / vault_size:.2f}x the vault; copies would be {snapshots}x, "
+              f"{snapshots * vault_size / 1e6:.0f} MB)")
+
+        vault.lock()
+
+
+if __name__ == "__main__":
+    main()
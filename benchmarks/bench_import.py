@@ -0,0 +1,134 @@
+"""
+Bulk import throughput and peak memory on a 100k-row export, CSV and
+Bitwarden-style JSON: the streaming importer (batches, one save) versus
+what the UI path amounted to before (parse everything, add one account
+at a time, save after each add; timed on a sample and extrapolated).
+
+Peak memory is Python allocations (tracemalloc) during import and save,
+over what the vault held before; part of it is the imported accounts
+themselves, which stay in memory afterwards.
+
+Run from the repository root:
+    python -m benchmarks.bench_import [rows]
+"""
+
+import csv
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.synthetic import make_vault
+from importer import import_file
+from models import Account
+from vault import Vault
+
+
+# Rows timed for the one-save-per-add path
+PER_ADD_SAMPLE = 200
+
+# Every n-th row repeats an earlier one, to exercise deduplication
+DUPLICATE_EVERY = 20
+
+
+def _rows(count: int):
+    for i in range(count):
+        n = i - 1 if i % DUPLICATE_EVERY == 0 and i else i
+        yield {
+            "name": f"Site {n}",
+            "url": f"https://site{n}.example.com/login",
+            "username": f"user{n}@example.com",
+            "password": f"pw-{n:08d}-secret",
+            "notes": "Imported",
+            "folder": f"Group {n % 20}",
+        }
+
+
+def write_csv(path: str, count: int):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=["name", "url", "username", "password", "notes", "folder"])
+        writer.writeheader()
+        writer.writerows(_rows(count))
+
+
+def write_bitwarden(path: str, count: int):
+    with open(path, "w", encoding="utf-8") as f:
+        folders = [{"id": f"f{g}", "name": f"Group {g}"} for g in range(20)]
+        f.write('{"encrypted": false, "folders": ' + json.dumps(folders) + ', "items": [\n')
+
+        for i, row in enumerate(_rows(count)):
+            item = {
+                "type": 1, "name": row["name"], "notes": row["notes"],
+                "folderId": "f" + row["folder"].split()[-1],
+                "login": {"username": row["username"], "password": row["password"],
+                          "uris": [{"uri": row["url"]}]},
+            }
+            f.write((",\n" if i else "") + json.dumps(item))
+
+        f.write("\n]}\n")
+
+
+def measure_streaming(vault: Vault, source: str):
+    tracemalloc.start()
+    base, _ = tracemalloc.get_traced_memory()
+
+    start = time.perf_counter()
+    stats = import_file(vault, source)
+    vault.save()
+    elapsed = time.perf_counter() - start
+
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return stats, elapsed, current - base, peak - base
+
+
+def measure_per_add(vault: Vault, source: str) -> float:
+    """
+    Seconds per row for add_account + save, as the UI did per entry.
+    """
+
+    with open(source, newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))[:PER_ADD_SAMPLE]
+
+    start = time.perf_counter()
+    for row in rows:
+        vault.add_account(Account(row["name"], row["username"], row["password"], row["notes"], row["folder"]))
+        vault.save()
+
+    return (time.perf_counter() - start) / len(rows)
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, "export.csv")
+        json_path = os.path.join(tmp, "export.json")
+        write_csv(csv_path, rows)
+        write_bitwarden(json_path, rows)
+
+        print(f"{rows:,} rows (1 in {DUPLICATE_EVERY} a duplicate)")
+
+        for label, source in (("CSV", csv_path), ("JSON", json_path)):
+            size = os.path.getsize(source)
+            vault = make_vault(os.path.join(tmp, f"{label}.enc"), 0)
+            stats, elapsed, kept, peak = measure_streaming(vault, source)
+            vault.lock()
+
+            print(f"  {label:<4} {size / 1e6:5.1f} MB file : {rows / elapsed:7,.0f} rows/s, "
+                  f"peak {peak / 1e6:5.1f} MB ({kept / 1e6:5.1f} MB of it the imported accounts), "
+                  f"imported {stats['imported']:,}, {stats['duplicates']:,} duplicates skipped")
+
+        vault = make_vault(os.path.join(tmp, "per_add.enc"), 0)
+        per_row = measure_per_add(vault, csv_path)
+        vault.lock()
+
+        print(f"  add + save per row       : {1 / per_row:7,.0f} rows/s "
+              f"(~{per_row * rows:,.0f} s for the whole file)")
+
+
+if __name__ == "__main__":
+    main()
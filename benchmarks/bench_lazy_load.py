@@ -0,0 +1,67 @@
+"""
+Unlock time and peak RSS of an eager load versus a lazy (index-only) load.
+
+Each load runs in a fresh interpreter so ru_maxrss reflects only that load.
+
+Run from the repository root:
+    python -m benchmarks.bench_lazy_load [entries ...]
+"""
+
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.synthetic import PASSWORD, make_vault
+from crypto_utils import DEFAULT_KDF_PARAMS
+from vault import Vault
+
+
+NOTE_SIZE = 500
+CATEGORIES = 20
+
+
+def child(path: str, lazy: bool):
+    vault = Vault(path, lazy=lazy)
+
+    start = time.perf_counter()
+    vault.load(PASSWORD)
+    elapsed = (time.perf_counter() - start) * 1000
+
+    # ru_maxrss is KiB on Linux
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"{elapsed:.1f} {peak:.1f}")
+
+
+def measure(path: str, lazy: bool):
+    out = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_lazy_load", "--child", path, str(int(lazy))],
+        check=True, capture_output=True, text=True,
+    ).stdout.split()
+    return float(out[0]), float(out[1])
+
+
+def main():
+    sizes = [int(n) for n in sys.argv[1:]] or [10_000, 100_000]
+
+    print(f"{'entries':>8}  {'mode':<6} {'unlock ms':>10} {'peak RSS MiB':>13}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for entries in sizes:
+            path = os.path.join(tmp, f"vault-{entries}.enc")
+            # The real KDF: unlock time is what a user waits
+            make_vault(path, entries, NOTE_SIZE, CATEGORIES, kdf_params=DEFAULT_KDF_PARAMS).lock()
+
+            for lazy in (False, True):
+                elapsed, peak = measure(path, lazy)
+                mode = "lazy" if lazy else "eager"
+                print(f"{entries:>8}  {mode:<6} {elapsed:>10.1f} {peak:>13.1f}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--child":
+        child(sys.argv[2], sys.argv[3] == "1")
+    else:
+        main()
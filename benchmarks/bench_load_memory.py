@@ -0,0 +1,73 @@
+"""
+Peak Python allocation during an eager unlock, measured with tracemalloc.
+
+"Transient" is the peak minus what is still allocated after the load
+(the decrypted accounts themselves), i.e. the buffers the load path
+needed on top of its result. For the record format it should stay close
+to 1x the file size: the file buffer plus one reusable record buffer.
+
+Run from the repository root:
+    python -m benchmarks.bench_load_memory [entries]
+"""
+
+import os
+import sys
+import tempfile
+import tracemalloc
+
+from benchmarks.synthetic import PASSWORD, make_accounts, make_vault
+from crypto_utils import derive_key, encrypt_data
+from vault import Vault
+
+
+NOTE_SIZE = 480
+CATEGORIES = 20
+
+# Allowed transient overhead for the record format, as a multiple of the file size
+MAX_TRANSIENT_RATIO = 1.25
+
+
+def write_legacy(path: str, accounts):
+    salt = os.urandom(16)
+    key = derive_key(PASSWORD, salt)
+    blob = encrypt_data(key, {"accounts": [a.to_dict() for a in accounts]})
+
+    with open(path, "wb") as f:
+        f.write(salt + blob)
+
+
+def measure(path: str):
+    size = os.path.getsize(path)
+    vault = Vault(path)
+
+    tracemalloc.start()
+    vault.load(PASSWORD)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    vault.lock()
+    return size, (peak - current) / size
+
+
+def main():
+    entries = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        record_path = os.path.join(tmp, "record.enc")
+        make_vault(record_path, entries, NOTE_SIZE, CATEGORIES).lock()
+
+        size, ratio = measure(record_path)
+        print(f"record format : {size:>12,} bytes, transient peak {ratio:.2f}x file size")
+
+        assert ratio <= MAX_TRANSIENT_RATIO, f"load needed {ratio:.2f}x the vault size"
+
+        # Legacy files are parsed as one JSON document, then upgraded
+        legacy_path = os.path.join(tmp, "legacy.enc")
+        write_legacy(legacy_path, make_accounts(entries, NOTE_SIZE, CATEGORIES))
+
+        size, ratio = measure(legacy_path)
+        print(f"legacy format : {size:>12,} bytes, transient peak {ratio:.2f}x file size (includes upgrade)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Cost of saving a single edit: rewriting the whole file (what every save
+did before the record-level format; compaction still does it) versus
+appending only the changed record.
+
+Run from the repository root:
+    python -m benchmarks.bench_record_save [entries]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks.synthetic import make_vault
+from models import Account
+
+
+NOTE_SIZE = 48
+ROUNDS = 20
+
+
+def main():
+    entries = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "vault.enc")
+
+        vault = make_vault(path, entries, NOTE_SIZE)
+        first = vault.account_ids()[0]
+
+        start = time.perf_counter()
+        for _ in range(ROUNDS):
+            vault.update_account(first, Account("Site 0", "user0@example.com", "changed", ""))
+            vault.compact()
+        full = (time.perf_counter() - start) / ROUNDS * 1000
+        full_bytes = os.path.getsize(path)
+
+        start = time.perf_counter()
+        for _ in range(ROUNDS):
+            size_before = os.path.getsize(path)
+            vault.update_account(first, Account("Site 0", "user0@example.com", "changed", ""))
+            vault.save()
+        append = (time.perf_counter() - start) / ROUNDS * 1000
+        append_bytes = os.path.getsize(path) - size_before
+
+        vault.lock()
+
+    print(f"{entries} entries, one edited record per save")
+    print(f"  full rewrite   : {full:9.2f} ms/save  {full_bytes:>12,} bytes written")
+    print(f"  append record  : {append:9.2f} ms/save  {append_bytes:>12,} bytes written")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Per-save latency: re-deriving the key on every save (old behaviour)
+versus reusing the session key cached at unlock. Both rows save the same
+one-record edit, so the difference is the key derivation alone.
+
+Run from the repository root:
+    python -m benchmarks.bench_save
+"""
+
+import os
+import tempfile
+import time
+
+from benchmarks.synthetic import PASSWORD, make_vault
+from crypto_utils import DEFAULT_KDF_PARAMS, derive_key_from_params
+from models import Account
+from vault import Vault
+
+
+ENTRIES = 200
+ROUNDS = 10
+
+
+def _save_one_edit(vault: Vault):
+    vault.update_account(vault.account_ids()[0], Account("Site 0", "user0@example.com", "new-pw", "notes"))
+    vault.save()
+
+
+def _save_rederiving_key(vault: Vault):
+    """
+    What Vault.save did before the session key was cached: derive the key
+    from the master password, then write.
+    """
+
+    derive_key_from_params(PASSWORD, vault.salt, vault.kdf_params)
+    _save_one_edit(vault)
+
+
+def _time(fn, rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        fn()
+    return (time.perf_counter() - start) / rounds * 1000
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        # The real KDF: its cost is what this measures
+        vault = make_vault(os.path.join(tmp, "vault.enc"), ENTRIES, kdf_params=DEFAULT_KDF_PARAMS)
+
+        before = _time(lambda: _save_rederiving_key(vault), ROUNDS)
+        after = _time(lambda: _save_one_edit(vault), ROUNDS)
+
+        vault.lock()
+
+    print(f"{ENTRIES} entries, {ROUNDS} saves each")
+    print(f"  re-derive key per save : {before:8.2f} ms/save")
+    print(f"  cached session key     : {after:8.2f} ms/save")
+    print(f"  speedup                : {before / after:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Time the caller spends per edit with a synchronous save versus a
+BackgroundSaver, and how many durable writes a burst of edits costs.
+
+Run from the repository root:
+    python -m benchmarks.bench_saver
+"""
+
+import os
+import tempfile
+import time
+
+import fileio
+from benchmarks.synthetic import make_vault
+from models import Account
+from saver import BackgroundSaver
+from vault import Vault
+
+
+ENTRIES = 10_000
+EDITS = 200
+
+
+def _edit(vault: Vault, ids: list, i: int):
+    vault.update_account(ids[i % ENTRIES], Account(f"Site {i}", "user@example.com", f"new-pw-{i}", "notes"))
+
+
+def main():
+    writes = 0
+    append_durably = fileio.append_durably
+
+    def counting_append(*args):
+        nonlocal writes
+        writes += 1
+        append_durably(*args)
+
+    fileio.append_durably = counting_append
+
+    with tempfile.TemporaryDirectory() as tmp:
+        vault = make_vault(os.path.join(tmp, "vault.enc"), ENTRIES)
+        ids = vault.account_ids()
+
+        writes = 0
+        start = time.perf_counter()
+        for i in range(EDITS):
+            _edit(vault, ids, i)
+            vault.save()
+        sync_ms = (time.perf_counter() - start) / EDITS * 1000
+        sync_writes = writes
+
+        saver = BackgroundSaver(vault, delay=0.05)
+
+        writes = 0
+        start = time.perf_counter()
+        for i in range(EDITS):
+            _edit(vault, ids, i)
+            saver.request_save()
+        async_ms = (time.perf_counter() - start) / EDITS * 1000
+
+        saver.close()
+        async_writes = writes
+
+        vault.lock()
+
+    print(f"{ENTRIES} entries, burst of {EDITS} edits")
+    print(f"  synchronous save  : {sync_ms:8.2f} ms/edit on the caller, {sync_writes} writes")
+    print(f"  background saver  : {async_ms:8.2f} ms/edit on the caller, {async_writes} writes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+Timer overhead of auto-lock and clipboard clearing: the old polling
+threads versus the heap scheduler in core.
+
+- Wakeups over an hour, idle and with steady activity, counted on a
+  virtual clock so the hour passes instantly. The old auto-lock worker
+  woke once a second.
+- Live threads after a burst of password copies. The old code started
+  one countdown thread per copy and could not cancel it.
+
+Fails if the scheduler wakes more than once while idle, more than once
+per auto-lock period while active, or needs more than one thread
+(tests/test_scheduler.py runs the same checks).
+
+Run from the repository root:
+    python -m benchmarks.bench_scheduler
+"""
+
+import threading
+import time
+
+from clipboard import MemoryClipboard
+import core
+from core import Scheduler
+
+
+HOUR = 3600
+AUTO_LOCK = 300  # what MainWindow sets
+COPIES = 50
+CLIPBOARD_TIMEOUT = 20
+
+# Allowed scheduler wakeups over the hour: idle, it only wakes to lock;
+# active, once per auto-lock period to find the user was busy
+MAX_IDLE_WAKEUPS = 1
+MAX_ACTIVE_WAKEUPS = HOUR // AUTO_LOCK + 1
+MAX_COPY_THREADS = 1
+
+
+class _End(Exception):
+    pass
+
+
+class VirtualScheduler(Scheduler):
+    """
+    Runs on the caller's thread; waiting moves a virtual clock forward.
+    With touch_every, the user is active at that interval throughout.
+    """
+
+    def __init__(self, end: float, touch_every: float = None):
+        super().__init__(clock=lambda: self.now)
+
+        self.now = 0.0
+        self.end = end
+        self.touch_every = touch_every
+        self._thread = threading.current_thread()  # never start a worker
+
+    def _wait(self, timeout):
+        # Sleeping past the end of the hour is not a wakeup
+        if timeout is None or self.now + timeout > self.end:
+            raise _End
+
+        self.now += timeout
+        self.wakeups += 1
+
+        # touch_activity only moves a timestamp; set it to the last touch
+        if self.touch_every:
+            core._last_activity = self.now - self.now % self.touch_every
+
+    def run(self):
+        try:
+            while True:
+                self._next_due().callback()
+        except _End:
+            pass
+
+
+def auto_lock_wakeups(touch_every: float = None) -> int:
+    """
+    Wakeups of the scheduler thread over an hour of auto-lock.
+    """
+
+    scheduler = core.scheduler = VirtualScheduler(HOUR, touch_every)
+
+    core.register_auto_lock_callback(lambda: None)
+    core.set_auto_lock_timeout(AUTO_LOCK)
+    core.start_auto_lock_timer()
+
+    scheduler.run()
+    core.stop_auto_lock_timer()
+
+    return scheduler.wakeups
+
+
+def legacy_copy_threads() -> int:
+    """
+    What copy_password_safely did before: a thread per copy, counting
+    down in 1 s sleeps.
+    """
+
+    def countdown():
+        for _ in range(CLIPBOARD_TIMEOUT):
+            time.sleep(1)
+
+    before = threading.active_count()
+    for _ in range(COPIES):
+        threading.Thread(target=countdown, daemon=True).start()
+
+    return threading.active_count() - before
+
+
+def scheduler_copy_threads() -> int:
+    core.scheduler = Scheduler()
+    core.set_clipboard(MemoryClipboard())  # no clipboard needed
+
+    before = threading.active_count()
+    for i in range(COPIES):
+        core.copy_password_safely(f"pw-{i}", timeout=CLIPBOARD_TIMEOUT)
+
+    time.sleep(0.1)
+    return threading.active_count() - before
+
+
+def main():
+    idle = auto_lock_wakeups()
+    active = auto_lock_wakeups(touch_every=5)
+
+    print(f"auto-lock after {AUTO_LOCK} s, over one hour")
+    print(f"  idle            : {AUTO_LOCK:>5} wakeups polling, {idle:>3} with the scheduler (locks once)")
+    print(f"  active every 5 s: {HOUR:>5} wakeups polling, {active:>3} with the scheduler")
+
+    threads = scheduler_copy_threads()
+
+    print(f"burst of {COPIES} password copies")
+    print(f"  live threads    : {legacy_copy_threads():>5} polling, {threads:>3} with the scheduler")
+
+    assert idle == MAX_IDLE_WAKEUPS, f"idle scheduler woke {idle} times"
+    assert active <= MAX_ACTIVE_WAKEUPS, f"active scheduler woke {active} times"
+    assert threads <= MAX_COPY_THREADS, f"{threads} threads for {COPIES} copies"
+
+
+if __name__ == "__main__":
+    main()
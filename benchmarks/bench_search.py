@@ -0,0 +1,103 @@
+"""
+Per-keystroke search latency: linear scan over every account (old
+behaviour) versus the search index (every match, and the ranked top-k
+the UI lists), plus index build and update cost.
+
+Run from the repository root:
+    python -m benchmarks.bench_search [entries]
+"""
+
+import random
+import sys
+import time
+
+from models import Account
+from search_index import SearchIndex
+
+
+WORDS = ["bank", "mail", "shop", "cloud", "game", "forum", "school", "travel", "phone", "work"]
+CATEGORIES = ["Personal", "Work", "Finance", "Social", "Shopping"]
+
+# What the user types, one keystroke at a time (some with typos)
+TYPED = ["gmail", "site 4242", "bank fin", "cloud", "gmial", "fiannce", "écôle"]
+
+# Results the UI asks for (ui.main_window.SEARCH_RESULTS)
+TOP_K = 100
+
+# Frame budget for keystroke-to-results
+BUDGET_MS = 16
+
+
+def make_accounts(entries: int) -> list:
+    rng = random.Random(42)
+    accounts = []
+
+    for i in range(entries):
+        word = rng.choice(WORDS)
+        domain = rng.choice(["gmail.com", "example.com", "proton.me"])
+
+        accounts.append(Account(
+            f"Site {i} {word}",
+            f"user{i}@{domain}",
+            f"pw-{i:08d}",
+            f"{rng.choice(WORDS)} account, recovery codes in the {rng.choice(WORDS)} drawer",
+            rng.choice(CATEGORIES) if i % 10 else "École",
+        ))
+
+    return accounts
+
+
+def linear_scan(accounts: list, query: str) -> list:
+    """
+    What MainWindow._filter_accounts did before the index.
+    """
+
+    query = query.strip().lower()
+    return [a for a in accounts if query in a.name.lower()]
+
+
+def _keystrokes(fn, words) -> tuple:
+    timings = []
+
+    for word in words:
+        for n in range(1, len(word) + 1):
+            start = time.perf_counter()
+            fn(word[:n])
+            timings.append((time.perf_counter() - start) * 1000)
+
+    timings.sort()
+    return timings[len(timings) // 2], timings[-1]
+
+
+def main():
+    entries = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    accounts = make_accounts(entries)
+    record_ids = [i.to_bytes(16, "big") for i in range(entries)]
+
+    start = time.perf_counter()
+    index = SearchIndex()
+    index.add_many(zip(record_ids, accounts))
+    build = time.perf_counter() - start
+
+    scan_median, scan_worst = _keystrokes(lambda q: linear_scan(accounts, q), TYPED)
+    index_median, index_worst = _keystrokes(index.search, TYPED)
+    rank_median, rank_worst = _keystrokes(lambda q: index.rank(q, TOP_K), TYPED)
+
+    rng = random.Random(7)
+    start = time.perf_counter()
+    for _ in range(1000):
+        i = rng.randrange(entries)
+        index.add(record_ids[i], Account(f"Renamed {i}", "someone@example.com", "pw", "", "Work"))
+    update = (time.perf_counter() - start) / 1000 * 1000
+
+    print(f"{entries} entries, {sum(map(len, TYPED))} keystrokes")
+    print(f"  index build          : {build * 1000:8.0f} ms")
+    print(f"  index update         : {update:8.3f} ms/record")
+    print(f"  linear scan (name)   : {scan_median:8.2f} ms median  {scan_worst:8.2f} ms worst")
+    print(f"  index (all fields)   : {index_median:8.2f} ms median  {index_worst:8.2f} ms worst")
+    print(f"  ranked top {TOP_K:<9} : {rank_median:8.2f} ms median  {rank_worst:8.2f} ms worst"
+          f"  ({'within' if rank_worst <= BUDGET_MS else 'over'} {BUDGET_MS} ms)")
+
+
+if __name__ == "__main__":
+    main()
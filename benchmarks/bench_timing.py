@@ -0,0 +1,109 @@
+"""
+Cost of the timing instrumentation (timing.py):
+
+- per call site while timing is off: a span (span() plus the with
+  block) and a laps mark, against an empty loop
+- an unlock of a synthetic vault with timing off and on, and how many
+  instrumented calls it makes, for the share of unlock time they cost
+  while off
+- what the stats then say about where unlock time went
+
+Run from the repository root:
+    python -m benchmarks.bench_timing [entries]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+import timing
+from benchmarks.synthetic import PASSWORD, make_vault
+from vault import Vault
+
+
+CALLS = 1_000_000
+ROUNDS = 5
+
+
+def _per_call_ns(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return (time.perf_counter() - start) / CALLS * 1e9
+
+
+def _empty():
+    for _ in range(CALLS):
+        pass
+
+
+def _spans():
+    for _ in range(CALLS):
+        with timing.span("bench"):
+            pass
+
+
+def _marks():
+    laps = timing.laps("bench")
+    for _ in range(CALLS):
+        laps.mark("phase")
+
+
+def _unlock(path: str, lazy: bool) -> float:
+    timings = []
+
+    for _ in range(ROUNDS):
+        vault = Vault(path, lazy=lazy)
+        start = time.perf_counter()
+        vault.load(PASSWORD)
+        timings.append(time.perf_counter() - start)
+        vault.lock()
+
+    timings.sort()
+    return timings[len(timings) // 2]
+
+
+def main():
+    entries = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+
+    timing.disable()
+    empty = _per_call_ns(_empty)
+    span_ns = _per_call_ns(_spans) - empty
+    mark_ns = _per_call_ns(_marks) - empty
+
+    print("timing off, per call site:")
+    print(f"  span : {span_ns:6.0f} ns")
+    print(f"  mark : {mark_ns:6.0f} ns")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "vault.enc")
+        make_vault(path, entries).lock()
+
+        for lazy in (False, True):
+            label = "lazy" if lazy else "eager"
+
+            timing.disable()
+            off = _unlock(path, lazy)
+
+            # Spans recorded per unlock, and laps marks (three per record)
+            timing.reset()
+            timing.enable()
+            on = _unlock(path, lazy)
+            spans = sum(s["count"] for s in timing.stats().values()) // ROUNDS
+            marks = 3 * entries
+
+            cost = (spans * span_ns + marks * mark_ns) / 1e9
+
+            print(f"{label} unlock, {entries} entries:")
+            print(f"  timing off : {off * 1000:8.1f} ms "
+                  f"(instrumentation ~{cost * 1000:.2f} ms, {cost / off:.2%})")
+            print(f"  timing on  : {on * 1000:8.1f} ms ({on / off - 1:+.1%})")
+
+            for name, stats in timing.stats().items():
+                print(f"    {name:<18} {stats['p50_ms']:8.2f} ms")
+
+    timing.disable()
+
+
+if __name__ == "__main__":
+    main()
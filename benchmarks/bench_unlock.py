@@ -0,0 +1,147 @@
+"""
+Unlock cost along the path the app takes: main.run with the unlock and
+main windows stubbed out (no display needed), through a wrong password,
+an unlock, an auto-lock, a second unlock and a close. Checks the key is
+derived exactly once per password attempt, i.e. the unlocked vault is
+handed to MainWindow without unlocking it again, also after an
+auto-lock, and times each unlock to the main window opening.
+
+Run from the repository root:
+    python -m benchmarks.bench_unlock
+"""
+
+import os
+import tempfile
+import time
+
+import main as app
+import vault as vault_module
+from benchmarks.synthetic import PASSWORD, make_vault
+from crypto_utils import DEFAULT_KDF_PARAMS
+from vault import Vault
+
+
+ENTRIES = 1000
+ROUNDS = 5
+
+
+class _CountingKdf:
+    def __init__(self, kdf):
+        self.kdf = kdf
+        self.calls = 0
+
+    def __call__(self, *args, **kwargs):
+        self.calls += 1
+        return self.kdf(*args, **kwargs)
+
+
+class _Session:
+    """
+    Script for the stub windows: the password attempts of each unlock
+    window, and whether each main window ends in an auto-lock.
+    """
+
+    def __init__(self, attempts: list, auto_locks: list, kdf: _CountingKdf):
+        self.attempts = list(attempts)
+        self.auto_locks = list(auto_locks)
+        self.kdf = kdf
+        self.clicked_at = None
+        self.handoffs = []  # ms from the click on Unlock to the main window
+        self.kdf_calls = []  # key derivations per unlock window
+
+
+def _stub_windows(session: _Session):
+    class UnlockWindow:
+        """
+        Does with the vault what MasterPasswordWindow does: preload, then
+        load() with each password until one is accepted.
+        """
+
+        def __init__(self, on_unlock_callback, vault):
+            self.on_unlock_callback = on_unlock_callback
+            self.vault = vault
+            vault.preload()
+
+        def mainloop(self):
+            session.kdf.calls = 0
+
+            for password in session.attempts.pop(0):
+                session.clicked_at = time.perf_counter()
+
+                try:
+                    self.vault.load(password)
+                except ValueError:
+                    continue
+
+                self.vault.build_search_index()
+                self.on_unlock_callback(self.vault)
+                return
+
+    class MainStub:
+        """
+        Uses the vault the way MainWindow does (list, search, reveal, save),
+        then auto-locks or closes.
+        """
+
+        def __init__(self, vault):
+            session.handoffs.append((time.perf_counter() - session.clicked_at) * 1000)
+            assert vault.is_unlocked, "MainWindow got a locked vault"
+
+            self.vault = vault
+            self.locked = False
+
+        def mainloop(self):
+            ids = self.vault.search("site 1")
+            account = self.vault.reveal(ids[0])
+            account.notes = "edited"
+            self.vault.update_account(account.id, account)
+            self.vault.save()
+
+            self.vault.lock()
+            self.locked = session.auto_locks.pop(0)
+            session.kdf_calls.append(session.kdf.calls)
+
+    return UnlockWindow, MainStub
+
+
+def run_session(path: str) -> _Session:
+    counter = _CountingKdf(vault_module.derive_key_from_params)
+
+    # Wrong password then unlock, auto-lock, unlock again, close
+    session = _Session([["wrong password", PASSWORD], [PASSWORD]], [True, False], counter)
+    windows = app.MasterPasswordWindow, app.MainWindow
+
+    vault_module.derive_key_from_params = counter
+    app.MasterPasswordWindow, app.MainWindow = _stub_windows(session)
+
+    try:
+        app.run(Vault(path))
+    finally:
+        vault_module.derive_key_from_params = counter.kdf
+        app.MasterPasswordWindow, app.MainWindow = windows
+
+    assert not session.attempts and not session.auto_locks, "main.run stopped early"
+    assert session.kdf_calls == [2, 1], f"key derivations per unlock: {session.kdf_calls}, expected [2, 1]"
+
+    return session
+
+
+def main():
+    handoffs = []
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "vault.enc")
+        make_vault(path, ENTRIES, kdf_params=DEFAULT_KDF_PARAMS).lock()
+
+        for _ in range(ROUNDS):
+            handoffs += run_session(path).handoffs
+
+    handoffs.sort()
+
+    print(f"{ENTRIES} entries, {ROUNDS} sessions of main.run (wrong password, unlock, auto-lock, unlock)")
+    print(f"  key derivations per password attempt : 1")
+    print(f"  unlock to main window (median)       : {handoffs[len(handoffs) // 2]:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
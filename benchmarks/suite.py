@@ -0,0 +1,362 @@
+"""
+Benchmark suite: every stage between the master password and the
+account list, at several vault sizes, with machine-readable results and
+a regression check against a stored baseline.
+
+Stages (each at every size, except kdf):
+
+    kdf                  derive_key_from_params with DEFAULT_KDF_PARAMS
+    crypto.encrypt_data  encrypt_data / decrypt_data of the whole vault
+    crypto.decrypt_data  (the version 1 single-blob format)
+    serialize.to_dict    Account.to_dict / Account.from_dict over every account
+    serialize.from_dict
+    save.full            first save of a new vault (every record sealed)
+    save.edit            save after editing one account (one appended group)
+    load.eager           Vault.load, every record decrypted
+    load.lazy            Vault.load with lazy=True (INDEX frames only)
+    search.build         building the search index
+    search.keystroke     Vault.search(prefix, limit) for every keystroke of
+                         synthetic.TYPED, as MainWindow._filter_accounts does
+
+For each: median wall time over --repeat runs, throughput, per-operation
+latency percentiles where a stage is many small operations, and peak
+Python memory (tracemalloc, measured in one extra run since tracing
+slows allocations down too much to time the same run). Vaults come from
+benchmarks.synthetic and use a cheap KDF, so only the kdf stage pays for
+key derivation.
+
+Run from the repository root:
+    python -m benchmarks.suite [--sizes 1000,10000,100000] [--stages load,search]
+        [--output results.json] [--baseline benchmarks/baseline.json]
+        [--save-baseline] [--tolerance 0.25]
+
+Results are written as JSON (--output). With a baseline file, every
+stage whose median time or peak memory grew by more than the tolerance
+is reported and the exit status is 1. --save-baseline stores this run as
+the baseline instead. Baselines are only comparable on the same machine.
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.synthetic import FAST_KDF, PASSWORD, TYPED, make_accounts, make_vault
+from crypto_utils import DEFAULT_KDF_PARAMS, derive_key_from_params, encrypt_data, decrypt_data
+from models import Account
+from search_index import SearchIndex
+from vault import Vault
+
+
+DEFAULT_SIZES = (1_000, 10_000, 100_000)
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+# Results the UI asks for (ui.main_window.SEARCH_RESULTS)
+SEARCH_LIMIT = 100
+
+# Ignore changes smaller than this in absolute terms; they are noise
+MIN_TIME_DELTA = 0.002  # seconds
+MIN_MEMORY_DELTA = 1 << 20  # bytes
+
+
+# ====================================
+# Measuring
+# ====================================
+
+def measure(run, setup=None, repeat: int = 3, ops: int = 1, size: int = None,
+            per_op: bool = False) -> dict:
+    """
+    Time run(state) repeat times, with state = setup() built fresh (and
+    untimed) before each run, then trace its peak memory in one more run.
+    ops is the number of operations one run does and size the bytes it
+    processes, for throughput. With per_op, run returns the latency of
+    each operation (seconds), for percentiles.
+    """
+
+    timings = []
+    latencies = []
+
+    for _ in range(repeat):
+        state = setup() if setup is not None else None
+        gc.collect()
+
+        start = time.perf_counter()
+        result = run(state)
+        timings.append(time.perf_counter() - start)
+
+        if per_op:
+            latencies += result
+
+    state = setup() if setup is not None else None
+    gc.collect()
+
+    tracemalloc.start()
+    run(state)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    timings.sort()
+    median = timings[len(timings) // 2]
+
+    stats = {
+        "median_s": median,
+        "min_s": timings[0],
+        "ops": ops,
+        "ops_per_s": ops / median if median else None,
+        "peak_bytes": peak,
+    }
+
+    if size is not None:
+        stats["mb_per_s"] = size / median / 1e6 if median else None
+
+    if latencies:
+        latencies.sort()
+        for name, fraction in (("p50_ms", 0.50), ("p95_ms", 0.95), ("p99_ms", 0.99)):
+            stats[name] = latencies[min(len(latencies) - 1, int(len(latencies) * fraction))] * 1000
+
+    return stats
+
+
+def _keystrokes():
+    return [word[:n] for word in TYPED for n in range(1, len(word) + 1)]
+
+
+# ====================================
+# Stages
+# ====================================
+
+def bench_kdf(repeat: int) -> dict:
+    salt = os.urandom(16)
+    return measure(lambda _: derive_key_from_params(PASSWORD, salt, DEFAULT_KDF_PARAMS), repeat=repeat)
+
+
+def bench_size(stages, entries: int, options: dict, repeat: int, tmp: str) -> dict:
+    """
+    Results of the selected stages at one vault size, keyed "stage@entries".
+    """
+
+    results = {}
+    accounts = list(make_accounts(entries, **options))
+    dicts = [a.to_dict() for a in accounts]
+
+    def add(stage: str, stats: dict):
+        results[f"{stage}@{entries}"] = {"stage": stage, "entries": entries, **stats}
+        print(f"  {stage + '@' + str(entries):<28} {_describe(stats)}", flush=True)
+
+    if _selected(stages, "crypto"):
+        key = derive_key_from_params(PASSWORD, os.urandom(16), FAST_KDF)
+        document = {"accounts": dicts}
+        blob = encrypt_data(key, document)
+
+        add("crypto.encrypt_data", measure(lambda _: encrypt_data(key, document), repeat=repeat,
+                                           ops=entries, size=len(blob)))
+        add("crypto.decrypt_data", measure(lambda _: decrypt_data(key, blob), repeat=repeat,
+                                           ops=entries, size=len(blob)))
+
+    if _selected(stages, "serialize"):
+        add("serialize.to_dict", measure(lambda _: [a.to_dict() for a in accounts],
+                                         repeat=repeat, ops=entries))
+        add("serialize.from_dict", measure(lambda _: [Account.from_dict(d) for d in dicts],
+                                           repeat=repeat, ops=entries))
+
+    path = os.path.join(tmp, f"vault-{entries}.enc")
+
+    if _selected(stages, "save"):
+        def new_vault():
+            vault = Vault(path)
+            vault.create_new(PASSWORD, FAST_KDF)
+            vault.add_accounts(Account.from_dict(d) for d in dicts)
+            return vault
+
+        add("save.full", measure(lambda vault: vault.save(), new_vault, repeat=repeat, ops=entries))
+
+    # Every later stage reads this file
+    make_vault(path, entries, **options).lock()
+
+    if _selected(stages, "save"):
+        def edited_vault():
+            vault = Vault(path, lazy=True)
+            vault.load(PASSWORD)
+            account_id = vault.account_ids()[entries // 2]
+            vault.update_account(account_id, Account.from_dict(dicts[entries // 2]))
+            return vault
+
+        add("save.edit", measure(lambda vault: vault.save(), edited_vault, repeat=repeat))
+
+    if _selected(stages, "load"):
+        file_size = os.path.getsize(path)
+
+        for lazy, stage in ((False, "load.eager"), (True, "load.lazy")):
+            def load(_, lazy=lazy):
+                vault = Vault(path, lazy=lazy)
+                vault.load(PASSWORD)
+                vault.lock()
+
+            add(stage, measure(load, repeat=repeat, ops=entries, size=file_size))
+
+    if _selected(stages, "search"):
+        items = [(i.to_bytes(16, "big"), a) for i, a in enumerate(accounts)]
+        add("search.build", measure(lambda _: SearchIndex().add_many(items), repeat=repeat, ops=entries))
+
+        vault = Vault(path, lazy=True)
+        vault.load(PASSWORD)
+        vault.build_search_index()  # outside the timings
+        queries = _keystrokes()
+
+        def type_queries(_):
+            latencies = []
+
+            for query in queries:
+                start = time.perf_counter()
+                vault.search(query, limit=SEARCH_LIMIT)
+                latencies.append(time.perf_counter() - start)
+
+            return latencies
+
+        add("search.keystroke", measure(type_queries, repeat=repeat, ops=len(queries), per_op=True))
+        vault.lock()
+
+    return results
+
+
+def _selected(stages, group: str) -> bool:
+    return stages is None or group in stages
+
+
+def _describe(stats: dict) -> str:
+    text = f"{stats['median_s'] * 1000:10.1f} ms"
+
+    if stats["ops"] > 1:
+        text += f"  {stats['ops_per_s']:12,.0f} ops/s"
+    if "mb_per_s" in stats:
+        text += f"  {stats['mb_per_s']:8.1f} MB/s"
+    if "p99_ms" in stats:
+        text += f"  p50 {stats['p50_ms']:6.2f} ms  p99 {stats['p99_ms']:6.2f} ms"
+
+    return text + f"  peak {stats['peak_bytes'] / 1e6:8.1f} MB"
+
+
+# ====================================
+# Baseline
+# ====================================
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """
+    Stages that got slower or bigger than baseline by more than
+    tolerance (a fraction). Returns a list of messages.
+    """
+
+    regressions = []
+
+    for name, current in results.items():
+        before = baseline.get(name)
+        if before is None:
+            continue
+
+        for metric, floor, unit, scale in (("median_s", MIN_TIME_DELTA, "ms", 1000),
+                                           ("peak_bytes", MIN_MEMORY_DELTA, "MB", 1e-6)):
+            old, new = before[metric], current[metric]
+
+            if new > old * (1 + tolerance) and new - old > floor:
+                regressions.append(
+                    f"{name}: {metric} {old * scale:.1f} -> {new * scale:.1f} {unit} "
+                    f"(+{(new / old - 1) * 100 if old else float('inf'):.0f}%)"
+                )
+
+    return regressions
+
+
+def environment() -> dict:
+    try:
+        from cryptography import __version__ as cryptography_version
+    except ImportError:
+        cryptography_version = None
+
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "cryptography": cryptography_version,
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Run the vault benchmark suite.")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)),
+                        help="comma-separated entry counts (default: %(default)s)")
+    parser.add_argument("--stages", help="comma-separated stage groups: kdf, crypto, serialize, "
+                                         "save, load, search (default: all)")
+    parser.add_argument("--note-size", type=int, default=64, help="bytes of notes per entry")
+    parser.add_argument("--categories", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per stage (median kept)")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="baseline JSON (default: %(default)s)")
+    parser.add_argument("--save-baseline", action="store_true", help="store this run as the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed slowdown or growth before flagging, as a fraction (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    sizes = [int(size) for size in args.sizes.split(",") if size]
+    stages = set(args.stages.split(",")) if args.stages else None
+    options = {"note_size": args.note_size, "categories": args.categories, "seed": args.seed}
+
+    results = {}
+
+    if _selected(stages, "kdf"):
+        stats = bench_kdf(args.repeat)
+        results["kdf"] = {"stage": "kdf", "entries": None, **stats}
+        print(f"  {'kdf':<28} {_describe(stats)}", flush=True)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for entries in sizes:
+            results.update(bench_size(stages, entries, options, args.repeat, tmp))
+
+    report = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "environment": environment(),
+        "config": {"sizes": sizes, "repeat": args.repeat, **options},
+        "results": results,
+    }
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --save-baseline to store one.")
+        return 0
+
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+
+    if baseline.get("config", {}).get("note_size") != args.note_size:
+        print("Warning: the baseline was taken with a different note size.")
+
+    regressions = compare(results, baseline["results"], args.tolerance)
+
+    if regressions:
+        print(f"{len(regressions)} regression(s) against {args.baseline}:")
+        for message in regressions:
+            print(f"  {message}")
+        return 1
+
+    print(f"No regressions against {args.baseline} (tolerance {args.tolerance:.0%}).")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
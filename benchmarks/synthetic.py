@@ -0,0 +1,84 @@
+"""
+Synthetic vaults for benchmarks: reproducible accounts with a chosen
+entry count, note size and number of categories.
+
+Also usable on its own, to get a big vault to try the app with:
+    python -m benchmarks.synthetic OUT.enc [--entries N] [--note-size B] [--categories C]
+(the master password is PASSWORD below).
+"""
+
+import argparse
+import random
+
+from crypto_utils import DEFAULT_KDF_PARAMS
+from models import Account
+from vault import Vault
+
+
+PASSWORD = "correct horse battery staple"
+
+# Cheap key derivation, so benchmarks of everything else don't time the KDF
+FAST_KDF = {"algorithm": "pbkdf2-sha256", "iterations": 1000}
+
+WORDS = ["bank", "mail", "shop", "cloud", "game", "forum", "school", "travel", "phone", "work",
+         "music", "news", "health", "energy", "video", "photo", "code", "chat", "store", "home"]
+DOMAINS = ["gmail.com", "example.com", "proton.me", "outlook.com"]
+
+# What a user types into the search field, one keystroke at a time (some with typos)
+TYPED = ["gmail", "site 4242", "bank", "cloud work", "gmial", "fiannce", "photo"]
+
+
+def make_accounts(entries: int, note_size: int = 64, categories: int = 8, seed: int = 42):
+    """
+    Yield entries accounts; the same arguments always give the same accounts.
+    """
+
+    rng = random.Random(seed)
+    names = [f"Category {c}" for c in range(categories)] or [""]
+    filler = " ".join(WORDS)
+
+    for i in range(entries):
+        word = rng.choice(WORDS)
+        notes = (f"{rng.choice(WORDS)} account. " + filler * (note_size // len(filler) + 1))[:note_size]
+
+        yield Account(
+            f"Site {i} {word}",
+            f"user{i}@{rng.choice(DOMAINS)}",
+            f"pw-{rng.getrandbits(64):016x}",
+            notes,
+            names[i % len(names)],
+        )
+
+
+def make_vault(path: str, entries: int, note_size: int = 64, categories: int = 8,
+               kdf_params: dict = None, seed: int = 42) -> Vault:
+    """
+    Create a vault file at path holding make_accounts(...), saved and
+    still unlocked. Uses FAST_KDF unless kdf_params is given.
+    """
+
+    vault = Vault(path)
+    vault.create_new(PASSWORD, kdf_params or FAST_KDF)
+    vault.add_accounts(make_accounts(entries, note_size, categories, seed))
+    vault.save()
+
+    return vault
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a synthetic vault.")
+    parser.add_argument("output")
+    parser.add_argument("--entries", type=int, default=10_000)
+    parser.add_argument("--note-size", type=int, default=64, help="bytes of notes per entry")
+    parser.add_argument("--categories", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    # A real KDF: this vault is meant to be opened by hand
+    make_vault(args.output, args.entries, args.note_size, args.categories,
+               kdf_params=DEFAULT_KDF_PARAMS, seed=args.seed).lock()
+    print(f"Wrote {args.entries} entries to {args.output}; password: {PASSWORD}")
+
+
+if __name__ == "__main__":
+    main()
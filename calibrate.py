@@ -0,0 +1,49 @@
+"""
+Pick KDF settings that make unlocking take about a target time on this
+machine, and optionally apply them to an existing vault.
+
+    python calibrate.py                       # PBKDF2, 300 ms
+    python calibrate.py --target-ms 500 --kdf scrypt
+    python calibrate.py --apply vault.enc     # re-encrypt vault.enc with the result
+"""
+
+import argparse
+import getpass
+import json
+import time
+
+from crypto_utils import calibrate_kdf, derive_key_from_params
+from vault import Vault
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Calibrate the vault key derivation cost.")
+    parser.add_argument("--target-ms", type=float, default=300, help="target unlock latency")
+    parser.add_argument("--kdf", choices=["pbkdf2-sha256", "scrypt"], default="pbkdf2-sha256")
+    parser.add_argument("--apply", metavar="VAULT", help="re-encrypt this vault with the new settings")
+    args = parser.parse_args()
+
+    params = calibrate_kdf(args.target_ms, args.kdf)
+
+    start = time.perf_counter()
+    derive_key_from_params("calibration", b"\0" * 16, params)
+    elapsed = (time.perf_counter() - start) * 1000
+
+    print(json.dumps(params))
+    print(f"Measured: {elapsed:.0f} ms per unlock (target {args.target_ms:.0f} ms)")
+
+    if not args.apply:
+        return
+
+    password = getpass.getpass("Master password: ")
+
+    vault = Vault(args.apply)
+    vault.load(password)
+    vault.rekey(password, params)
+    vault.lock()
+
+    print(f"{args.apply} re-encrypted with the new settings.")
+
+
+if __name__ == "__main__":
+    main()
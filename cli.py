@@ -0,0 +1,419 @@
+"""
+Headless access to a vault, for scripts. Never imports tkinter.
+
+    python cli.py list [--json]
+    python cli.py get REF [--field password]
+    python cli.py add --name NAME [--username U] [--password P] [--notes N] [--category C]
+    python cli.py update REF [--name NAME] [--username U] ...
+    python cli.py delete REF
+    python cli.py search QUERY [--limit N] [--json]
+    python cli.py export [--output FILE] [--format json|csv]
+    python cli.py import FILE [--format csv|json]
+    python cli.py batch < ops.jsonl
+    python cli.py backup [--keep N]
+    python cli.py backups
+    python cli.py restore NUMBER FILE
+
+REF is an account id (hex, as printed by list) or an exact account name.
+backup, backups and restore work on the encrypted snapshots kept next to
+the vault (see backup.py) and need no password. The master password is read from the environment variable named by
+--password-env (VAULT_PASSWORD by default) or prompted for on the
+terminal.
+
+batch reads one JSON operation per line and writes one JSON result per
+line. All operations share a single unlock and a single save, and
+nothing is saved unless every operation succeeds:
+
+    {"op": "add", "account": {"name": "Gmail", "username": "me", "password": "..."}}
+    {"op": "update", "ref": "Gmail", "fields": {"password": "..."}}
+    {"op": "delete", "ref": "3f2a..."}
+    {"op": "get", "ref": "Gmail"}
+    {"op": "search", "query": "mail", "limit": 10}
+    {"op": "list"}
+"""
+
+import argparse
+import getpass
+import json
+import os
+import sys
+import time
+
+from backup import DEFAULT_KEEP
+from models import Account
+from vault import Vault
+
+
+# Fields an add or update may set
+EDITABLE_FIELDS = ("name", "username", "password", "notes", "category")
+
+DEFAULT_PASSWORD_ENV = "VAULT_PASSWORD"
+
+# Commands that open the vault lazily: only the INDEX frames are decrypted
+# up front, bodies on demand (export reveals and drops them one at a
+# time). search and batch need every body, since the search index of a
+# lazy vault never sees usernames or notes, and import needs them to find
+# duplicates.
+LAZY_COMMANDS = ("list", "get", "add", "update", "delete", "export")
+
+# How batch and agent errors name the type a field should have
+OP_FIELD_TYPES = {str: "a string", int: "an integer", dict: "a JSON object"}
+
+
+class CliError(Exception):
+    """
+    A request that can't be carried out (unknown account, bad operation).
+    """
+
+
+# ====================================
+# Accounts
+# ====================================
+
+def find_account(vault: Vault, ref: str) -> bytes:
+    """
+    Id of the account ref names: its hex id, or else its exact name.
+    """
+
+    try:
+        account_id = bytes.fromhex(ref)
+    except ValueError:
+        account_id = None
+
+    if account_id is not None and vault.get(account_id) is not None:
+        return account_id
+
+    matches = [a.id for a in vault.accounts if a.name == ref]
+
+    if not matches:
+        raise CliError(f"No account {ref!r}.")
+    if len(matches) > 1:
+        raise CliError(f"{len(matches)} accounts are named {ref!r}; use the id.")
+
+    return matches[0]
+
+
+def summary(account: Account) -> dict:
+    """
+    What list and search show: no secrets, nothing that needs decrypting.
+    """
+
+    return {"id": account.id.hex(), "name": account.name, "category": account.category}
+
+
+def add_account(vault: Vault, fields: dict) -> bytes:
+    _check_fields(fields)
+
+    if not fields.get("name"):
+        raise CliError("An account needs a name.")
+
+    return vault.add_account(Account.from_dict(fields))
+
+
+def update_account(vault: Vault, ref: str, fields: dict) -> bytes:
+    _check_fields(fields)
+
+    account_id = find_account(vault, ref)
+    updated = vault.reveal(account_id).to_dict()
+    updated.update(fields)
+
+    vault.update_account(account_id, Account.from_dict(updated))
+    return account_id
+
+
+def _check_fields(fields: dict):
+    unknown = set(fields) - set(EDITABLE_FIELDS)
+
+    if unknown:
+        raise CliError(f"Unknown field(s): {', '.join(sorted(unknown))}.")
+
+    for field, value in fields.items():
+        if not isinstance(value, str):
+            raise CliError(f"{field} must be a string.")
+
+
+# ====================================
+# Batch
+# ====================================
+
+def run_op(vault: Vault, op: dict) -> dict:
+    """
+    Apply one batch operation and return its result.
+    """
+
+    kind = op.get("op")
+
+    if kind == "list":
+        return {"accounts": [summary(a) for a in vault.accounts]}
+
+    if kind == "search":
+        limit = _op_field(op, "limit", int, None)
+        if limit is not None and limit < 0:
+            raise CliError("limit must not be negative.")
+
+        ids = vault.search(_op_field(op, "query", str, ""), limit=limit)
+        return {"accounts": [summary(vault.get(i)) for i in ids]}
+
+    if kind == "get":
+        account = vault.reveal(find_account(vault, _op_field(op, "ref", str, "")))
+        return {"account": account.to_dict()}
+
+    if kind == "add":
+        account_id = add_account(vault, _op_field(op, "account", dict, {}))
+        return {"id": account_id.hex()}
+
+    if kind == "update":
+        account_id = update_account(vault, _op_field(op, "ref", str, ""), _op_field(op, "fields", dict, {}))
+        return {"id": account_id.hex()}
+
+    if kind == "delete":
+        account_id = find_account(vault, _op_field(op, "ref", str, ""))
+        vault.delete_account(account_id)
+        return {"id": account_id.hex()}
+
+    raise CliError(f"Unknown op {kind!r}.")
+
+
+def _op_field(op: dict, key: str, kind: type, default):
+    """
+    op[key], or default when it is missing or null. Raises CliError if it
+    is not of type kind.
+    """
+
+    value = op.get(key)
+
+    if value is None:
+        return default
+
+    # bool is an int, but {"limit": true} is a mistake
+    if isinstance(value, bool) or not isinstance(value, kind):
+        raise CliError(f"{key} must be {OP_FIELD_TYPES[kind]}.")
+
+    return value
+
+
+def run_batch(vault: Vault, lines, out) -> bool:
+    """
+    Run the operations in lines, writing a result per line to out.
+    Stops at the first failure. Returns True if every operation succeeded.
+    """
+
+    for number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+
+        try:
+            op = json.loads(line)
+            if not isinstance(op, dict):
+                raise CliError("An operation must be a JSON object.")
+
+            result = run_op(vault, op)
+        except (CliError, ValueError) as e:
+            out.write(json.dumps({"ok": False, "line": number, "error": str(e)}) + "\n")
+            return False
+
+        out.write(json.dumps({"ok": True, **result}) + "\n")
+
+    return True
+
+
+# ====================================
+# Command line
+# ====================================
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Headless access to a password vault.")
+    parser.add_argument("--vault", default="vault.enc", help="vault file (default: vault.enc)")
+    parser.add_argument("--password-env", default=DEFAULT_PASSWORD_ENV, metavar="NAME",
+                        help=f"environment variable holding the master password (default: {DEFAULT_PASSWORD_ENV})")
+
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    list_cmd = commands.add_parser("list", help="list accounts (no secrets)")
+    list_cmd.add_argument("--json", action="store_true", help="one JSON object per line")
+
+    get_cmd = commands.add_parser("get", help="show one account")
+    get_cmd.add_argument("ref")
+    get_cmd.add_argument("--field", choices=EDITABLE_FIELDS, help="print only this field")
+
+    add_cmd = commands.add_parser("add", help="add an account and print its id")
+    update_cmd = commands.add_parser("update", help="change fields of an account")
+    update_cmd.add_argument("ref")
+
+    for cmd in (add_cmd, update_cmd):
+        for field in EDITABLE_FIELDS:
+            cmd.add_argument(f"--{field}")
+
+    delete_cmd = commands.add_parser("delete", help="delete an account")
+    delete_cmd.add_argument("ref")
+
+    search_cmd = commands.add_parser("search", help="search accounts, best matches first")
+    search_cmd.add_argument("query")
+    search_cmd.add_argument("--limit", type=int, default=20)
+    search_cmd.add_argument("--json", action="store_true", help="one JSON object per line")
+
+    export_cmd = commands.add_parser("export", help="write every account as plaintext JSON or CSV")
+    export_cmd.add_argument("--output", help="file to write (default: stdout)")
+    export_cmd.add_argument("--format", choices=["json", "csv"],
+                            help="default: from the output extension, else json")
+
+    import_cmd = commands.add_parser("import", help="add accounts from a CSV or JSON export")
+    import_cmd.add_argument("file")
+    import_cmd.add_argument("--format", choices=["csv", "json"], help="default: from the file extension")
+
+    commands.add_parser("batch", help="apply JSON operations from stdin, one per line")
+
+    backup_cmd = commands.add_parser("backup", help="take an encrypted snapshot of the vault file")
+    backup_cmd.add_argument("--keep", type=int, default=DEFAULT_KEEP,
+                            help=f"snapshots to keep (default: {DEFAULT_KEEP})")
+
+    commands.add_parser("backups", help="list the snapshots")
+
+    restore_cmd = commands.add_parser("restore", help="write a snapshot out as a vault file")
+    restore_cmd.add_argument("number", type=int)
+    restore_cmd.add_argument("file", help="new vault file (must not exist)")
+
+    return parser
+
+
+def read_password(env_name: str) -> str:
+    password = os.environ.get(env_name)
+
+    if password is None:
+        try:
+            password = getpass.getpass("Master password: ")
+        except EOFError:
+            # No terminal to prompt on (closed or redirected stdin)
+            raise CliError(f"No master password given (set ${env_name}).")
+
+    return password
+
+
+def _print_summaries(accounts, as_json: bool):
+    for account in accounts:
+        if as_json:
+            print(json.dumps(summary(account)))
+        else:
+            print(f"{account.id.hex()}\t{account.name}\t{account.category}")
+
+
+def _export(vault: Vault, path: str, fmt: str):
+    from exporter import export_file, WRITERS
+
+    if path is None:
+        WRITERS[fmt or "json"](vault, sys.stdout)
+    else:
+        export_file(vault, path, fmt)
+
+
+def _run_backups(args) -> int:
+    from backup import BackupStore, default_backup_dir
+
+    store = BackupStore(default_backup_dir(args.vault), keep=getattr(args, "keep", DEFAULT_KEEP))
+
+    if args.command == "backup":
+        if not os.path.exists(args.vault):
+            raise CliError(f"No vault at {args.vault}.")
+
+        number = store.snapshot(args.vault)
+        print("Unchanged since the last snapshot." if number is None else f"Snapshot {number}.")
+
+    elif args.command == "backups":
+        for number in store.snapshots():
+            manifest = store.manifest(number)
+            created = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(manifest["created"]))
+            print(f"{number}\t{created}\t{manifest['records']} accounts")
+
+        print(f"{store.disk_usage()} bytes on disk", file=sys.stderr)
+
+    else:
+        if os.path.exists(args.file):
+            raise CliError(f"{args.file} already exists.")
+
+        store.restore(args.number, args.file)
+        print(f"Restored snapshot {args.number} to {args.file}.")
+
+    return 0
+
+
+def run(args) -> int:
+    if args.command in ("backup", "backups", "restore"):
+        return _run_backups(args)
+
+    vault = Vault(args.vault, lazy=args.command in LAZY_COMMANDS)
+
+    # Only this one: a missing import file or export directory is reported
+    # by name, like any other OSError
+    if not os.path.exists(args.vault):
+        raise CliError(f"No vault at {args.vault}.")
+
+    vault.load(read_password(args.password_env))
+
+    try:
+        command = args.command
+        changed = False
+
+        if command == "list":
+            _print_summaries(vault.accounts, args.json)
+
+        elif command == "search":
+            _print_summaries((vault.get(i) for i in vault.search(args.query, limit=args.limit)), args.json)
+
+        elif command == "get":
+            account = vault.reveal(find_account(vault, args.ref))
+
+            if args.field:
+                print(getattr(account, args.field))
+            else:
+                print(json.dumps(account.to_dict(), indent=2))
+
+        elif command == "add":
+            fields = {f: getattr(args, f) for f in EDITABLE_FIELDS if getattr(args, f) is not None}
+            print(add_account(vault, fields).hex())
+            changed = True
+
+        elif command == "update":
+            fields = {f: getattr(args, f) for f in EDITABLE_FIELDS if getattr(args, f) is not None}
+            update_account(vault, args.ref, fields)
+            changed = True
+
+        elif command == "delete":
+            vault.delete_account(find_account(vault, args.ref))
+            changed = True
+
+        elif command == "export":
+            _export(vault, args.output, args.format)
+
+        elif command == "import":
+            from importer import import_file
+
+            stats = import_file(vault, args.file, args.format)
+            print(f"Imported {stats['imported']}, skipped {stats['duplicates']} duplicates "
+                  f"and {stats['skipped']} entries without a name.")
+            changed = stats["imported"] > 0
+
+        elif command == "batch":
+            if not run_batch(vault, sys.stdin, sys.stdout):
+                return 1
+            changed = True
+
+        if changed:
+            vault.save()
+    finally:
+        vault.lock()
+
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    try:
+        return run(args)
+    except (CliError, ValueError, OSError) as e:
+        parser.exit(1, f"error: {e}\n")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
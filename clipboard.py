@@ -0,0 +1,72 @@
+"""
+Clipboard backends. Each has copy(text) and paste() -> str or None
+(None when the clipboard is empty or can't be read).
+
+    tk        : the Tk clipboard of a window, in process. Must be used
+                from the Tk thread.
+    pyperclip : pyperclip, the fallback without a window. On Linux it
+                runs xclip/xsel in a subprocess on every call.
+    memory    : a plain attribute, for tests and benchmarks.
+"""
+
+
+class TkClipboard:
+    """
+    The clipboard of a Tk window; no subprocess per copy.
+    """
+
+    name = "tk"
+
+    def __init__(self, widget):
+        self.widget = widget
+
+    def copy(self, text: str):
+        self.widget.clipboard_clear()
+        self.widget.clipboard_append(text)
+
+    def paste(self):
+        import tkinter as tk
+
+        try:
+            return self.widget.clipboard_get()
+        except tk.TclError:
+            return None
+
+
+class PyperclipClipboard:
+    """
+    The system clipboard through pyperclip (imported on first use).
+    """
+
+    name = "pyperclip"
+
+    def copy(self, text: str):
+        import pyperclip
+        pyperclip.copy(text)
+
+    def paste(self):
+        import pyperclip
+
+        try:
+            return pyperclip.paste()
+        except pyperclip.PyperclipException:
+            return None
+
+
+class MemoryClipboard:
+    """
+    In-memory stand-in that records what was copied.
+    """
+
+    name = "memory"
+
+    def __init__(self):
+        self.text = None
+        self.copies = 0
+
+    def copy(self, text: str):
+        self.text = text
+        self.copies += 1
+
+    def paste(self):
+        return self.text
@@ -1,24 +1,207 @@
+import functools
+import heapq
+import itertools
+import math
 import threading
 import time
 import secrets
-import pyperclip
+
+from clipboard import PyperclipClipboard
+
+# ============================================================
+# TIMER SCHEDULER
+# One thread sleeps until the earliest deadline; clipboard
+# clearing and auto-lock are both timers on it
+# ============================================================
+
+
+class Timer:
+    """
+    Handle for a callback scheduled on a Scheduler.
+    Deadlines are scheduler.clock() values (time.monotonic by default).
+    A Timer created directly is armed by its first reschedule().
+    """
+
+    def __init__(self, scheduler, deadline: float, callback):
+        self.scheduler = scheduler
+        self.deadline = deadline
+        self.callback = callback
+        self.cancelled = False
+        self._entry = None  # its live heap entry; older entries are stale
+
+    def cancel(self):
+        """
+        Stop the callback from running (if it hasn't started yet).
+        """
+
+        self.scheduler.cancel(self)
+
+    def reschedule(self, deadline: float):
+        """
+        Move the deadline, earlier or later. Also re-arms a timer from
+        inside its own callback. Does nothing once cancelled.
+        """
+
+        self.scheduler.reschedule(self, deadline)
+
+
+class Scheduler:
+    """
+    Runs timer callbacks on a single daemon thread.
+
+    Timers live in a min-heap ordered by deadline, so the thread waits
+    exactly until the next one is due and is only woken early when an
+    earlier deadline is added. Cancelling or moving a timer leaves its
+    old heap entry behind as stale; stale entries are skipped (and the
+    heap rebuilt once they outnumber live ones) instead of searched for.
+    """
+
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+
+        self._heap = []  # (deadline, sequence, timer)
+        self._sequence = itertools.count()  # tie-break, keeps the heap from comparing timers
+        self._live = 0
+        self._condition = threading.Condition()
+        self._thread = None
+
+        self.wakeups = 0  # times the thread woke up, for benchmarks
+
+    def call_at(self, deadline: float, callback) -> Timer:
+        timer = Timer(self, deadline, callback)
+
+        with self._condition:
+            self._live += 1
+            self._push(timer, deadline)
+
+        return timer
+
+    def call_later(self, delay: float, callback) -> Timer:
+        return self.call_at(self.clock() + delay, callback)
+
+    def cancel(self, timer: Timer):
+        with self._condition:
+            if timer.cancelled:
+                return
+
+            timer.cancelled = True
+
+            if timer._entry is not None:
+                timer._entry = None
+                self._live -= 1
+
+    def reschedule(self, timer: Timer, deadline: float):
+        with self._condition:
+            if timer.cancelled:
+                return
+
+            if timer._entry is None:
+                self._live += 1  # re-armed after (or while) running
+
+            self._push(timer, deadline)
+
+    def pending(self) -> int:
+        """
+        Number of timers waiting to run.
+        """
+
+        with self._condition:
+            return self._live
+
+    def _push(self, timer: Timer, deadline: float):
+        # Called with the condition held
+        timer.deadline = deadline
+        timer._entry = (deadline, next(self._sequence), timer)
+
+        # Only an earlier head changes how long the thread should sleep
+        wake = not self._heap or deadline < self._heap[0][0]
+
+        heapq.heappush(self._heap, timer._entry)
+
+        if len(self._heap) > 64 and len(self._heap) > 2 * self._live:
+            self._heap = [entry for entry in self._heap if entry[2]._entry is entry]
+            heapq.heapify(self._heap)
+
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="scheduler", daemon=True)
+            self._thread.start()
+        elif wake:
+            self._condition.notify()
+
+    def _run(self):
+        while True:
+            timer = self._next_due()
+
+            try:
+                timer.callback()
+            except Exception as e:
+                print("Scheduled callback error:", e)
+
+    def _next_due(self) -> Timer:
+        """
+        Sleep until the earliest live timer is due, then take it off the heap.
+        """
+
+        with self._condition:
+            while True:
+                # Drop cancelled and moved entries from the top
+                while self._heap and self._heap[0][2]._entry is not self._heap[0]:
+                    heapq.heappop(self._heap)
+
+                if not self._heap:
+                    self._wait(None)
+                    continue
+
+                deadline, _, timer = self._heap[0]
+                delay = deadline - self.clock()
+
+                if delay > 0:
+                    self._wait(delay)
+                    continue
+
+                heapq.heappop(self._heap)
+                timer._entry = None
+                self._live -= 1
+                return timer
+
+    def _wait(self, timeout):
+        self._condition.wait(timeout)
+        self.wakeups += 1
+
+
+# Shared by everything below
+scheduler = Scheduler()
+
 
 # ============================================================
 # GLOBAL STATE — CLIPBOARD MANAGEMENT
 # ============================================================
 
-# Timer thread for clearing the clipboard
+# Where copies go (see clipboard.py); the UI sets its Tk clipboard
+_clipboard = PyperclipClipboard()
+
+# Runs a call on the thread the backend needs (e.g. Dispatcher.post);
+# None runs it right away on the scheduler thread
+_clipboard_run = None
+
+# Timer for the running clipboard countdown
 _clipboard_timer = None
 
+# Password the running countdown will clear, if it is still there
+_clipboard_secret = None
+
 # UI callback for countdown updates (UI sets this)
 _clipboard_callback = None
 
+# Makes copy, cancel and clear one step each
+_clipboard_lock = threading.Lock()
+
 
 # ============================================================
 # GLOBAL STATE — AUTO-LOCK SYSTEM
 # ============================================================
 
-# Timer thread for auto-lock
+# Timer for auto-lock
 _auto_lock_timer = None
 
 # Callback the UI registers (UI calls register_auto_lock_callback)
@@ -27,87 +210,154 @@ _auto_lock_callback = None
 # Default timeout (in seconds) before auto-lock triggers
 _auto_lock_timeout = 600  # 10 minutes
 
-# Last moment the user interacted with the UI
-_last_activity = time.time()
+# Last moment the user interacted with the UI (time.monotonic)
+_last_activity = time.monotonic()
 
 
 # ============================================================
-# CLIPBOARD CLEARING WORKER
-# Runs in background to clear clipboard securely
+# CLIPBOARD CLEARING
+# A timer ticks once a second to update the UI, then clears
+# the clipboard securely
 # ============================================================
 
-def _clipboard_clear_worker(timeout: int, callback):
+def set_clipboard(backend, run=None):
+    """
+    Use backend (see clipboard.py) for every copy and clear.
+    run(function) must run function on the thread the backend needs,
+    e.g. the Tk thread for TkClipboard; None calls it in place.
+    """
+
+    global _clipboard, _clipboard_run
+
+    _clipboard = backend
+    _clipboard_run = run
+
+
+def copy_to_clipboard(text: str):
+    """
+    Copy something that isn't secret (e.g. a username); no countdown.
+    """
+
+    with _clipboard_lock:
+        _clipboard.copy(text)
+
+
+def _clear_if_unchanged(timer: Timer):
     """
-    Background thread:
-    - Counts down
+    Overwrite the clipboard, but only if it still holds the password we
+    put there: whatever the user copied since is left alone.
+    """
+
+    global _clipboard_secret
+
+    with _clipboard_lock:
+        if timer.cancelled or _clipboard_secret is None:
+            return  # A newer copy took over, or it was already cleared
+
+        if _clipboard.paste() == _clipboard_secret:
+            # Overwrite clipboard with secure random junk
+            _clipboard.copy(secrets.token_hex(16))
+
+        _clipboard_secret = None
+
+
+def _clipboard_tick(timer: Timer, deadline: float, callback):
+    """
+    Scheduler callback:
     - Sends countdown updates to UI
     - Overwrites clipboard with random data when done
     """
 
-    try:
-        for remaining in range(timeout, 0, -1):
-            if callback:
-                callback(remaining)
-            time.sleep(1)
+    if timer.cancelled:
+        return  # A newer copy took over
+
+    remaining = math.ceil(deadline - scheduler.clock())
 
-        # Overwrite clipboard with secure random junk on timeout
-        junk = secrets.token_hex(16)
-        pyperclip.copy(junk)
+    if remaining > 0:
+        # Next tick when the countdown drops by one
+        timer.reschedule(deadline - (remaining - 1))
 
         if callback:
-            callback(0)  # Signal completion
+            callback(remaining)
+        return
 
-    except Exception as e:
-        print("Clipboard clear error:", e)
+    if _clipboard_run is None:
+        _clear_if_unchanged(timer)
+    else:
+        _clipboard_run(functools.partial(_clear_if_unchanged, timer))
+
+    if callback:
+        callback(0)  # Signal completion
 
 
 def copy_password_safely(password: str, timeout: int = 20, callback=None):
     """
     Public function for UI:
     - Copies password to clipboard
-    - Starts countdown to auto-clear
+    - Starts countdown to auto-clear (replacing any running one)
     - Sends updates to UI through callback
     """
 
-    global _clipboard_timer, _clipboard_callback
+    global _clipboard_timer, _clipboard_secret, _clipboard_callback
+
+    with _clipboard_lock:
+        # Copy password immediately
+        _clipboard.copy(password)
+        _clipboard_secret = password
+
+        # Only the latest copy counts down
+        if _clipboard_timer is not None:
+            _clipboard_timer.cancel()
 
-    # Copy password immediately
-    pyperclip.copy(password)
+        _clipboard_callback = callback
 
-    # Cancel old timer if running
-    if _clipboard_timer and _clipboard_timer.is_alive():
-        try:
-            _clipboard_timer.cancel()  # type: ignore
-        except:
-            pass
+        now = scheduler.clock()
+        deadline = now + timeout
 
-    _clipboard_callback = callback
+        # The tick needs its own timer, so create it before arming it
+        timer = _clipboard_timer = Timer(scheduler, now, None)
+        timer.callback = functools.partial(_clipboard_tick, timer, deadline, callback)
+        timer.reschedule(now)
 
-    # Start background countdown thread
-    _clipboard_timer = threading.Thread(
-        target=_clipboard_clear_worker,
-        args=(timeout, callback),
-        daemon=True
-    )
-    _clipboard_timer.start()
+
+def clear_clipboard_now():
+    """
+    End the countdown early and clear a password still on the clipboard,
+    e.g. when the session ends. Call from the backend's thread.
+    """
+
+    timer = _clipboard_timer
+
+    if timer is not None:
+        _clear_if_unchanged(timer)
+        timer.cancel()
 
 
 # ============================================================
-# AUTO-LOCK WORKER
-# Runs in background and locks vault after inactivity
+# AUTO-LOCK
+# Locks the vault after inactivity. touch_activity only moves
+# a timestamp; the timer re-checks it when it fires and
+# reschedules itself, so activity never costs a heap update
 # ============================================================
 
-def _auto_lock_worker():
-    global _last_activity
+def _auto_lock_due():
+    global _auto_lock_timer
+
+    timer = _auto_lock_timer
+    if timer is None:
+        return
+
+    # Activity since the timer was set pushes the deadline back
+    deadline = _last_activity + _auto_lock_timeout
+    if scheduler.clock() < deadline:
+        timer.reschedule(deadline)
+        return
 
-    while True:
-        time.sleep(1)
+    # Inactivity exceeded timeout → lock the vault
+    _auto_lock_timer = None
 
-        # If inactivity exceeds timeout → lock the vault
-        if time.time() - _last_activity >= _auto_lock_timeout:
-            if _auto_lock_callback:
-                _auto_lock_callback()
-            break
+    if _auto_lock_callback:
+        _auto_lock_callback()
 
 
 def set_auto_lock_timeout(seconds: int):
@@ -118,6 +368,10 @@ def set_auto_lock_timeout(seconds: int):
     global _auto_lock_timeout
     _auto_lock_timeout = seconds
 
+    # A shorter timeout must take effect before the old deadline
+    if _auto_lock_timer is not None:
+        _auto_lock_timer.reschedule(_last_activity + seconds)
+
 
 def register_auto_lock_callback(callback):
     """
@@ -135,21 +389,30 @@ def touch_activity():
     """
 
     global _last_activity
-    _last_activity = time.time()
+    _last_activity = scheduler.clock()
 
 
 def start_auto_lock_timer():
     """
-    Starts the auto-lock worker thread if it's not already running.
+    Starts the auto-lock timer if it's not already running.
     """
 
     global _auto_lock_timer
 
-    if _auto_lock_timer and _auto_lock_timer.is_alive():
+    if _auto_lock_timer is not None:
         return  # Already running
 
-    _auto_lock_timer = threading.Thread(
-        target=_auto_lock_worker,
-        daemon=True
-    )
-    _auto_lock_timer.start()
+    touch_activity()
+    _auto_lock_timer = scheduler.call_at(_last_activity + _auto_lock_timeout, _auto_lock_due)
+
+
+def stop_auto_lock_timer():
+    """
+    Cancel auto-lock, e.g. when the window closes or locks by itself.
+    """
+
+    global _auto_lock_timer
+
+    if _auto_lock_timer is not None:
+        _auto_lock_timer.cancel()
+        _auto_lock_timer = None
@@ -3,8 +3,22 @@ from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
 from cryptography.hazmat.backends import default_backend
 
+import hashlib
+import lzma
 import os
 import json
+import time
+import zlib
+
+import timing
+
+
+# KDF settings for new vaults; stored in the vault header
+DEFAULT_KDF_PARAMS = {"algorithm": "pbkdf2-sha256", "iterations": 200_000}
+
+# Calibration never goes below these, however slow the machine
+MIN_PBKDF2_ITERATIONS = 100_000
+MIN_SCRYPT_N = 2 ** 14
 
 
 def derive_key(password: str, salt: bytes, iterations: int = 200_000) -> bytes:
@@ -25,43 +39,353 @@ def derive_key(password: str, salt: bytes, iterations: int = 200_000) -> bytes:
     return kdf.derive(password_bytes)
 
 
-def encrypt_data(key: bytes, data: dict) -> bytes:
+def derive_key_from_params(password: str, salt: bytes, params: dict) -> bytes:
     """
-    Encrypts a Python dictionary using AES-256-GCM.
-    Returns: nonce + tag + ciphertext
+    Derive a 256-bit key using the KDF described by params, as stored in
+    the vault header:
+        {"algorithm": "pbkdf2-sha256", "iterations": ...}
+        {"algorithm": "scrypt", "n": ..., "r": ..., "p": ...}
+    """
+
+    algorithm = params.get("algorithm")
+
+    if algorithm == "pbkdf2-sha256":
+        with timing.span("kdf.pbkdf2"):
+            return derive_key(password, salt, iterations=params["iterations"])
+
+    if algorithm == "scrypt":
+        n, r, p = params["n"], params["r"], params["p"]
+
+        with timing.span("kdf.scrypt"):
+            return hashlib.scrypt(
+                password.encode('utf-8'),
+                salt=salt, n=n, r=r, p=p,
+                maxmem=_scrypt_maxmem(n, r, p),
+                dklen=32
+            )
+
+    raise ValueError(f"Unsupported key derivation function: {algorithm}")
+
+
+def _scrypt_maxmem(n: int, r: int, p: int) -> int:
+    # scrypt needs 128 * r * (n + p) bytes; leave headroom for OpenSSL
+    return 128 * r * (n + p) + 32 * 1024 * 1024
+
+
+def _time_kdf(params: dict) -> float:
+    """
+    Seconds taken by one key derivation with params on this machine.
+    """
+
+    start = time.perf_counter()
+    derive_key_from_params("calibration", os.urandom(16), params)
+    return time.perf_counter() - start
+
+
+def calibrate_kdf(target_ms: float = 300, algorithm: str = "pbkdf2-sha256") -> dict:
+    """
+    Benchmark the KDF on this machine and return parameters whose
+    derivation takes about target_ms milliseconds (never weaker than
+    the MIN_* floors).
+    """
+
+    target = target_ms / 1000
+
+    if algorithm == "pbkdf2-sha256":
+        # PBKDF2 cost is linear in iterations: time a probe and scale
+        probe = 20_000
+        per_iteration = _time_kdf({"algorithm": algorithm, "iterations": probe}) / probe
+
+        iterations = int(target / per_iteration)
+
+        # One full-size run to correct for the probe's fixed overhead
+        elapsed = _time_kdf({"algorithm": algorithm, "iterations": iterations})
+        iterations = int(iterations * target / elapsed) // 1000 * 1000
+
+        return {"algorithm": algorithm, "iterations": max(iterations, MIN_PBKDF2_ITERATIONS)}
+
+    if algorithm == "scrypt":
+        # Double the memory cost until a derivation reaches the target
+        params = {"algorithm": algorithm, "n": MIN_SCRYPT_N, "r": 8, "p": 1}
+
+        while _time_kdf(params) * 2 <= target:
+            params["n"] *= 2
+
+        return params
+
+    raise ValueError(f"Unsupported key derivation function: {algorithm}")
+
+
+class SessionKey:
+    """
+    Holds the key derived at unlock for the lifetime of a vault session.
+    The key lives in a mutable buffer so it can be zeroed on lock/close.
+    """
+
+    def __init__(self, key: bytes):
+        self._buffer = bytearray(key)
+        self._wiped = False
+
+    @property
+    def material(self) -> bytearray:
+        """
+        Raw key bytes, usable anywhere a bytes key is accepted.
+        """
+
+        if self._wiped:
+            raise RuntimeError("Session key has been wiped.")
+
+        return self._buffer
+
+    @property
+    def wiped(self) -> bool:
+        return self._wiped
+
+    def wipe(self):
+        """
+        Overwrite the key in memory. The object is unusable afterwards.
+        """
+
+        for i in range(len(self._buffer)):
+            self._buffer[i] = 0
+
+        self._wiped = True
+
+
+NONCE_SIZE = 12
+TAG_SIZE = 16
+SEALED_OVERHEAD = NONCE_SIZE + TAG_SIZE
+
+# update_into() wants room for one extra block beyond the input
+_BLOCK_SLACK = 15
+
+# Compressed payloads are produced and consumed this many bytes at a time
+COMPRESSION_CHUNK_SIZE = 64 * 1024
+
+COMPRESSION_ALGORITHMS = ("zlib", "lzma")
+
+
+def check_compression(compression: dict):
+    """
+    Validate a compression setting: None, or
+    {"algorithm": "zlib" | "lzma", "level": 0-9}.
+    """
+
+    if compression is None:
+        return
+
+    if compression.get("algorithm") not in COMPRESSION_ALGORITHMS:
+        raise ValueError(f"Unsupported compression: {compression.get('algorithm')}")
+
+    level = compression.get("level", 6)
+    if not isinstance(level, int) or not 0 <= level <= 9:
+        raise ValueError(f"Invalid compression level: {level}")
+
+
+def _compressor(compression: dict):
+    level = compression.get("level", 6)
+
+    if compression["algorithm"] == "zlib":
+        # Raw deflate: GCM already authenticates, so skip zlib's header and checksum
+        return zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS)
+
+    return lzma.LZMACompressor(preset=level)
+
+
+def _decompressor(compression: dict):
+    if compression["algorithm"] == "zlib":
+        return zlib.decompressobj(-zlib.MAX_WBITS)
+
+    return lzma.LZMADecompressor()
+
+
+def _chunks(view: memoryview):
+    for start in range(0, len(view), COMPRESSION_CHUNK_SIZE):
+        yield view[start:start + COMPRESSION_CHUNK_SIZE]
+
+
+def encrypt_bytes(key: bytes, plaintext, associated_data: bytes = None,
+                  compression: dict = None) -> bytearray:
     """
+    Encrypts raw bytes (any bytes-like object) using AES-256-GCM.
+    associated_data is authenticated but not encrypted.
+    compression (see check_compression) compresses the plaintext first;
+    decrypt_bytes must be given the same setting.
+    Returns: nonce + tag + ciphertext
 
-    json_data = json.dumps(data).encode('utf-8')
+    The ciphertext is written straight into the output buffer, so the
+    only full-size allocation is the result itself.
+    """
 
     # Generate a random 12-byte nonce
-    nonce = os.urandom(12)
+    nonce = os.urandom(NONCE_SIZE)
 
     # Create AES-GCM cipher
     cipher = Cipher(algorithms.AES(key), modes.GCM(nonce), backend=default_backend())
     encryptor = cipher.encryptor()
 
-    # Encrypt the data
-    ciphertext = encryptor.update(json_data) + encryptor.finalize()
+    if associated_data:
+        encryptor.authenticate_additional_data(associated_data)
 
-    # Return nonce + tag + ciphertext
-    return nonce + encryptor.tag + ciphertext
+    if compression is not None:
+        return _compress_and_encrypt(encryptor, nonce, plaintext, compression)
 
+    size = len(plaintext)
+    out = bytearray(SEALED_OVERHEAD + size + _BLOCK_SLACK)
 
-def decrypt_data(key: bytes, blob: bytes) -> dict:
+    # Encrypt the data in place after the nonce and tag
+    with memoryview(out) as view:
+        encryptor.update_into(plaintext, view[SEALED_OVERHEAD:])
+    encryptor.finalize()
+
+    # Trim the slack (in place) and fill in nonce + tag
+    del out[SEALED_OVERHEAD + size:]
+    out[:NONCE_SIZE] = nonce
+    out[NONCE_SIZE:SEALED_OVERHEAD] = encryptor.tag
+
+    return out
+
+
+def _compress_and_encrypt(encryptor, nonce: bytes, plaintext, compression: dict) -> bytearray:
     """
-    Decrypts AES-256-GCM data roduced by encrypt_data().
+    Feed the plaintext through the compressor and the cipher one chunk at
+    a time, so the full compressed plaintext never exists in memory.
+    """
+
+    compressor = _compressor(compression)
+    out = bytearray(SEALED_OVERHEAD)
+
+    with memoryview(plaintext) as view:
+        for chunk in _chunks(view.cast("B")):
+            out += encryptor.update(compressor.compress(chunk))
+
+    out += encryptor.update(compressor.flush())
+    out += encryptor.finalize()
+
+    out[:NONCE_SIZE] = nonce
+    out[NONCE_SIZE:SEALED_OVERHEAD] = encryptor.tag
+
+    return out
+
+
+def decrypt_bytes(key: bytes, blob, associated_data: bytes = None,
+                  compression: dict = None) -> bytearray:
+    """
+    Decrypts AES-256-GCM data produced by encrypt_bytes().
     Blob format: nonce (12 bytes) + tag (16 bytes) + ciphertext
+    blob may be a memoryview into a larger buffer; nothing is copied out
+    of it except the plaintext.
+    Raises cryptography's InvalidTag if the key or associated data is wrong.
     """
 
-    nonce = blob[:12]
-    tag = blob[12:28]
-    ciphertext = blob[28:]
+    view = memoryview(blob)
+
+    if len(view) < SEALED_OVERHEAD:
+        raise ValueError("Encrypted data is truncated.")
+
+    nonce = bytes(view[:NONCE_SIZE])
+    tag = bytes(view[NONCE_SIZE:SEALED_OVERHEAD])
+    ciphertext = view[SEALED_OVERHEAD:]
 
     # Create AES-GCM cipher
     cipher = Cipher(algorithms.AES(key), modes.GCM(nonce, tag), backend=default_backend())
     decryptor = cipher.decryptor()
 
+    if associated_data:
+        decryptor.authenticate_additional_data(associated_data)
+
+    if compression is not None:
+        return _decrypt_and_decompress(decryptor, ciphertext, compression)
+
     # Decrypt the data
-    json_data = decryptor.update(ciphertext) + decryptor.finalize()
+    out = bytearray(len(ciphertext) + _BLOCK_SLACK)
+    with memoryview(out) as out_view:
+        size = decryptor.update_into(ciphertext, out_view)
+    decryptor.finalize()
+
+    del out[size:]
+    return out
+
+
+def decrypt_into(key: bytes, blob, out: bytearray, associated_data: bytes = None) -> int:
+    """
+    Same as decrypt_bytes() (uncompressed data only) but writes the
+    plaintext into out, growing it if needed, and returns the plaintext
+    length. Reusing one out buffer across many small payloads avoids an
+    allocation per payload. No memoryview of out may be held by the
+    caller while this runs.
+    """
+
+    view = memoryview(blob)
+
+    if len(view) < SEALED_OVERHEAD:
+        raise ValueError("Encrypted data is truncated.")
+
+    cipher = Cipher(
+        algorithms.AES(key),
+        modes.GCM(bytes(view[:NONCE_SIZE]), bytes(view[NONCE_SIZE:SEALED_OVERHEAD])),
+        backend=default_backend()
+    )
+    decryptor = cipher.decryptor()
+
+    if associated_data:
+        decryptor.authenticate_additional_data(associated_data)
+
+    needed = len(view) - SEALED_OVERHEAD + _BLOCK_SLACK
+    if len(out) < needed:
+        out.extend(bytes(needed - len(out)))
+
+    with memoryview(out) as out_view:
+        size = decryptor.update_into(view[SEALED_OVERHEAD:], out_view)
+    decryptor.finalize()
+
+    return size
+
+
+def _decrypt_and_decompress(decryptor, ciphertext: memoryview, compression: dict) -> bytearray:
+    """
+    Decrypt, check the tag, then decompress chunk by chunk. Nothing is
+    decompressed before the tag is verified, so forged data can't be a
+    decompression bomb.
+    """
+
+    compressed = bytearray(len(ciphertext) + _BLOCK_SLACK)
+    with memoryview(compressed) as view:
+        size = decryptor.update_into(ciphertext, view)
+    decryptor.finalize()
+
+    del compressed[size:]
+
+    decompressor = _decompressor(compression)
+    out = bytearray()
+
+    with memoryview(compressed) as view:
+        for chunk in _chunks(view):
+            out += decompressor.decompress(chunk)
+
+    if not decompressor.eof:
+        raise ValueError("Compressed data is truncated.")
+
+    return out
+
+
+def encrypt_data(key: bytes, data: dict) -> bytes:
+    """
+    Encrypts a Python dictionary using AES-256-GCM.
+    Returns: nonce + tag + ciphertext
+    """
+
+    return encrypt_bytes(key, json.dumps(data).encode('utf-8'))
+
+
+def decrypt_data(key: bytes, blob: bytes) -> dict:
+    """
+    Decrypts AES-256-GCM data roduced by encrypt_data().
+    Blob format: nonce (12 bytes) + tag (16 bytes) + ciphertext
+    """
+
+    with timing.span("decrypt_data.aes"):
+        plaintext = decrypt_bytes(key, blob)
 
-    return json.loads(json_data.decode('utf-8'))
+    with timing.span("decrypt_data.json"):
+        return json.loads(plaintext)
@@ -0,0 +1,98 @@
+"""
+Plaintext export of a vault to CSV or JSON, the formats importer.py
+reads back.
+
+Accounts are written one at a time as they are revealed, and a lazily
+loaded vault drops each body again once it is written, so exporting a
+100k-entry vault never holds every secret (or the whole document) in
+memory at once.
+
+    csv  : a header row (name, username, password, notes, category),
+           one row per account
+    json : {"accounts": [{...}, ...]}, one account object per line
+"""
+
+import csv
+import io
+import json
+import os
+
+import fileio
+
+
+CSV_FIELDS = ("name", "username", "password", "notes", "category")
+
+
+def iter_accounts(vault):
+    """
+    Yield every account of vault with its secrets loaded, in vault order.
+    """
+
+    for account_id in vault.account_ids():
+        yield vault.reveal(account_id)
+        vault.evict(account_id)
+
+
+def write_csv(vault, f) -> int:
+    """
+    Write vault to f as CSV. Returns the number of accounts written.
+    """
+
+    writer = csv.writer(f)
+    writer.writerow(CSV_FIELDS)
+
+    count = 0
+    for account in iter_accounts(vault):
+        writer.writerow([getattr(account, field) or "" for field in CSV_FIELDS])
+        count += 1
+
+    return count
+
+
+def write_json(vault, f) -> int:
+    """
+    Write vault to f as JSON. Returns the number of accounts written.
+    """
+
+    f.write('{"accounts": [')
+
+    count = 0
+    for account in iter_accounts(vault):
+        f.write(",\n  " if count else "\n  ")
+        f.write(json.dumps(account.to_dict()))
+        count += 1
+
+    f.write("\n]}\n" if count else "]}\n")
+    return count
+
+
+WRITERS = {"csv": write_csv, "json": write_json}
+
+
+def export_file(vault, path: str, fmt: str = None) -> int:
+    """
+    Export vault to path, readable by the owner only. The format comes
+    from the extension unless fmt is given; JSON if it is neither.
+    Returns the number of accounts written.
+    """
+
+    if fmt is None:
+        fmt = "csv" if os.path.splitext(path)[1].lower() == ".csv" else "json"
+
+    writer = WRITERS.get(fmt)
+
+    if writer is None:
+        raise ValueError(f"Unknown export format {fmt!r}.")
+
+    # Plaintext secrets: readable by the owner only, even when replacing
+    # a file others could read. Written to a temp file and renamed, so an
+    # interrupted export leaves no truncated file behind.
+    with fileio.replacing(path, mode=0o600) as raw:
+        f = io.TextIOWrapper(raw, encoding="utf-8", newline="")
+        count = writer(vault, f)
+
+        # Hand raw back to replacing() open, for its fsync
+        f.flush()
+        f.detach()
+
+    return count
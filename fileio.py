@@ -0,0 +1,126 @@
+"""
+Durable file writes for the vault.
+
+A write is only on disk once the file has been fsynced, and a rename is
+only durable once the directory holding it has been fsynced too.
+"""
+
+import contextlib
+import os
+
+
+# Permissions of files atomic_write() creates (vaults, backups)
+NEW_FILE_MODE = 0o600
+
+
+def temp_path(path: str) -> str:
+    """
+    Where atomic_write() stages the new contents of path.
+    """
+
+    return path + ".tmp"
+
+
+def fsync_directory(path: str):
+    """
+    Flush the directory entry changes (creates, renames) under path's
+    directory. Not supported on Windows, where it is skipped.
+    """
+
+    directory = os.path.dirname(os.path.abspath(path))
+
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass  # Some platforms/filesystems refuse fsync on directories
+    finally:
+        os.close(fd)
+
+
+def file_mode(path: str) -> int:
+    """
+    Permission bits of path, or owner-only for a file that doesn't exist
+    yet.
+    """
+
+    try:
+        return os.stat(path).st_mode & 0o7777
+    except FileNotFoundError:
+        return NEW_FILE_MODE
+
+
+def atomic_write(path: str, data):
+    """
+    Replace path with data so that after a crash it holds either the old
+    or the new contents, never a mix:
+    write a temp file, fsync it, rename it over path, fsync the directory.
+    The new file keeps the permissions of the one it replaces.
+    """
+
+    with replacing(path) as f:
+        f.write(data)
+
+
+@contextlib.contextmanager
+def replacing(path: str, mode: int = None):
+    """
+    Like atomic_write(), for contents written bit by bit: yields a binary
+    file that replaces path once the block ends without an exception.
+    An exception leaves path untouched. mode is the new file's
+    permissions (default: those of the file it replaces).
+    """
+
+    tmp = temp_path(path)
+
+    if mode is None:
+        mode = file_mode(path)
+
+    try:
+        fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, mode)
+
+        # The umask may have narrowed the mode, and a temp file left by a
+        # crash keeps its old one
+        if hasattr(os, "fchmod"):
+            os.fchmod(fd, mode)
+
+        with os.fdopen(fd, "wb") as f:
+            yield f
+
+            f.flush()
+            os.fsync(f.fileno())
+
+        os.replace(tmp, path)
+    except BaseException:
+        discard_temp(path)
+        raise
+
+    fsync_directory(path)
+
+
+def discard_temp(path: str):
+    """
+    Remove a temp file left behind by an interrupted atomic_write().
+    """
+
+    try:
+        os.remove(temp_path(path))
+    except FileNotFoundError:
+        pass
+
+
+def append_durably(f, offset: int, data):
+    """
+    Write data at offset in the open file f, drop anything after it
+    (e.g. an unfinished earlier write) and fsync.
+    """
+
+    f.seek(offset)
+    f.write(data)
+    f.truncate()
+    f.flush()
+    os.fsync(f.fileno())
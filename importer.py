@@ -0,0 +1,302 @@
+"""
+Bulk import from CSV files and other password managers' JSON exports.
+
+Rows are streamed: the readers are generators that parse one record at
+a time, accounts are built and added in batches, and the caller saves
+once at the end, so a 100k-row file never sits in memory whole (as
+rows or as one parsed JSON document) and costs one write.
+
+    csv  : a header row plus one row per account. Column names from
+           common exports are recognized (Chrome, Firefox, Bitwarden,
+           LastPass, KeePass, 1Password...), case-insensitively.
+    json : Bitwarden exports ({"folders": [...], "items": [...]}) and
+           this vault's own export ({"accounts": [...]}, see cli.py).
+
+An entry whose name, username and password all match an existing
+account (or an earlier row) is skipped. Only a hash of those fields is
+kept to find them, not the fields themselves.
+"""
+
+import csv
+import hashlib
+import json
+import os
+import re
+
+from models import Account
+
+
+# Accounts built and added to the vault at a time
+BATCH_SIZE = 1000
+
+# Bytes read at a time from JSON files
+READ_SIZE = 1 << 16
+
+# Lowercased CSV header -> Account field
+CSV_COLUMNS = {
+    "name": "name", "title": "name", "account": "name",
+    "username": "username", "login_username": "username", "login": "username",
+    "user": "username", "email": "username",
+    "password": "password", "login_password": "password",
+    "notes": "notes", "note": "notes", "extra": "notes", "comments": "notes",
+    "category": "category", "folder": "category", "grouping": "category", "group": "category",
+    "url": "url", "login_uri": "url", "website": "url", "uri": "url",
+}
+
+# Arrays of a JSON export that hold records
+JSON_ARRAYS = ("folders", "items", "accounts")
+
+_JSON_ARRAY_START = re.compile(r'"(%s)"\s*:\s*\[' % "|".join(JSON_ARRAYS))
+
+
+class ImportFormatError(ValueError):
+    """
+    The file can't be imported (unknown format, unreadable structure).
+    """
+
+
+# ====================================
+# Readers: file -> generator of field dicts
+# ====================================
+
+def read_csv(f):
+    """
+    Yield one dict of Account fields (plus "url") per CSV row.
+    """
+
+    reader = csv.reader(f)
+    header = next(reader, None)
+
+    if header is None:
+        return
+
+    columns = [CSV_COLUMNS.get(name.strip().lower()) for name in header]
+
+    if "name" not in columns and "url" not in columns:
+        raise ImportFormatError("The CSV file has no name or url column.")
+
+    for row in reader:
+        record = {}
+
+        for field, value in zip(columns, row):
+            # First matching column wins (e.g. "name" over "title")
+            if field is not None and value and field not in record:
+                record[field] = value
+
+        if record:
+            yield record
+
+
+def read_json(f):
+    """
+    Yield one dict of Account fields (plus "url") per exported entry,
+    decoding the entries one at a time.
+    """
+
+    folders = {}
+
+    for array, item in _iter_json_arrays(f):
+        if not isinstance(item, dict):
+            continue
+
+        if array == "folders":
+            folders[item.get("id")] = item.get("name") or ""
+        elif array == "items":
+            yield _bitwarden_record(item, folders)
+        else:
+            yield {k: v for k, v in item.items() if k != "id" and isinstance(v, str)}
+
+
+def _bitwarden_record(item: dict, folders: dict) -> dict:
+    login = item.get("login") or {}
+    uris = login.get("uris") or []
+
+    return {
+        "name": item.get("name") or "",
+        "username": login.get("username") or "",
+        "password": login.get("password") or "",
+        "notes": item.get("notes") or "",
+        "category": folders.get(item.get("folderId"), ""),
+        "url": (uris[0].get("uri") or "") if uris and isinstance(uris[0], dict) else "",
+    }
+
+
+def _iter_json_arrays(f):
+    """
+    Yield (array name, item) for the items of the JSON_ARRAYS arrays,
+    reading the file in chunks and decoding one item at a time.
+    """
+
+    decoder = json.JSONDecoder()
+    buffer = ""
+    position = 0
+    eof = False
+
+    def fill() -> bool:
+        nonlocal buffer, position, eof
+
+        chunk = f.read(READ_SIZE)
+        if not chunk:
+            eof = True
+            return False
+
+        # Drop what has been decoded already
+        buffer = buffer[position:] + chunk
+        position = 0
+        return True
+
+    while True:
+        # Find the next array we care about
+        match = _JSON_ARRAY_START.search(buffer, position)
+
+        if match is None:
+            if eof:
+                return
+
+            # Keep a tail in case a key is split across chunks
+            position = max(position, len(buffer) - 32)
+            fill()
+            continue
+
+        array = match.group(1)
+        position = match.end()
+
+        while True:
+            # Skip separators up to the next item or the end of the array
+            while True:
+                while position < len(buffer) and buffer[position] in " \t\r\n,":
+                    position += 1
+
+                if position < len(buffer) or not fill():
+                    break
+
+            if position >= len(buffer):
+                raise ImportFormatError("The JSON file ends inside an array.")
+
+            if buffer[position] == "]":
+                position += 1
+                break
+
+            try:
+                item, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                # The item may continue in the next chunk
+                if fill():
+                    continue
+                raise ImportFormatError("The JSON file is not valid.")
+
+            position = end
+            yield array, item
+
+
+# ====================================
+# Import
+# ====================================
+
+def entry_hash(name: str, username: str, password: str) -> bytes:
+    """
+    Digest identifying an entry for deduplication.
+    """
+
+    digest = hashlib.blake2b(digest_size=16)
+
+    for value in (name, username, password):
+        data = (value or "").encode("utf-8")
+        digest.update(len(data).to_bytes(4, "big"))
+        digest.update(data)
+
+    return digest.digest()
+
+
+def _to_account(record: dict) -> Account:
+    notes = record.get("notes", "")
+    url = record.get("url", "")
+
+    # Account has no url field; keep it with the notes
+    if url:
+        notes = f"{notes}\nURL: {url}" if notes else f"URL: {url}"
+
+    return Account(
+        name=record.get("name") or url,
+        username=record.get("username", ""),
+        password=record.get("password", ""),
+        notes=notes,
+        category=record.get("category", ""),
+    )
+
+
+def import_records(vault, records, batch_size: int = BATCH_SIZE) -> dict:
+    """
+    Add the accounts described by records (field dicts) to vault,
+    skipping duplicates. Nothing is added if reading fails. Doesn't save.
+    Returns: {"imported": n, "duplicates": n, "skipped": n}
+    """
+
+    # Existing entries, by hash (a lazy vault has to read every body
+    # here, so an eager one is the better fit for big imports)
+    seen = set()
+    for account_id in vault.account_ids():
+        account = vault.reveal(account_id)
+        seen.add(entry_hash(account.name, account.username, account.password))
+        vault.evict(account_id)
+
+    stats = {"imported": 0, "duplicates": 0, "skipped": 0}
+    added = []
+    batch = []
+
+    try:
+        for record in records:
+            account = _to_account(record)
+
+            if not account.name:
+                stats["skipped"] += 1
+                continue
+
+            key = entry_hash(account.name, account.username, account.password)
+
+            if key in seen:
+                stats["duplicates"] += 1
+                continue
+
+            seen.add(key)
+            batch.append(account)
+
+            if len(batch) >= batch_size:
+                added += vault.add_accounts(batch)
+                batch = []
+
+        added += vault.add_accounts(batch)
+    except Exception:
+        # All or nothing: a file that fails halfway leaves the vault as it was
+        for account_id in added:
+            vault.delete_account(account_id)
+        raise
+
+    stats["imported"] = len(added)
+    return stats
+
+
+def detect_format(path: str) -> str:
+    extension = os.path.splitext(path)[1].lower()
+
+    if extension in (".csv", ".json"):
+        return extension[1:]
+
+    raise ImportFormatError(f"Can't tell the format of {path}; use .csv or .json.")
+
+
+def import_file(vault, path: str, fmt: str = None) -> dict:
+    """
+    Import a CSV or JSON export into vault (see import_records).
+    The caller saves.
+    """
+
+    fmt = fmt or detect_format(path)
+    reader = {"csv": read_csv, "json": read_json}.get(fmt)
+
+    if reader is None:
+        raise ImportFormatError(f"Unknown import format {fmt!r}.")
+
+    # utf-8-sig: spreadsheet programs like to start CSV files with a BOM
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        return import_records(vault, reader(f))
@@ -4,14 +4,29 @@ from vault import Vault
 from models import Account
 
 
-def open_main_window(master_password):
-    vault = Vault("vault.enc")
-    vault.load(master_password)
+def run(vault):
+    """
+    Alternate between the unlock window and the main window until the
+    user closes one of them. Each window's event loop runs to completion
+    on this thread before the next window opens.
+    """
 
-    MainWindow(vault, master_password).mainloop()
+    while True:
+        unlocked = []
+        MasterPasswordWindow(unlocked.append, vault).mainloop()
+
+        # Closed without unlocking
+        if not unlocked:
+            return
+
+        # The vault arrives already unlocked; don't derive the key again
+        window = MainWindow(vault)
+        window.mainloop()
+
+        # Closed by the user rather than locked for inactivity
+        if not window.locked:
+            return
 
 
 if __name__ == "__main__":
-    vault = Vault("vault.enc")
-    app = MasterPasswordWindow(open_main_window, vault)
-    app.mainloop()
+    run(Vault("vault.enc"))
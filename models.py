@@ -1,14 +1,31 @@
+import sys
+
+
+def _intern(value):
+    # None marks a body not loaded yet (lazy vaults)
+    return sys.intern(value) if type(value) is str else value
+
+
 class Account:
     """
     Represents a single account entry inside the password vault.
+
+    Instances use __slots__ instead of a per-instance __dict__, and
+    usernames and categories, which repeat across many entries, are
+    interned so equal values share one string. Both matter once a vault
+    holds six figures of entries.
     """
 
-    def __init__(self, name: str, username: str, password: str, notes: str = "", category: str = ""):
+    __slots__ = ("name", "_username", "password", "notes", "_category", "id")
+
+    def __init__(self, name: str, username: str, password: str, notes: str = "", category: str = "",
+                 id: bytes = None):
         self.name = name
         self.username = username
         self.password = password
         self.notes = notes
         self.category = category
+        self.id = id  # 16 bytes, assigned by the vault; stable across saves
 
 # Example:
 #
@@ -20,6 +37,22 @@ class Account:
 #     category="Personal"
 # )
 
+    @property
+    def username(self) -> str:
+        return self._username
+
+    @username.setter
+    def username(self, value: str):
+        self._username = _intern(value)
+
+    @property
+    def category(self) -> str:
+        return self._category
+
+    @category.setter
+    def category(self, value: str):
+        self._category = _intern(value)
+
     def to_dict(self) -> dict:
         """
         Convert the Account object into a dictionary for JSON serialization.
@@ -31,6 +64,7 @@ class Account:
             "password": self.password,
             "notes": self.notes,
             "category": self.category,
+            "id": self.id.hex() if self.id is not None else None,
         }
 
     @staticmethod
@@ -45,4 +79,5 @@ class Account:
             password=data.get("password", ""),
             notes=data.get("notes", ""),
             category=data.get("category", ""),
+            id=bytes.fromhex(data["id"]) if data.get("id") else None,
         )
@@ -0,0 +1,94 @@
+"""
+Payload codecs: how account fields are turned into the plaintext bytes
+that get sealed into a vault frame.
+
+A codec encodes a fixed, ordered tuple of string fields (e.g. the INDEX
+fields name and category) and decodes them back into a dict. The codec
+used by a vault is recorded in its header ("encoding"), so files written
+with one codec stay readable after the default changes.
+
+    json   : {"name": ..., "category": ...} as UTF-8 JSON (compatibility)
+    binary : one big-endian uint32 length per field, then the UTF-8
+             bytes of each field back to back
+"""
+
+import json
+import struct
+
+
+class JsonCodec:
+    """
+    The original encoding. Field order is ignored when decoding.
+    """
+
+    name = "json"
+
+    def encode(self, record: dict, fields: tuple) -> bytes:
+        return json.dumps({k: record[k] for k in fields}).encode("utf-8")
+
+    def decode(self, data, fields: tuple) -> dict:
+        # json.loads takes bytes/bytearray directly; no intermediate str copy
+        return json.loads(bytes(data) if isinstance(data, memoryview) else data)
+
+
+class BinaryCodec:
+    """
+    Compact length-prefixed encoding. All lengths sit in one block at the
+    start, so decoding is a single struct call followed by one UTF-8
+    decode per field straight out of the buffer.
+    """
+
+    name = "binary"
+
+    def __init__(self):
+        self._layouts = {}  # field count -> struct for the lengths block
+
+    def _layout(self, count: int) -> struct.Struct:
+        layout = self._layouts.get(count)
+
+        if layout is None:
+            layout = self._layouts[count] = struct.Struct(f">{count}I")
+
+        return layout
+
+    def encode(self, record: dict, fields: tuple) -> bytes:
+        parts = [record[k].encode("utf-8") for k in fields]
+        lengths = self._layout(len(parts)).pack(*map(len, parts))
+
+        return lengths + b"".join(parts)
+
+    def decode(self, data, fields: tuple) -> dict:
+        layout = self._layout(len(fields))
+        view = memoryview(data)
+
+        try:
+            lengths = layout.unpack_from(view, 0)
+        except struct.error:
+            raise ValueError("Binary payload is truncated.")
+
+        record = {}
+        offset = layout.size
+
+        for field, length in zip(fields, lengths):
+            end = offset + length
+
+            if end > len(view):
+                raise ValueError("Binary payload is truncated.")
+
+            record[field] = str(view[offset:end], "utf-8")
+            offset = end
+
+        return record
+
+
+CODECS = {codec.name: codec for codec in (JsonCodec(), BinaryCodec())}
+
+# Encoding used for newly written vaults
+DEFAULT_ENCODING = "binary"
+
+
+def get_codec(name: str):
+    try:
+        return CODECS[name]
+    except KeyError:
+        raise ValueError(f"Unsupported payload encoding: {name}")
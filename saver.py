@@ -0,0 +1,165 @@
+"""
+Write-behind saving for the vault.
+
+The UI calls request_save() after every change. That only snapshots the
+pending changes (Vault.prepare_save, no encryption or I/O); a worker
+thread seals and writes them (Vault.write_batch) once no new change has
+arrived for `delay` seconds, so a burst of edits becomes one durable
+write and the Tk event loop never waits on fsync.
+
+A batch that fails to write is kept and merged into the next attempt;
+flush() forces a write and waits for it, and must be called before the
+vault is locked or the program exits.
+"""
+
+import threading
+import time
+
+
+class BackgroundSaver:
+    """
+    One worker thread writing a vault's changes behind the caller.
+
+    on_result(error) is called on the worker thread after each write,
+    with None on success; it must hand the result over to the UI thread
+    itself (e.g. through a queue polled with after()).
+    """
+
+    def __init__(self, vault, delay: float = 0.5, max_delay: float = 2.0, on_result=None):
+        self.vault = vault
+        self.delay = delay  # quiet period before writing
+        self.max_delay = max_delay  # upper bound while edits keep coming
+        self.on_result = on_result
+        self.last_error = None  # exception of the last failed write
+
+        self._cond = threading.Condition()
+        self._pending = None  # SaveBatch waiting to be written
+        self._due = None  # monotonic time to write it; None = wait for a request
+        self._first_request = None
+        self._writing = False
+        self._closed = False
+
+        self._thread = threading.Thread(target=self._run, name="vault-saver", daemon=True)
+        self._thread.start()
+
+    def request_save(self):
+        """
+        Schedule the vault's pending changes to be written shortly.
+        Must be called on the thread that changes the accounts.
+        """
+
+        batch = self.vault.prepare_save()
+
+        if not batch:
+            return
+
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Saver is closed.")
+
+            now = time.monotonic()
+
+            if self._pending is None:
+                self._pending = batch
+            else:
+                self._pending = self._pending.merge(batch)
+
+            if self._first_request is None:
+                self._first_request = now
+
+            self._due = min(now + self.delay, self._first_request + self.max_delay)
+            self._cond.notify_all()
+
+    def flush(self, timeout: float = None) -> bool:
+        """
+        Write everything requested so far right away and wait for it.
+        Returns True once it is all on disk, False if a write failed
+        (see last_error) or the timeout expired.
+        """
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        with self._cond:
+            if self._pending is not None:
+                self._due = time.monotonic()
+                self._cond.notify_all()
+
+            # A failed write leaves the batch pending with no due time
+            while self._writing or (self._pending is not None and self._due is not None):
+                remaining = None if deadline is None else deadline - time.monotonic()
+
+                if remaining is not None and remaining <= 0:
+                    return False
+
+                self._cond.wait(remaining)
+
+            return self._pending is None
+
+    def close(self, timeout: float = None) -> bool:
+        """
+        Flush and stop the worker thread. Returns the result of the flush.
+        """
+
+        flushed = self.flush(timeout)
+
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+        self._thread.join(timeout)
+
+        return flushed
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+
+            if batch is None:
+                return
+
+            try:
+                self.vault.write_batch(batch)
+                error = None
+            except Exception as e:
+                error = e
+
+            with self._cond:
+                self._writing = False
+                self.last_error = error
+
+                if error is not None:
+                    # Keep it for the next request_save() or flush()
+                    if self._pending is None:
+                        self._pending = batch
+                    else:
+                        self._pending = batch.merge(self._pending)
+
+                self._cond.notify_all()
+
+            if self.on_result is not None:
+                self.on_result(error)
+
+    def _next_batch(self):
+        """
+        Wait until the pending batch is due and take it.
+        Returns None once the saver is closed.
+        """
+
+        with self._cond:
+            while True:
+                if self._pending is not None and self._due is not None:
+                    wait = self._due - time.monotonic()
+
+                    if wait <= 0:
+                        batch = self._pending
+                        self._pending = None
+                        self._due = None
+                        self._first_request = None
+                        self._writing = True
+                        return batch
+
+                    self._cond.wait(wait)
+                elif self._closed:
+                    return None
+                else:
+                    self._cond.wait()
@@ -0,0 +1,590 @@
+"""
+In-memory search index over the account fields, so filtering the list
+does not rescan every account on each keystroke.
+
+    words      : every word of name, username, category and notes, kept
+                 sorted so a prefix is a bisect range; word -> record ids
+    name words : the same for names alone, used for ranking
+    names      : (name, record id) pairs kept sorted
+    trigrams   : every 3-character substring of name, username and
+                 category -> record ids
+    variants   : each word with one character deleted -> words, to find
+                 words one typo away from a query term
+
+Text is normalized (lowercased, accents stripped) once when a record is
+indexed; only the query is normalized per keystroke.
+
+A query is split on whitespace and a record must match every term:
+    - terms shorter than 3 characters match the start of a word
+    - longer terms match a substring of name, username or category, or
+      the start of a word (which covers notes; they are too long to
+      index every substring of)
+
+search() returns the full set of matches. rank() returns only the best
+few, filling them tier by tier and stopping as soon as it has enough:
+    1. the name starts with the query
+    2. every term starts a word of the name
+    3. any match as above
+    4. every term matches, allowing one typo in terms of 4+ letters
+Within a tier, matches are ordered by score when there are few enough to
+score, otherwise by name.
+
+Records are keyed by the vault's record ids and updated one at a time.
+When a query extends the previous one (the user typed another
+character) and the previous results are few, they are filtered instead
+of going back to the index; a term is likewise checked against the
+records directly once the other terms have narrowed the results enough.
+"""
+
+import bisect
+import re
+import unicodedata
+from itertools import islice
+
+
+# Fields searched by substring; notes are only searched by word prefix
+SUBSTRING_FIELDS = ("name", "username", "category")
+
+NGRAM = 3
+
+# Below this many candidates, checking each record beats an index lookup
+FILTER_MAX = 5000
+
+# Most matches rank() scores one by one; bigger tiers are taken by name
+SCORE_MAX = 1000
+
+# Shortest term a typo is allowed in (only for words made of letters)
+FUZZY_MIN_LENGTH = 4
+
+_WORD = re.compile(r"\w+")
+
+
+def normalize(text: str) -> str:
+    """
+    Form used both for indexing and for queries: lowercase without
+    accents, so "Émile" and "emile" match.
+    """
+
+    if text.isascii():
+        return text.lower()
+
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(c for c in decomposed if not unicodedata.combining(c)).casefold()
+
+
+def _ngrams(text: str) -> set:
+    return {text[i:i + NGRAM] for i in range(len(text) - NGRAM + 1)}
+
+
+def _fuzzy_candidate(word: str) -> bool:
+    return len(word) >= FUZZY_MIN_LENGTH and word.isalpha()
+
+
+def _variants(word: str) -> set:
+    """
+    The word and every way to delete one character from it. Two words
+    one edit apart (including a swap of adjacent letters) share one.
+    """
+
+    return {word} | {word[:i] + word[i + 1:] for i in range(len(word))}
+
+
+def _within_one_edit(a: str, b: str) -> bool:
+    """
+    One insertion, deletion, substitution or adjacent swap apart.
+    """
+
+    if abs(len(a) - len(b)) > 1:
+        return False
+
+    if len(a) > len(b):
+        a, b = b, a
+
+    # First position where they differ
+    i = 0
+    while i < len(a) and a[i] == b[i]:
+        i += 1
+
+    if len(a) < len(b):
+        return a[i:] == b[i + 1:]
+
+    if a[i + 1:] == b[i + 1:]:
+        return True
+
+    swapped = i + 1 < len(a) and a[i] == b[i + 1] and a[i + 1] == b[i]
+    return swapped and a[i + 2:] == b[i + 2:]
+
+
+class _SortedKeys:
+    """
+    A sorted list that takes additions cheaply: they are sorted in on
+    the next read, all at once when there are many (bulk loading).
+    """
+
+    def __init__(self):
+        self._keys = []
+        self._pending = set()
+
+    def add(self, key):
+        self._pending.add(key)
+
+    def remove(self, key):
+        if key in self._pending:
+            self._pending.discard(key)
+            return
+
+        i = bisect.bisect_left(self._keys, key)
+
+        if i < len(self._keys) and self._keys[i] == key:
+            del self._keys[i]
+
+    def sorted(self) -> list:
+        if self._pending:
+            if len(self._pending) > 64:
+                self._keys.extend(self._pending)
+                self._keys.sort()
+            else:
+                for key in self._pending:
+                    bisect.insort(self._keys, key)
+
+            self._pending = set()
+
+        return self._keys
+
+
+class _WordIndex:
+    """
+    Word -> record ids, with prefix lookups and, if fuzzy, lookups of
+    words one typo away.
+    """
+
+    def __init__(self, fuzzy: bool = False):
+        self.ids = {}  # word -> set of record ids
+        self._sorted = _SortedKeys()
+        self._variants = {} if fuzzy else None  # variant -> set of words
+
+    def add(self, word: str, record_id):
+        ids = self.ids.get(word)
+
+        if ids is None:
+            ids = self.ids[word] = set()
+            self._sorted.add(word)
+
+            if self._variants is not None and _fuzzy_candidate(word):
+                for variant in _variants(word):
+                    words = self._variants.get(variant)
+
+                    if words is None:
+                        words = self._variants[variant] = set()
+
+                    words.add(word)
+
+        ids.add(record_id)
+
+    def discard(self, word: str, record_id):
+        ids = self.ids[word]
+        ids.discard(record_id)
+
+        if ids:
+            return
+
+        del self.ids[word]
+        self._sorted.remove(word)
+
+        if self._variants is not None and _fuzzy_candidate(word):
+            for variant in _variants(word):
+                words = self._variants[variant]
+                words.discard(word)
+
+                if not words:
+                    del self._variants[variant]
+
+    def sort(self):
+        self._sorted.sorted()
+
+    def prefix(self, term: str) -> set:
+        words = self._sorted.sorted()
+        ids = set()
+
+        i = bisect.bisect_left(words, term)
+        while i < len(words) and words[i].startswith(term):
+            ids |= self.ids[words[i]]
+            i += 1
+
+        return ids
+
+    def estimate(self, term: str) -> int:
+        """
+        Roughly how many records prefix(term) would return, without
+        building the set.
+        """
+
+        words = self._sorted.sorted()
+
+        start = bisect.bisect_left(words, term)
+        end = bisect.bisect_left(words, term + "\U0010ffff", start)
+
+        sample = words[start:min(end, start + 32)]
+        if not sample:
+            return 0
+
+        total = sum(len(self.ids[word]) for word in sample)
+        return total * (end - start) // len(sample)
+
+    def fuzzy(self, term: str) -> set:
+        """
+        Records with a word one typo away from term (not term itself).
+        """
+
+        if self._variants is None or not _fuzzy_candidate(term):
+            return set()
+
+        close = set()
+        for variant in _variants(term):
+            close |= self._variants.get(variant, set())
+
+        ids = set()
+        for word in close:
+            if word != term and _within_one_edit(term, word):
+                ids |= self.ids[word]
+
+        return ids
+
+
+class SearchIndex:
+    """
+    Word, name and trigram indexes over a set of accounts.
+    Fields that are None (bodies of a lazily loaded vault) are skipped.
+    """
+
+    def __init__(self):
+        self._records = {}  # record id -> (haystack, words)
+        self._words = _WordIndex(fuzzy=True)
+        self._name_words = _WordIndex()
+        self._names = _SortedKeys()  # (name, record id)
+        self._gram_ids = {}  # trigram -> set of record ids
+
+        self._last_terms = None  # terms of the previous query
+        self._last_query = None
+        self._last_result = None
+
+    def __len__(self):
+        return len(self._records)
+
+    def add(self, record_id, account):
+        """
+        Index an account, replacing what was indexed for record_id.
+        """
+
+        if record_id in self._records:
+            self.remove(record_id)
+
+        # One line per field (name first), so a match can't straddle two fields
+        haystack = "\n".join(
+            normalize(value).replace("\n", " ") if value else ""
+            for value in (getattr(account, field) for field in SUBSTRING_FIELDS)
+        )
+        name = haystack[:haystack.index("\n")]
+
+        notes = account.notes
+        words = set(_WORD.findall(normalize(notes) if notes else ""))
+        words.update(_WORD.findall(haystack))
+
+        for gram in self._haystack_ngrams(haystack):
+            ids = self._gram_ids.get(gram)
+
+            if ids is None:
+                ids = self._gram_ids[gram] = set()
+
+            ids.add(record_id)
+
+        for word in words:
+            self._words.add(word, record_id)
+
+        for word in set(_WORD.findall(name)):
+            self._name_words.add(word, record_id)
+
+        self._names.add((name, record_id))
+
+        self._records[record_id] = (haystack, tuple(words))
+        self._forget_last()
+
+    def add_many(self, records):
+        """
+        Index (record id, account) pairs in bulk, sorting the word and
+        name lists once at the end rather than on the first query.
+        """
+
+        for record_id, account in records:
+            self.add(record_id, account)
+
+        self._words.sort()
+        self._name_words.sort()
+        self._names.sorted()
+
+    def remove(self, record_id):
+        record = self._records.pop(record_id, None)
+
+        if record is None:
+            return
+
+        haystack, words = record
+        name = haystack[:haystack.index("\n")]
+
+        for gram in self._haystack_ngrams(haystack):
+            ids = self._gram_ids[gram]
+            ids.discard(record_id)
+
+            if not ids:
+                del self._gram_ids[gram]
+
+        for word in words:
+            self._words.discard(word, record_id)
+
+        for word in set(_WORD.findall(name)):
+            self._name_words.discard(word, record_id)
+
+        self._names.remove((name, record_id))
+
+        self._forget_last()
+
+    def search(self, query: str) -> set:
+        """
+        Record ids matching every term of query (all of them for an
+        empty query).
+        """
+
+        query = normalize(query)
+        terms = query.split()
+
+        if not terms:
+            result = set(self._records)
+        elif self._extends_last(query, terms):
+            result = {rid for rid in self._last_result if self._matches_all(rid, terms)}
+        else:
+            result = self._match_terms(terms, self._lookup, self._matches_term, self._estimate)
+
+        self._last_query = query
+        self._last_terms = terms
+        self._last_result = result
+
+        return result
+
+    def rank(self, query: str, limit: int) -> list:
+        """
+        Up to limit record ids matching query, best first (see the
+        module docstring). An empty query lists records by name.
+        """
+
+        names = self._names.sorted()
+        normalized = normalize(query)
+        terms = normalized.split()
+
+        if not terms:
+            return [record_id for _, record_id in names[:limit]]
+
+        ranked = []
+        seen = set()
+
+        # 1. The name starts with the query as typed
+        start = normalized.lstrip()
+        i = bisect.bisect_left(names, (start,))
+
+        while i < len(names) and len(ranked) < limit and names[i][0].startswith(start):
+            ranked.append(names[i][1])
+            i += 1
+
+        seen.update(ranked)
+
+        # 2. Every term starts a word of the name
+        if len(ranked) < limit:
+            tier = self._match_terms(
+                terms, self._name_words.prefix, self._starts_name_word, self._name_words.estimate
+            )
+            self._take(tier, terms, ranked, seen, limit)
+
+        # 3. Any match
+        if len(ranked) < limit:
+            self._take(self.search(query), terms, ranked, seen, limit)
+
+        # 4. Allowing one typo per term
+        if len(ranked) < limit:
+            fuzzy = [self._words.fuzzy(term) for term in terms]
+
+            if any(fuzzy):
+                close = dict(zip(terms, fuzzy))
+
+                tier = self._match_terms(
+                    terms,
+                    lambda term: self._lookup(term) | close[term],
+                    lambda rid, term: rid in close[term] or self._matches_term(rid, term),
+                    lambda term: self._estimate(term) + len(close[term]),
+                )
+                self._take(tier, terms, ranked, seen, limit)
+
+        return ranked
+
+    @staticmethod
+    def _match_terms(terms: list, lookup, matches, estimate) -> set:
+        """
+        Records matching every term: the most selective term (smallest
+        estimate) through lookup(term), then the others through lookup()
+        too while the candidates are many, or by checking
+        matches(rid, term) on each candidate once they are few.
+        """
+
+        result = None
+
+        for term in sorted(terms, key=estimate):
+            if result is None:
+                result = lookup(term)
+            elif len(result) <= FILTER_MAX:
+                result = {rid for rid in result if matches(rid, term)}
+            else:
+                result &= lookup(term)
+
+            if not result:
+                break
+
+        return result
+
+    def _take(self, tier: set, terms: list, ranked: list, seen: set, limit: int):
+        """
+        Append the best of tier (minus what is already ranked) to ranked.
+        """
+
+        fresh = tier - seen
+
+        if not fresh:
+            return
+
+        if len(fresh) <= SCORE_MAX:
+            records = self._records
+            order = sorted(fresh, key=lambda rid: (-self._score(rid, terms), records[rid][0]))
+        else:
+            # Too many to score within a keystroke; take them by name
+            order = (rid for _, rid in self._names.sorted() if rid in fresh)
+
+        best = list(islice(order, limit - len(ranked)))
+
+        ranked.extend(best)
+        seen.update(best)
+
+    def _score(self, record_id, terms) -> int:
+        """
+        How well a record matches; higher is better. Each term scores
+        by the best place it matches.
+        """
+
+        haystack, words = self._records[record_id]
+        name, username, category = haystack.split("\n")
+
+        score = 0
+        for term in terms:
+            substring = len(term) >= NGRAM
+
+            if name.startswith(term):
+                score += 100
+            elif any(word.startswith(term) for word in _WORD.findall(name)):
+                score += 80
+            elif substring and term in name:
+                score += 60
+            elif username.startswith(term) or category.startswith(term):
+                score += 50
+            elif substring and (term in username or term in category):
+                score += 40
+            elif any(word.startswith(term) for word in words):
+                score += 20
+            else:
+                score += 10  # a typo
+
+        return score
+
+    def _extends_last(self, query: str, terms: list) -> bool:
+        """
+        Whether every match of query is also a match of the previous
+        query. Only true when the previous terms were all substring
+        terms: a short (word prefix) term does not cover its longer
+        (substring) extension.
+        """
+
+        if self._last_result is None or not self._last_terms:
+            return False
+
+        if len(self._last_result) > FILTER_MAX:
+            return False
+
+        if not query.startswith(self._last_query):
+            return False
+
+        return all(len(term) >= NGRAM for term in self._last_terms)
+
+    def _lookup(self, term: str) -> set:
+        ids = self._words.prefix(term)
+
+        if len(term) >= NGRAM:
+            # Only records the prefix match missed need their substrings checked
+            more = self._substring_candidates(term) - ids
+
+            # Every trigram present doesn't mean they are adjacent
+            if len(term) > NGRAM:
+                records = self._records
+                more = {rid for rid in more if term in records[rid][0]}
+
+            ids |= more
+
+        return ids
+
+    def _estimate(self, term: str) -> int:
+        estimate = self._words.estimate(term)
+
+        if len(term) >= NGRAM:
+            estimate += min(len(self._gram_ids.get(gram, ())) for gram in _ngrams(term))
+
+        return estimate
+
+    def _substring_candidates(self, term: str) -> set:
+        postings = []
+
+        for gram in _ngrams(term):
+            ids = self._gram_ids.get(gram)
+
+            if not ids:
+                return set()
+
+            postings.append(ids)
+
+        postings.sort(key=len)
+        return postings[0].intersection(*postings[1:])
+
+    def _matches_all(self, record_id, terms) -> bool:
+        return all(self._matches_term(record_id, term) for term in terms)
+
+    def _matches_term(self, record_id, term: str) -> bool:
+        haystack, words = self._records[record_id]
+
+        if len(term) >= NGRAM and term in haystack:
+            return True
+
+        return any(word.startswith(term) for word in words)
+
+    def _starts_name_word(self, record_id, term: str) -> bool:
+        haystack = self._records[record_id][0]
+        name = haystack[:haystack.index("\n")]
+
+        return any(word.startswith(term) for word in _WORD.findall(name))
+
+    @staticmethod
+    def _haystack_ngrams(haystack: str) -> set:
+        grams = set()
+
+        for line in haystack.split("\n"):
+            grams |= _ngrams(line)
+
+        return grams
+
+    def _forget_last(self):
+        # Results of the previous query may be stale now
+        self._last_terms = None
+        self._last_query = None
+        self._last_result = None
@@ -0,0 +1,48 @@
+"""
+The timer thread in core: wakeups over an hour of auto-lock on a virtual
+clock, and threads used by a burst of clipboard countdowns.
+
+Run from the repository root:
+    python -m pytest tests
+"""
+
+import pytest
+
+import core
+from benchmarks.bench_scheduler import (
+    MAX_ACTIVE_WAKEUPS, MAX_COPY_THREADS, MAX_IDLE_WAKEUPS,
+    auto_lock_wakeups, scheduler_copy_threads,
+)
+
+
+@pytest.fixture(autouse=True)
+def restore_core():
+    # The helpers swap in their own scheduler and clipboard
+    saved = core.scheduler, core._clipboard, core._clipboard_run, core._last_activity
+
+    yield
+
+    core.stop_auto_lock_timer()
+    core.clear_clipboard_now()
+    core.scheduler, core._clipboard, core._clipboard_run, core._last_activity = saved
+
+
+def test_idle_hour_wakes_only_to_lock():
+    assert auto_lock_wakeups() == MAX_IDLE_WAKEUPS
+
+
+def test_active_hour_wakes_once_per_period():
+    wakeups = auto_lock_wakeups(touch_every=5)
+
+    assert 0 < wakeups <= MAX_ACTIVE_WAKEUPS
+
+
+def test_copy_burst_uses_one_thread():
+    assert scheduler_copy_threads() <= MAX_COPY_THREADS
+
+
+def test_copies_leave_one_timer():
+    scheduler_copy_threads()
+
+    # Each copy replaces the previous countdown instead of adding one
+    assert core.scheduler.pending() == 1
@@ -0,0 +1,288 @@
+"""
+Optional timing of the hot paths (unlock, save, search, UI refresh), to
+tell where the time goes when something is slow.
+
+Off by default. Turn it on with an environment variable:
+
+    VAULT_TIMING=1 python main.py                stats in vault-timing.json
+    VAULT_TIMING=/tmp/stats.json python main.py  stats in that file
+
+or at runtime with enable() / disable(). While on, each named span keeps
+its last WINDOW durations and stats() summarizes them (count, mean,
+percentiles and a histogram). The stats file is rewritten at most every
+WRITE_INTERVAL seconds and at exit; the main window shows the same
+numbers under Help > Timing.
+
+    with timing.span("vault.read"):
+        blob = read(...)
+
+Phases that alternate inside a loop are summed per phase instead, and
+recorded once each when the loop is done:
+
+    laps = timing.laps("unlock")
+    for record in records:
+        decrypt(record)
+        laps.mark("decrypt")
+        decode(record)
+        laps.mark("decode")
+    laps.done()  # records unlock.decrypt and unlock.decode
+
+When off, span() and laps() return NULL, whose methods do nothing, so
+an instrumented call site costs one function call and no clock reads.
+"""
+
+import atexit
+import collections
+import json
+import os
+import threading
+import time
+
+
+ENV_VAR = "VAULT_TIMING"
+DEFAULT_STATS_FILE = "vault-timing.json"
+
+# Durations kept per span
+WINDOW = 1000
+
+# Seconds between rewrites of the stats file
+WRITE_INTERVAL = 5.0
+
+enabled = False
+stats_path = None  # where write_stats() writes by default
+
+_lock = threading.Lock()  # _windows and _counts
+_windows = {}  # span name -> deque of the last WINDOW durations (seconds)
+_counts = {}  # span name -> durations recorded since the last reset
+_write_lock = threading.Lock()
+_last_write = 0.0
+_atexit_registered = False
+
+
+class _Null:
+    """
+    Stands in for a span or laps while timing is off.
+    """
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def mark(self, phase: str):
+        pass
+
+    def done(self):
+        pass
+
+
+NULL = _Null()
+
+
+class _Span:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        record(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class _Laps:
+    __slots__ = ("prefix", "totals", "last")
+
+    def __init__(self, prefix: str):
+        self.prefix = prefix
+        self.totals = {}
+        self.last = time.perf_counter()
+
+    def mark(self, phase: str):
+        """
+        Charge the time since the previous mark to phase.
+        """
+
+        now = time.perf_counter()
+        self.totals[phase] = self.totals.get(phase, 0.0) + now - self.last
+        self.last = now
+
+    def done(self):
+        for phase, total in self.totals.items():
+            record(f"{self.prefix}.{phase}", total)
+
+
+def span(name: str):
+    """
+    Context manager recording how long its block takes under name.
+    """
+
+    return _Span(name) if enabled else NULL
+
+
+def laps(prefix: str):
+    """
+    Accumulator for phases interleaved in a loop (see the module docstring).
+    """
+
+    return _Laps(prefix) if enabled else NULL
+
+
+def record(name: str, seconds: float):
+    """
+    Add one duration to the stats of name.
+    """
+
+    with _lock:
+        window = _windows.get(name)
+
+        if window is None:
+            window = _windows[name] = collections.deque(maxlen=WINDOW)
+
+        window.append(seconds)
+        _counts[name] = _counts.get(name, 0) + 1
+
+    if stats_path is not None and time.monotonic() - _last_write >= WRITE_INTERVAL:
+        _write_in_passing()
+
+
+# ====================================
+# Switching
+# ====================================
+
+def enable(path: str = None):
+    """
+    Start timing. path is the stats file (None: don't write one).
+    """
+
+    global enabled, stats_path, _atexit_registered
+
+    stats_path = path
+    enabled = True
+
+    if not _atexit_registered:
+        atexit.register(_write_at_exit)
+        _atexit_registered = True
+
+
+def disable():
+    """
+    Stop timing; the stats gathered so far are kept.
+    """
+
+    global enabled
+    enabled = False
+
+
+def reset():
+    with _lock:
+        _windows.clear()
+        _counts.clear()
+
+
+def configure_from_env(environ=os.environ):
+    """
+    Enable timing if ENV_VAR asks for it: "1" for the default stats
+    file, any other value except "0" for a path.
+    """
+
+    value = environ.get(ENV_VAR, "").strip()
+
+    if value in ("", "0"):
+        return
+
+    enable(DEFAULT_STATS_FILE if value == "1" else value)
+
+
+# ====================================
+# Stats
+# ====================================
+
+def stats() -> dict:
+    """
+    Summary per span name, over its last WINDOW durations (in ms):
+    count (since the last reset), window, mean, p50, p90, p99, max and
+    histogram, a list of [upper bound in ms, durations] for power-of-two
+    buckets from 1 microsecond up.
+    """
+
+    with _lock:
+        windows = {name: sorted(window) for name, window in _windows.items()}
+        counts = dict(_counts)
+
+    summary = {}
+
+    for name, durations in sorted(windows.items()):
+        if not durations:
+            continue
+
+        n = len(durations)
+
+        def percentile(fraction: float) -> float:
+            return durations[min(n - 1, int(n * fraction))] * 1000
+
+        buckets = collections.Counter(int(d * 1e6).bit_length() for d in durations)
+
+        summary[name] = {
+            "count": counts.get(name, n),
+            "window": n,
+            "mean_ms": sum(durations) / n * 1000,
+            "p50_ms": percentile(0.50),
+            "p90_ms": percentile(0.90),
+            "p99_ms": percentile(0.99),
+            "max_ms": durations[-1] * 1000,
+            "histogram": [[(1 << bucket) / 1000, buckets[bucket]] for bucket in sorted(buckets)],
+        }
+
+    return summary
+
+
+def write_stats(path: str = None) -> str:
+    """
+    Write stats() as JSON to path (default: stats_path), replacing the
+    file in one rename. Returns the path written.
+    """
+
+    global _last_write
+
+    path = path or stats_path or DEFAULT_STATS_FILE
+    data = json.dumps({"written": time.time(), "pid": os.getpid(), "spans": stats()}, indent=2)
+
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+    _last_write = time.monotonic()
+    return path
+
+
+def _write_in_passing():
+    # Whichever thread gets here first writes; the others carry on
+    if not _write_lock.acquire(blocking=False):
+        return
+
+    try:
+        write_stats()
+    except OSError:
+        pass  # Stats are best effort; never fail the code being timed
+    finally:
+        _write_lock.release()
+
+
+def _write_at_exit():
+    if stats_path is not None and _counts:
+        try:
+            write_stats()
+        except OSError:
+            pass
+
+
+configure_from_env()
@@ -0,0 +1,178 @@
+import itertools
+import os
+import threading
+
+
+class Dispatcher:
+    """
+    Hands calls from worker threads over to the Tk thread.
+
+    Tk may only be touched from the thread running its event loop, so
+    background code never calls the UI directly: it post()s the call (or
+    calls a wrap()ped callback) and the Tk thread runs everything queued.
+    Calls posted with the same key are coalesced: a newer one replaces the
+    one still waiting, keeping its place, so a burst of countdown ticks
+    costs one redraw.
+
+    Where Tk can watch a file descriptor (not on Windows), post() wakes the
+    Tk thread by writing a byte to a pipe, so an idle window never wakes
+    up. Otherwise the queue is polled through after(), every `interval` ms
+    while calls keep coming, backing off to `max_interval` ms while it
+    stays empty.
+    """
+
+    def __init__(self, widget, interval: int = 50, max_interval: int = 1000):
+        self.widget = widget  # anything with Tk's after()
+        self.interval = interval
+        self.max_interval = max_interval
+
+        self._lock = threading.Lock()  # _pending and the wake pipe
+        self._pending = {}  # key -> (function, args), in posting order
+        self._sequence = itertools.count()  # keys for calls that are never coalesced
+        self._running = False
+        self._stopped = False
+        self._wake = None  # (read fd, write fd) while draining on wake-ups
+        self._delay = interval  # current poll interval
+
+    def post(self, function, *args, key=None):
+        """
+        Queue function(*args) to run on the Tk thread. Safe from any thread.
+        key (a string) coalesces it with waiting calls posted under the same key.
+        """
+
+        if self._stopped:
+            return
+
+        if key is None:
+            key = next(self._sequence)
+
+        with self._lock:
+            # One byte per batch: the Tk thread drains everything queued
+            if not self._pending and self._wake is not None:
+                try:
+                    os.write(self._wake[1], b"\0")
+                except BlockingIOError:
+                    pass  # The pipe is full of wake-ups already
+
+            self._pending[key] = (function, args)
+
+    def wrap(self, function, key=None):
+        """
+        Return a callback that any thread can call in place of function.
+        """
+
+        return lambda *args: self.post(function, *args, key=key)
+
+    def start(self):
+        """
+        Start draining on the Tk thread (call from it).
+        """
+
+        self._stopped = False
+
+        if self._running:
+            return
+
+        self._running = True
+
+        if self._open_wake_pipe():
+            self.drain()
+        else:
+            self._delay = self.interval
+            self._poll()
+
+    def stop(self):
+        """
+        Stop draining and drop queued and later posts, e.g. once the
+        window is gone.
+        """
+
+        self._running = False
+        self._stopped = True
+
+        with self._lock:
+            self._pending = {}
+            self._close_wake_pipe()
+
+    def drain(self) -> int:
+        """
+        Run every queued call now (on the Tk thread).
+        Returns how many ran.
+        """
+
+        with self._lock:
+            pending, self._pending = self._pending, {}
+
+        for function, args in pending.values():
+            # A call may end the window (e.g. auto-lock); drop the rest
+            if self._stopped:
+                break
+
+            try:
+                function(*args)
+            except Exception as e:
+                print("UI callback error:", e)
+
+        return len(pending)
+
+    # ====================================
+    # Wake-ups
+    # ====================================
+
+    def _open_wake_pipe(self) -> bool:
+        tk = getattr(self.widget, "tk", None)
+
+        if not hasattr(tk, "createfilehandler"):
+            return False
+
+        read_fd, write_fd = os.pipe()
+        os.set_blocking(read_fd, False)
+        os.set_blocking(write_fd, False)
+
+        import tkinter
+        tk.createfilehandler(read_fd, tkinter.READABLE, self._on_wake)
+
+        with self._lock:
+            self._wake = (read_fd, write_fd)
+
+        return True
+
+    def _close_wake_pipe(self):
+        # Called holding _lock, so no post() is writing to the pipe
+        if self._wake is None:
+            return
+
+        read_fd, write_fd = self._wake
+        self._wake = None
+
+        try:
+            self.widget.tk.deletefilehandler(read_fd)
+        except Exception:
+            pass  # The interpreter is already gone
+
+        os.close(read_fd)
+        os.close(write_fd)
+
+    def _on_wake(self, fd, mask):
+        # Empty the pipe before draining: a post() after this point finds
+        # the queue empty and writes a new byte
+        try:
+            while os.read(fd, 4096):
+                pass
+        except OSError:
+            pass
+
+        if self._running:
+            self.drain()
+
+    def _poll(self):
+        if not self._running:
+            return
+
+        if self.drain():
+            self._delay = self.interval
+        else:
+            self._delay = min(self._delay * 2, self.max_interval)
+
+        if self._running:
+            self.widget.after(self._delay, self._poll)
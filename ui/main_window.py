@@ -1,22 +1,51 @@
+import threading
 import tkinter as tk
 from tkinter import ttk
 from tkinter import messagebox
 
 
+# Most accounts listed for a search query
+SEARCH_RESULTS = 100
+
+
 class MainWindow(tk.Tk):
     """
     Main UI window that appears after unlocking the vault.
     Displays a list of accounts and details for the selected account.
     """
 
-    def __init__(self, vault, master_password):
+    def __init__(self, vault):
         super().__init__()
 
+        # Already unlocked by MasterPasswordWindow; holds the session key
         self.vault = vault
-        self.master_password = master_password
         self.password_visible = False
         self.current_password_value = ""
-
+        self.revealed_id = None  # id of the account whose secrets are on screen
+
+        # Everything that calls back from another thread (the saver and
+        # core's scheduler) goes through this, to run on the Tk thread
+        from ui.dispatcher import Dispatcher
+        self.dispatcher = Dispatcher(self)
+
+        # Set by auto-lock, so main.py shows the unlock window again
+        self.locked = False
+
+        # Held by a worker thread while it changes the vault (imports);
+        # the window is busy meanwhile and leaves the vault alone
+        self._vault_lock = threading.Lock()
+        self._lock_when_idle = False  # auto-lock fired during the work
+
+        # Changes are encrypted and written on a worker thread
+        from saver import BackgroundSaver
+        self.saver = BackgroundSaver(vault, on_result=self.dispatcher.wrap(self._on_save_result))
+
+        # Encrypted snapshots of the file, taken after saves (see backup.py)
+        from backup import BackgroundBackups, BackupStore, default_backup_dir
+        self.backups = BackgroundBackups(
+            BackupStore(default_backup_dir(vault.filepath)), vault.filepath,
+            on_result=self.dispatcher.wrap(self._on_backup_result)
+        )
 
         self.title("Password Vault")
         self.geometry("700x400")
@@ -26,17 +55,28 @@ class MainWindow(tk.Tk):
         self._build_menu()
         self._center_window(self, 700, 400)
 
+        # Closing the window ends the session
+        self.protocol("WM_DELETE_WINDOW", self._close)
+
         from core import register_auto_lock_callback, start_auto_lock_timer, set_auto_lock_timeout
 
         # Set timeout (5 minutes = 300 seconds)
         set_auto_lock_timeout(300)
 
-        # Register callback
-        register_auto_lock_callback(self._lock_vault)
+        # Register callback (it fires on the scheduler thread)
+        register_auto_lock_callback(self.dispatcher.wrap(self._lock_vault, key="auto-lock"))
 
         # Start auto-lock timer
         start_auto_lock_timer()
 
+        # Copy through Tk itself rather than a subprocess per copy; the
+        # clipboard is then only touched from the Tk thread
+        from clipboard import TkClipboard
+        from core import set_clipboard
+        set_clipboard(TkClipboard(self), run=self.dispatcher.post)
+
+        self.dispatcher.start()
+
     def _build_ui(self):
         # Root layout
         root = ttk.Frame(self)
@@ -62,11 +102,14 @@ class MainWindow(tk.Tk):
 
         self.search_var = tk.StringVar()
         self.search_var.trace_add("write", self._filter_accounts)
-        search_entry = ttk.Entry(left_frame, textvariable=self.search_var)
-        search_entry.pack(fill="x", pady=5)
+        self.search_entry = ttk.Entry(left_frame, textvariable=self.search_var)
+        self.search_entry.pack(fill="x", pady=5)
 
-        # Account Listbox
-        self.account_list = tk.Listbox(left_frame, height=20)
+        # Account list (only the visible rows exist as Listbox items)
+        from ui.virtual_list import VirtualList
+        self.account_list = VirtualList(
+            left_frame, height=20, label=self._account_label, on_select=self._on_select_account
+        )
         self.account_list.pack(fill="both", expand=True)
 
         # ====================================
@@ -121,8 +164,6 @@ class MainWindow(tk.Tk):
         self.delete_btn = ttk.Button(btn_frame, text="Delete", command=self._delete_account)
         self.delete_btn.grid(row=0, column=4, padx=5)
 
-        self.account_list.bind("<<ListboxSelect>>", self._on_select_account)
-
         self._refresh_account_list()
 
     def _add_account(self):
@@ -138,8 +179,8 @@ class MainWindow(tk.Tk):
 
         if editor.result:
             # Add to vault
-            self.vault.accounts.append(editor.result)
-            self.vault.save(self.master_password)
+            self.vault.add_account(editor.result)
+            self.saver.request_save()
 
             # Refresh UI
             self._refresh_account_list()
@@ -147,6 +188,84 @@ class MainWindow(tk.Tk):
             # Clear status message
             self.status_bar.config(text="Account added successfully!")
 
+    def _import_accounts(self):
+        """
+        Add accounts from a CSV or JSON export, saved in one write.
+        """
+
+        from tkinter import filedialog
+        from core import touch_activity
+        from importer import import_file
+
+        # Reinitialize auto-lock timer on user activity
+        touch_activity()
+
+        path = filedialog.askopenfilename(
+            parent=self, title="Import Accounts",
+            filetypes=[("Exports", "*.csv *.json"), ("All files", "*.*")]
+        )
+        if not path:
+            return
+
+        # Parsing, deduplication and indexing take seconds on big files
+        self._run_in_background(
+            "Importing...", lambda: import_file(self.vault, path),
+            lambda stats, error: self._on_import_done(path, stats, error)
+        )
+
+    def _on_import_done(self, path, stats, error):
+        if error is not None:
+            self.status_bar.config(text="Import failed; nothing was added.")
+            messagebox.showerror("Import Failed", f"Could not import {path}: {error}")
+            return
+
+        if stats["imported"]:
+            self.saver.request_save()
+            self._refresh_account_list()
+
+        self.status_bar.config(
+            text=f"Imported {stats['imported']} accounts "
+                 f"({stats['duplicates']} duplicates skipped)."
+        )
+
+    def _export_accounts(self):
+        """
+        Write every account to a plaintext JSON or CSV file.
+        """
+
+        from tkinter import filedialog
+        from core import touch_activity
+        from exporter import export_file
+
+        # Reinitialize auto-lock timer on user activity
+        touch_activity()
+
+        if not messagebox.askyesno(
+            "Export Accounts",
+            "The exported file holds every password in plain text.\nContinue?"
+        ):
+            return
+
+        path = filedialog.asksaveasfilename(
+            parent=self, title="Export Accounts", defaultextension=".json",
+            filetypes=[("JSON", "*.json"), ("CSV", "*.csv")]
+        )
+        if not path:
+            return
+
+        self.config(cursor="watch")
+        self.update_idletasks()
+
+        try:
+            count = export_file(self.vault, path)
+        except (ValueError, OSError) as e:
+            messagebox.showerror("Export Failed", f"Could not export to {path}: {e}")
+            return
+        finally:
+            self.config(cursor="")
+
+        self.status_bar.config(text=f"Exported {count} accounts to {path}.")
+
     def _copy_username(self):
 
         from core import touch_activity
@@ -154,16 +273,15 @@ class MainWindow(tk.Tk):
         # Reinitialize auto-lock timer on user activity
         touch_activity()
 
-        selection = self.account_list.curselection()
-        if not selection:
+        account_id = self.account_list.selection()
+        if account_id is None:
             messagebox.showwarning("Warning", "Please select an account first.")
             return
 
-        index = selection[0]
-        account = self.vault.accounts[index]
+        account = self.vault.reveal(account_id)
 
-        import pyperclip
-        pyperclip.copy(account.username)
+        from core import copy_to_clipboard
+        copy_to_clipboard(account.username)
 
         self.status_bar.config(text="Username copied to clipboard.")
 
@@ -174,18 +292,21 @@ class MainWindow(tk.Tk):
         # Reinitialize auto-lock timer on user activity
         touch_activity()
 
-        selection = self.account_list.curselection()
-        if not selection:
+        account_id = self.account_list.selection()
+        if account_id is None:
             messagebox.showwarning("Warning", "Please select an account first.")
             return
 
-        index = selection[0]
-        account = self.vault.accounts[index]
+        account = self.vault.reveal(account_id)
 
         from core import copy_password_safely
 
         # Start safe clipboard copy with 20-second timeout
-        copy_password_safely(account.password, timeout=20, callback=self._update_clipboard_countdown)
+        # Ticks arrive on the scheduler thread; only the latest one is drawn
+        copy_password_safely(
+            account.password, timeout=20,
+            callback=self.dispatcher.wrap(self._update_clipboard_countdown, key="clipboard")
+        )
 
         # Immediate UI feedback
         self.status_bar.config(text="Password copied. Clipboard clearing in: 20s")
@@ -197,13 +318,12 @@ class MainWindow(tk.Tk):
         # Reinitialize auto-lock timer on user activity
         touch_activity()
 
-        selection = self.account_list.curselection()
-        if not selection:
+        account_id = self.account_list.selection()
+        if account_id is None:
             messagebox.showwarning("Warning", "Please select an account to edit.")
             return
 
-        index = selection[0]
-        account = self.vault.accounts[index]
+        account = self.vault.reveal(account_id)
 
         from ui.entry_editor import EntryEditor
         editor = EntryEditor(self, account=account)
@@ -211,11 +331,12 @@ class MainWindow(tk.Tk):
 
         if editor.result:
             # Update account in vault
-            self.vault.accounts[index] = editor.result
-            self.vault.save(self.master_password)
+            self.vault.update_account(account_id, editor.result)
+            self.saver.request_save()
 
-            # Refresh display
-            self._refresh_account_list()
+            # Redraw its row and details; the list itself is unchanged
+            self.account_list.refresh([account_id])
+            self._on_select_account(account_id)
             self.status_bar.config(text="Account updated successfully!")
 
     def _delete_account(self):
@@ -225,13 +346,12 @@ class MainWindow(tk.Tk):
         # Reinitialize auto-lock timer on user activity
         touch_activity()
 
-        selection = self.account_list.curselection()
-        if not selection:
+        account_id = self.account_list.selection()
+        if account_id is None:
             messagebox.showwarning("Warning", "Please select an account to delete.")
             return
 
-        index = selection[0]
-        account = self.vault.accounts[index]
+        account = self.vault.get(account_id)
 
         confirm = messagebox.askyesno(
             "Confirm Delete",
@@ -242,8 +362,8 @@ class MainWindow(tk.Tk):
             return
 
         # Delete and save
-        del self.vault.accounts[index]
-        self.vault.save(self.master_password)
+        self.vault.delete_account(account_id)
+        self.saver.request_save()
 
         # Refresh UI
         self._refresh_account_list()
@@ -256,15 +376,28 @@ class MainWindow(tk.Tk):
 
     def _refresh_account_list(self):
         """
-        Load account names into the Listbox.
+        Show the accounts matching the search field (all of them when
+        it is empty) in the account list.
         """
 
-        self.account_list.delete(0, tk.END)
+        import timing
+
+        query = self.search_var.get()
+
+        with timing.span("ui.refresh"):
+            # Only the best matches while searching; everything otherwise
+            if query.strip():
+                account_ids = self.vault.search(query, limit=SEARCH_RESULTS)
+            else:
+                account_ids = self.vault.account_ids()
+
+            with timing.span("ui.list_fill"):
+                self.account_list.set_items(account_ids)
 
-        for account in self.vault.accounts:
-            self.account_list.insert(tk.END, account.name)
+    def _account_label(self, account_id):
+        return self.vault.get(account_id).name
 
-    def _on_select_account(self, event):
+    def _on_select_account(self, account_id):
         """
         Called when user selects an account from the list.
         Displays account details on the right panel.
@@ -275,14 +408,12 @@ class MainWindow(tk.Tk):
         # Reinitialize auto-lock timer on user activity
         touch_activity()
 
-        selection = self.account_list.curselection()
-        if not selection:
-            return
-
-        selected_name = self.account_list.get(selection[0])
+        # Drop the previous account's secrets (lazy vaults re-read them on demand)
+        if self.revealed_id is not None and self.revealed_id != account_id:
+            self.vault.evict(self.revealed_id)
 
-        # Find matching account object
-        account = next(a for a in self.vault.accounts if a.name == selected_name)
+        account = self.vault.reveal(account_id)
+        self.revealed_id = account_id
 
         # Update the right-side labels
         self.details_title.config(text=account.name)
@@ -303,7 +434,8 @@ class MainWindow(tk.Tk):
 
     def _update_clipboard_countdown(self, remaining_seconds):
         """
-        Called every second by core.py to update countdown label.
+        Called every second by core.py (through the dispatcher) to update
+        countdown label.
         """
 
         if remaining_seconds > 0:
@@ -325,59 +457,127 @@ class MainWindow(tk.Tk):
         # Reinitialize auto-lock timer on user activity
         touch_activity()
 
-        query = self.search_var.get().strip().lower()
+        self._refresh_account_list()
 
-        self.account_list.delete(0, tk.END)
+    def _on_save_result(self, error):
+        """
+        Report background save failures in the status bar, and back up
+        what was written.
+        """
+
+        if error is not None:
+            self.status_bar.config(text=f"Could not save changes: {error}")
+        else:
+            self.backups.request()
 
-        for account in self.vault.accounts:
-            if query in account.name.lower():
-                self.account_list.insert(tk.END, account.name)
+    def _on_backup_result(self, error):
+        if error is not None:
+            self.status_bar.config(text=f"Could not back up the vault: {error}")
+
+    def _close_backups(self):
+        """
+        Snapshot the last save too (its result may never reach the
+        dispatcher) and stop the backup thread.
+        """
+
+        self.backups.request()
+        self.backups.close()
+
+    def _flush_saves(self) -> bool:
+        """
+        Write any changes still queued before the session ends.
+        Returns False if the user chose to stay after a failed write.
+        """
+
+        if not self.saver.flush() and not messagebox.askyesno(
+            "Save Failed",
+            f"Some changes could not be saved ({self.saver.last_error}).\n"
+            "Close anyway and lose them?"
+        ):
+            return False
+
+        self.saver.close()
+        self._close_backups()
+        return True
 
     def _lock_vault(self):
         """
         Called automatically when inactivity timeout is reached.
-        Closes the main window and returns user to the master password screen.
+        Closes the main window; main.py then shows the master password
+        screen again.
         """
 
-        messagebox.showinfo("Session Locked", "Your vault was locked due to inactivity.")
+        # A worker is changing the vault; lock once it is done
+        if self._vault_lock.locked():
+            self._lock_when_idle = True
+            return
 
-        self.destroy()
+        from core import clear_clipboard_now, stop_auto_lock_timer
+        stop_auto_lock_timer()
+        clear_clipboard_now()
 
-        # Relaunch master password window
-        from ui.master_password import MasterPasswordWindow
-        MasterPasswordWindow(
-            on_unlock_callback=self._reopen_after_lock,
-            vault=self.vault
-        ).mainloop()
+        # Nothing queued for this window may run once it is gone
+        self.dispatcher.stop()
 
-    def _reopen_after_lock(self, master_password):
+        # Locking can't be refused, so changes are lost only if the write fails
+        self.saver.close()
+        self._close_backups()
+
+        # Wipe the session key before leaving the window
+        self.vault.lock()
+        self.locked = True
+
+        messagebox.showinfo("Session Locked", "Your vault was locked due to inactivity.")
+        self.destroy()
+
+    def _close(self):
         """
-        Called after the user re-enters their password following auto-lock.
+        Save pending changes, wipe the session key and close the main window.
         """
 
-        from vault import Vault
-        from ui.main_window import MainWindow
+        if self._vault_lock.locked():
+            messagebox.showinfo("Import Running", "Wait for the import to finish before closing.")
+            return
+
+        if not self._flush_saves():
+            return
+
+        from core import clear_clipboard_now, stop_auto_lock_timer
+        stop_auto_lock_timer()
+        clear_clipboard_now()
 
-        vault = Vault("vault.enc")
-        vault.load(master_password)
-        MainWindow(vault, master_password).mainloop()
+        self.dispatcher.stop()
+        self.vault.lock()
+        self.destroy()
 
     def _build_menu(self):
         menu_bar = tk.Menu(self)
 
-        # File menu (empty for now, expandable later)
-        file_menu = tk.Menu(menu_bar, tearoff=0)
-        file_menu.add_command(label="Exit", command=self.destroy)
+        # File menu
+        file_menu = self.file_menu = tk.Menu(menu_bar, tearoff=0)
+        file_menu.add_command(label="Import...", command=self._import_accounts)
+        file_menu.add_command(label="Export...", command=self._export_accounts)
+        file_menu.add_separator()
+        file_menu.add_command(label="Exit", command=self._close)
         menu_bar.add_cascade(label="File", menu=file_menu)
 
         # Help menu
         help_menu = tk.Menu(menu_bar, tearoff=0)
         help_menu.add_command(label="About", command=self._open_about_window)
+
+        # Debug panel, only when timing was switched on (VAULT_TIMING)
+        import timing
+        if timing.enabled:
+            help_menu.add_command(label="Timing", command=self._open_timing_panel)
         menu_bar.add_cascade(label="Help", menu=help_menu)
 
         # Attach menu bar to window
         self.config(menu=menu_bar)
 
+    def _open_timing_panel(self):
+        from ui.timing_panel import TimingPanel
+        TimingPanel(self)
+
     def _open_about_window(self):
         about = tk.Toplevel(self)
         about.title("About Password Vault")
@@ -404,6 +604,61 @@ class MainWindow(tk.Tk):
 
         about.grab_set()
 
+    # ====================================
+    # Background work
+    # ====================================
+
+    def _run_in_background(self, message: str, work, on_done):
+        """
+        Run work() on a worker thread holding the vault lock, with the
+        window in its busy state, then call on_done(result, error) on the
+        Tk event loop (error is None on success).
+        """
+
+        if not self._vault_lock.acquire(blocking=False):
+            return
+
+        self._set_busy(True, message)
+
+        def run():
+            try:
+                result, error = work(), None
+            except Exception as e:
+                result, error = None, e
+            finally:
+                self._vault_lock.release()
+
+            self.dispatcher.post(self._finish, on_done, result, error)
+
+        threading.Thread(target=run, daemon=True).start()
+
+    def _finish(self, on_done, result, error):
+        self._set_busy(False)
+        on_done(result, error)
+
+        if self._lock_when_idle:
+            self._lock_when_idle = False
+            self._lock_vault()
+
+    def _set_busy(self, busy: bool, message: str = ""):
+        """
+        Disable everything that changes or lists the vault while a worker
+        has it.
+        """
+
+        state = "disabled" if busy else "normal"
+
+        for button in (self.add_btn, self.copy_user_btn, self.copy_pass_btn, self.edit_btn, self.delete_btn):
+            button.config(state=state)
+
+        self.search_entry.config(state=state)
+        self.file_menu.entryconfig("Import...", state=state)
+        self.file_menu.entryconfig("Export...", state=state)
+
+        self.config(cursor="watch" if busy else "")
+        if busy:
+            self.status_bar.config(text=message)
+
     def _center_window(self, window, width, height):
         screen_width = window.winfo_screenwidth()
         screen_height = window.winfo_screenheight()
@@ -1,3 +1,4 @@
+import threading
 import tkinter as tk
 from tkinter import ttk
 from tkinter import messagebox
@@ -12,15 +13,32 @@ class MasterPasswordWindow(tk.Tk):
     def __init__(self, on_unlock_callback, vault):
         super().__init__()
 
+        # Called with the unlocked vault once the password is accepted
         self.on_unlock_callback = on_unlock_callback
         self.vault = vault
 
+        # Key derivation and decryption run on a worker thread; its
+        # outcome comes back through the dispatcher to the Tk thread
+        from ui.dispatcher import Dispatcher
+        self.dispatcher = Dispatcher(self)
+        self._busy = False
+
         self.title("Password Vault - Unlock")
-        self.geometry("380x230")
+        self.geometry("380x260")
         self.resizable(False, False)
 
         self._build_ui()
-        self._center_window(self, 380, 230)
+        self._center_window(self, 380, 260)
+        self.dispatcher.start()
+
+        # Read the vault file while the user types the password
+        self._preload = threading.Thread(target=self.vault.preload, daemon=True)
+        self._preload.start()
+
+    def destroy(self):
+        # Also closes the dispatcher's wake-up pipe
+        self.dispatcher.stop()
+        super().destroy()
 
     def _build_ui(self):
         # Title label
@@ -41,11 +59,16 @@ class MasterPasswordWindow(tk.Tk):
         btn_frame = ttk.Frame(self)
         btn_frame.pack(pady=15)
 
-        unlock_btn = ttk.Button(btn_frame, text="Unlock", command=self._unlock)
-        unlock_btn.grid(row=0, column=0, padx=5)
+        self.unlock_btn = ttk.Button(btn_frame, text="Unlock", command=self._unlock)
+        self.unlock_btn.grid(row=0, column=0, padx=5)
+
+        self.create_btn = ttk.Button(btn_frame, text="Create New Vault", command=self._create_new)
+        self.create_btn.grid(row=0, column=1, padx=5)
 
-        create_btn = ttk.Button(btn_frame, text="Create New Vault", command=self._create_new)
-        create_btn.grid(row=0, column=1, padx=5)
+        # Busy indicator, shown while the worker runs
+        self.progress = ttk.Progressbar(self, mode="indeterminate", length=220)
+        self.status_label = ttk.Label(self, text="")
+        self.status_label.pack()
 
     def _unlock(self):
         """
@@ -58,21 +81,31 @@ class MasterPasswordWindow(tk.Tk):
             messagebox.showerror("Error", "Please enter a master password.")
             return
 
-        try:
+        def load():
+            # Let the read started in __init__ finish so load() can reuse it
+            self._preload.join()
             self.vault.load(password)
-        except FileNotFoundError:
+
+            # Here rather than on the Tk thread at the first keystroke in
+            # the search box
+            self.vault.build_search_index()
+
+        self._run_in_background("Unlocking...", load, self._on_unlock_done)
+
+    def _on_unlock_done(self, error):
+        if isinstance(error, FileNotFoundError):
             messagebox.showerror("Error", "No vault found. Create a new one.")
             return
-        except ValueError:
+        if isinstance(error, ValueError):
             messagebox.showerror("Error", "Incorrect master password.")
             return
-        except Exception as e:
-            messagebox.showerror("Error", f"Unexpected error: {e}")
+        if error is not None:
+            messagebox.showerror("Error", f"Unexpected error: {error}")
             return
 
         # If we reach this point: loaded successfully
         self.destroy()
-        self.on_unlock_callback(password)
+        self.on_unlock_callback(self.vault)
 
 
     def _create_new(self):
@@ -86,16 +119,67 @@ class MasterPasswordWindow(tk.Tk):
             messagebox.showerror("Error", "Please enter a master password.")
             return
 
-        try:
+        def create():
+            self._preload.join()
             self.vault.create_new(password)
-        except Exception as e:
-            messagebox.showerror("Error", f"Could not create vault: {e}")
+
+        self._run_in_background("Creating vault...", create, self._on_create_done)
+
+    def _on_create_done(self, error):
+        if error is not None:
+            messagebox.showerror("Error", f"Could not create vault: {error}")
             return
 
         messagebox.showinfo("Success", "Vault created successfully!")
 
         self.destroy()
-        self.on_unlock_callback(password)
+        self.on_unlock_callback(self.vault)
+
+    # ====================================
+    # Background work
+    # ====================================
+
+    def _run_in_background(self, message: str, work, on_done):
+        """
+        Run work() on a worker thread with the window in its busy state,
+        then call on_done(error) on the Tk event loop (error is None on
+        success).
+        """
+
+        if self._busy:
+            return
+
+        self._set_busy(True, message)
+
+        def run():
+            try:
+                work()
+            except Exception as e:
+                self.dispatcher.post(self._finish, on_done, e)
+            else:
+                self.dispatcher.post(self._finish, on_done, None)
+
+        threading.Thread(target=run, daemon=True).start()
+
+    def _finish(self, on_done, error):
+        self._set_busy(False)
+        on_done(error)
+
+    def _set_busy(self, busy: bool, message: str = ""):
+        self._busy = busy
+        state = "disabled" if busy else "normal"
+
+        self.unlock_btn.config(state=state)
+        self.create_btn.config(state=state)
+        self.password_entry.config(state=state)
+        self.status_label.config(text=message)
+
+        if busy:
+            self.progress.pack(pady=5, before=self.status_label)
+            self.progress.start(10)
+        else:
+            self.progress.stop()
+            self.progress.pack_forget()
 
     def _center_window(self, window, width, height):
         screen_width = window.winfo_screenwidth()
@@ -0,0 +1,103 @@
+import tkinter as tk
+from tkinter import ttk
+from tkinter import messagebox
+
+import timing
+
+
+# Milliseconds between refreshes of the table
+REFRESH_MS = 1000
+
+COLUMNS = (
+    ("count", "Count", 60),
+    ("mean_ms", "Mean ms", 75),
+    ("p50_ms", "p50 ms", 75),
+    ("p90_ms", "p90 ms", 75),
+    ("p99_ms", "p99 ms", 75),
+    ("max_ms", "Max ms", 75),
+)
+
+
+class TimingPanel(tk.Toplevel):
+    """
+    Debug window showing the timing stats (see timing.py) of every span,
+    refreshed every second while it is open.
+    """
+
+    def __init__(self, parent):
+        super().__init__(parent)
+
+        self.title("Timing")
+        self.geometry("680x360")
+
+        self._after_id = None
+
+        self._build_ui()
+        self._refresh()
+
+    def _build_ui(self):
+        frame = ttk.Frame(self, padding=10)
+        frame.pack(fill="both", expand=True)
+
+        self.table = ttk.Treeview(frame, columns=[c[0] for c in COLUMNS], height=12)
+        self.table.heading("#0", text="Span")
+        self.table.column("#0", width=200)
+
+        for column, title, width in COLUMNS:
+            self.table.heading(column, text=title)
+            self.table.column(column, width=width, anchor="e")
+
+        self.table.pack(fill="both", expand=True)
+
+        btn_frame = ttk.Frame(frame)
+        btn_frame.pack(pady=(10, 0))
+
+        self.toggle_button = ttk.Button(btn_frame, command=self._toggle)
+        self.toggle_button.grid(row=0, column=0, padx=5)
+        ttk.Button(btn_frame, text="Reset", command=self._reset).grid(row=0, column=1, padx=5)
+        ttk.Button(btn_frame, text="Save Stats", command=self._save).grid(row=0, column=2, padx=5)
+        ttk.Button(btn_frame, text="Close", command=self.destroy).grid(row=0, column=3, padx=5)
+
+    def _refresh(self):
+        """
+        Redraw the table, then come back in REFRESH_MS.
+        """
+
+        self.table.delete(*self.table.get_children())
+
+        for name, stats in timing.stats().items():
+            values = [stats["count"]] + [f"{stats[c]:.2f}" for c, _, _ in COLUMNS[1:]]
+            self.table.insert("", "end", text=name, values=values)
+
+        self.toggle_button.config(text="Pause" if timing.enabled else "Resume")
+
+        self._after_id = self.after(REFRESH_MS, self._refresh)
+
+    def destroy(self):
+        # A pending refresh would otherwise run against the dead widgets
+        if self._after_id is not None:
+            self.after_cancel(self._after_id)
+            self._after_id = None
+
+        super().destroy()
+
+    def _toggle(self):
+        if timing.enabled:
+            timing.disable()
+        else:
+            timing.enable(timing.stats_path)
+
+        self.toggle_button.config(text="Pause" if timing.enabled else "Resume")
+
+    def _reset(self):
+        timing.reset()
+        self.table.delete(*self.table.get_children())
+
+    def _save(self):
+        try:
+            path = timing.write_stats()
+        except OSError as e:
+            messagebox.showerror("Save Failed", f"Could not write the stats: {e}", parent=self)
+            return
+
+        messagebox.showinfo("Stats Saved", f"Timing stats written to {path}.", parent=self)
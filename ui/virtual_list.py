@@ -0,0 +1,248 @@
+import tkinter as tk
+from tkinter import ttk
+
+
+class VirtualList(ttk.Frame):
+    """
+    Scrollable list that only ever holds the visible rows in its Listbox.
+
+    The rows come from a sequence of keys (e.g. record ids) and a label
+    function turning a key into the row text, so showing 100k accounts
+    costs as much as showing `height` of them. Selection is tracked by
+    key, not by position, and survives filtering and scrolling.
+    """
+
+    def __init__(self, parent, height: int = 20, label=str, on_select=None):
+        super().__init__(parent)
+
+        self.height = height
+        self.label = label  # key -> row text
+        self.on_select = on_select  # called with the selected key
+
+        self._keys = []  # backing sequence
+        self._positions = None  # key -> position, built on demand
+        self._top = 0  # position shown in the first row
+        self._rows = []  # text currently in each Listbox row
+        self._selected = None
+
+        self.listbox = tk.Listbox(self, height=height, exportselection=False, activestyle="none")
+        self.scrollbar = ttk.Scrollbar(self, orient="vertical", command=self._on_scrollbar)
+
+        self.scrollbar.pack(side="right", fill="y")
+        self.listbox.pack(side="left", fill="both", expand=True)
+
+        self.listbox.bind("<<ListboxSelect>>", self._on_listbox_select)
+
+        # Scrolling moves the window over the keys, not the Listbox itself
+        self.listbox.bind("<MouseWheel>", self._on_mousewheel)
+        self.listbox.bind("<Button-4>", lambda e: self._scroll_by(-3))
+        self.listbox.bind("<Button-5>", lambda e: self._scroll_by(3))
+
+        self.listbox.bind("<Up>", lambda e: self._move_selection(-1))
+        self.listbox.bind("<Down>", lambda e: self._move_selection(1))
+        self.listbox.bind("<Prior>", lambda e: self._move_selection(-self.height))
+        self.listbox.bind("<Next>", lambda e: self._move_selection(self.height))
+        self.listbox.bind("<Home>", lambda e: self._move_selection(-len(self._keys)))
+        self.listbox.bind("<End>", lambda e: self._move_selection(len(self._keys)))
+
+    # ====================================
+    # Content
+    # ====================================
+
+    def set_items(self, keys):
+        """
+        Show a new sequence of keys. The selection is kept if its key is
+        still there; the view goes back to the top.
+        """
+
+        self._keys = keys
+        self._positions = None
+        self._top = 0
+
+        if self._selected is not None and self._position(self._selected) is None:
+            self._selected = None
+
+        self._render()
+
+    def refresh(self, keys=None):
+        """
+        Redraw the visible rows (only those showing one of keys, if
+        given), e.g. after the label of a record changed.
+        """
+
+        if keys is None:
+            self._rows = [None] * len(self._rows)
+        else:
+            changed = set(keys)
+
+            for row in range(len(self._rows)):
+                position = self._top + row
+
+                if position < len(self._keys) and self._keys[position] in changed:
+                    self._rows[row] = None
+
+        self._render()
+
+    def __len__(self):
+        return len(self._keys)
+
+    # ====================================
+    # Selection
+    # ====================================
+
+    def selection(self):
+        """
+        Key of the selected row, or None.
+        """
+
+        return self._selected
+
+    def select(self, key, see: bool = True):
+        """
+        Select the row showing key (without calling on_select).
+        """
+
+        position = self._position(key)
+
+        if position is None:
+            return
+
+        self._selected = key
+
+        if see:
+            self.see(position)
+
+        self._render()
+
+    def clear_selection(self):
+        self._selected = None
+        self._render()
+
+    def see(self, position: int):
+        """
+        Scroll so the row at position is visible.
+        """
+
+        if position < self._top:
+            self._scroll_to(position)
+        elif position >= self._top + self.height:
+            self._scroll_to(position - self.height + 1)
+
+    def _position(self, key):
+        if self._positions is None:
+            self._positions = {k: i for i, k in enumerate(self._keys)}
+
+        return self._positions.get(key)
+
+    def _on_listbox_select(self, event=None):
+        selection = self.listbox.curselection()
+
+        if not selection:
+            return
+
+        position = self._top + selection[0]
+
+        if position >= len(self._keys):
+            self._render()  # clicked an empty row
+            return
+
+        self._choose(self._keys[position])
+
+    def _move_selection(self, delta: int):
+        if not self._keys:
+            return "break"
+
+        position = self._position(self._selected) if self._selected is not None else None
+
+        if position is None:
+            position = self._top if delta > 0 else self._top + self.height - 1
+        else:
+            position += delta
+
+        position = max(0, min(len(self._keys) - 1, position))
+
+        self.see(position)
+        self._choose(self._keys[position])
+
+        return "break"
+
+    def _choose(self, key):
+        self._selected = key
+        self._render()
+
+        if self.on_select is not None:
+            self.on_select(key)
+
+    # ====================================
+    # Scrolling
+    # ====================================
+
+    def _max_top(self) -> int:
+        return max(0, len(self._keys) - self.height)
+
+    def _scroll_to(self, top: int):
+        top = max(0, min(self._max_top(), top))
+
+        if top != self._top:
+            self._top = top
+            self._render()
+
+    def _scroll_by(self, rows: int):
+        self._scroll_to(self._top + rows)
+        return "break"
+
+    def _on_mousewheel(self, event):
+        # Windows reports multiples of 120, macOS small deltas
+        step = event.delta // 120 if abs(event.delta) >= 120 else event.delta
+        return self._scroll_by(-3 * step)
+
+    def _on_scrollbar(self, action, amount, unit=None):
+        if action == "moveto":
+            self._scroll_to(round(float(amount) * len(self._keys)))
+        elif action == "scroll":
+            rows = self.height if unit == "pages" else 1
+            self._scroll_by(int(amount) * rows)
+
+    # ====================================
+    # Drawing
+    # ====================================
+
+    def _render(self):
+        """
+        Bring the Listbox in line with the visible keys, touching only
+        rows whose text changed.
+        """
+
+        self._top = min(self._top, self._max_top())
+
+        visible = self._keys[self._top:self._top + self.height]
+        texts = [self.label(key) for key in visible]
+
+        for row, text in enumerate(texts):
+            if row < len(self._rows):
+                if self._rows[row] == text:
+                    continue
+
+                self.listbox.delete(row)
+
+            self.listbox.insert(row, text)
+
+        # Fewer keys than rows now
+        if len(self._rows) > len(texts):
+            self.listbox.delete(len(texts), tk.END)
+
+        self._rows = texts
+
+        self.listbox.selection_clear(0, tk.END)
+
+        if self._selected is not None:
+            for row, key in enumerate(visible):
+                if key == self._selected:
+                    self.listbox.selection_set(row)
+                    break
+
+        total = len(self._keys)
+        if total:
+            self.scrollbar.set(self._top / total, (self._top + len(visible)) / total)
+        else:
+            self.scrollbar.set(0, 1)
@@ -1,89 +1,945 @@
 import os
-import json
+import threading
+import uuid
 
-from crypto_utils import derive_key, encrypt_data, decrypt_data
+from crypto_utils import (
+    derive_key_from_params, decrypt_data, encrypt_bytes, decrypt_bytes,
+    decrypt_into, check_compression, SessionKey, DEFAULT_KDF_PARAMS
+)
 from models import Account
+import fileio
+import timing
+from payload_codec import get_codec, DEFAULT_ENCODING
+from search_index import SearchIndex
+import vault_format
+from vault_format import OP_PUT, OP_DELETE, OP_INDEX, OP_BODY, FRAME_HEADER
+
+
+# Rewrite the file once it holds more stale frames than this and
+# more stale frames than live ones
+COMPACT_MIN_STALE_FRAMES = 64
+
+# Read size when preload() only warms the OS cache
+PRELOAD_CHUNK_SIZE = 1 << 20
+
+# Fields stored in the INDEX frame; everything else goes in the BODY frame
+INDEX_FIELDS = ("name", "category")
+BODY_FIELDS = ("username", "password", "notes")
+
+FIELDS_BY_OP = {
+    OP_INDEX: INDEX_FIELDS,
+    OP_BODY: BODY_FIELDS,
+    OP_PUT: INDEX_FIELDS + BODY_FIELDS,
+}
+
+
+class SaveBatch:
+    """
+    Pending changes snapshotted by Vault.prepare_save(), so they can be
+    sealed and written later (and on another thread) by write_batch().
+
+    puts    : record id -> account dict to write, in account order
+    deletes : record ids to delete
+    rewrite : None to append to the file, or the full record order when
+              the file must be rewritten (records not in puts are copied)
+    """
+
+    def __init__(self, puts: dict = None, deletes: list = None, rewrite: list = None, generation: int = 0):
+        self.puts = puts if puts is not None else {}
+        self.deletes = deletes if deletes is not None else []
+        self.rewrite = rewrite
+        self.generation = generation
+
+    def __bool__(self):
+        return bool(self.puts or self.deletes or self.rewrite is not None)
+
+    def merge(self, later: "SaveBatch") -> "SaveBatch":
+        """
+        Combine with a batch prepared after this one; later changes win.
+        """
+
+        gone = set(later.deletes)
+
+        puts = {rid: data for rid, data in self.puts.items() if rid not in gone}
+        puts.update(later.puts)
+
+        if later.rewrite is not None:
+            rewrite = later.rewrite
+        elif self.rewrite is not None:
+            rewrite = [rid for rid in self.rewrite if rid not in gone]
+            known = set(rewrite)
+            rewrite += [rid for rid in later.puts if rid not in known]
+        else:
+            rewrite = None
+
+        return SaveBatch(
+            puts, self.deletes + later.deletes, rewrite,
+            max(self.generation, later.generation)
+        )
 
 
 class Vault:
     """
     Handles loading, saving, encrypting, and decrypting the password vault.
+
+    Accounts are keyed by their id (Account.id, the 16-byte record id of
+    their frames on disk), in insertion order. Look them up with get()
+    and change them through add_account / update_account /
+    delete_account, all O(1), so save() knows which records to write.
+
+    save() can also be split in two: prepare_save() on the thread that
+    owns the accounts, and write_batch() on a worker thread (see saver.py).
+    Settings changes (rekey, set_compression) expect no write in flight.
+
+    With lazy=True, load() only decrypts names and categories. The
+    username, password and notes of an account stay None until reveal()
+    reads them from disk, and evict() drops them again. search() then
+    only sees the fields that were loaded when the index was built.
     """
 
-    def __init__(self, filepath: str):
+    def __init__(self, filepath: str, lazy: bool = False):
         self.filepath = filepath
-        self.accounts = []  # List[Account]
+        self.lazy = lazy
+        self._accounts = {}  # account id -> Account, in vault order
         self.salt = None
+        self.kdf_params = None  # e.g. {"algorithm": "pbkdf2-sha256", "iterations": 200000}
+        self.encoding = DEFAULT_ENCODING  # payload codec of the records
+        self.compression = None  # e.g. {"algorithm": "zlib", "level": 6} for BODY frames
+        self.key = None  # SessionKey, set while the vault is unlocked
+
+        # Storage bookkeeping for the record-level format
+        self._spans = {}  # record id -> (index span, body span) on disk
+        self._dirty = {}  # record ids to (re)write on the next save, in order (values unused)
+        self._new = set()  # record ids not yet on disk
+        self._deleted = []  # record ids to delete on the next save
+        self._file_size = 0  # end of the last complete change on disk
+        self._stale_frames = 0  # frames on disk superseded by later ones
+        self._needs_compaction = False
 
-    def create_new(self, master_password: str):
+        # Built by the first search() and kept up to date by the mutators
+        self._search_index = None
+
+        # File read ahead of load() by preload(): (file signature, contents)
+        self._preloaded = None
+
+        # Saves written by another thread (see write_batch)
+        self._io_lock = threading.Lock()  # the file and self._spans
+        self._state_lock = threading.Lock()  # self._in_flight
+        self._in_flight = {}  # record id -> generation of its unwritten batch
+        self._generation = 0
+
+    def create_new(self, master_password: str, kdf_params: dict = None, compression: dict = None):
         """
         Create a brand new vault with a fresh salt.
+        kdf_params defaults to DEFAULT_KDF_PARAMS (see crypto_utils.calibrate_kdf).
+        compression is None or e.g. {"algorithm": "zlib", "level": 6}.
         """
 
-        self.salt = os.urandom(16)  # new salt
-        key = derive_key(master_password, self.salt)
-
-        # Start with an empty vault structure
-        data = {"accounts": []}
+        check_compression(compression)
 
-        encrypted = encrypt_data(key, data)
+        self.salt = os.urandom(vault_format.SALT_SIZE)  # new salt
+        self.kdf_params = dict(kdf_params or DEFAULT_KDF_PARAMS)
+        self.encoding = DEFAULT_ENCODING
+        self.compression = compression
+        self._set_key(derive_key_from_params(master_password, self.salt, self.kdf_params))
 
-        # Save format: salt + encrypted blob
-        with open(self.filepath, "wb") as f:
-            f.write(self.salt + encrypted)
+        # Start with an empty vault
+        self._accounts = {}
+        self._spans = {}
+        self._preloaded = None
+        self._reset_search()
 
-        self.accounts = []
+        self.compact()
 
     def load(self, master_password: str):
         """
         Load and decrypt an existing vault.
         Raises ValueError if password is incorrect.
+        Files in an older format are upgraded in place.
         """
 
         if not os.path.exists(self.filepath):
             raise FileNotFoundError("Vault file not found.")
 
-        with open(self.filepath, "rb") as f:
-            blob = f.read()
+        # A compaction that crashed before its rename left only a temp file
+        fileio.discard_temp(self.filepath)
 
-        # Extract salt (first 16 bytes)
-        self.salt = blob[:16]
-        encrypted = blob[16:]
+        with timing.span("unlock.total"), open(self.filepath, "rb") as f:
+            if self.lazy and self._has_index_frames(f.read(vault_format.PREFIX_SIZE)):
+                self._load_index(f, master_password)
+            else:
+                blob = self._take_preloaded(f) or self._read_file(f)
 
-        key = derive_key(master_password, self.salt)
+                if vault_format.is_record_format(blob):
+                    self._load_records(blob, master_password)
+                else:
+                    self._load_legacy(blob, master_password)
+
+        # Kept after a wrong password so the next attempt skips the read
+        self._preloaded = None
+
+        if self._needs_compaction:
+            try:
+                self.compact()
+            except OSError:
+                pass  # Read-only location: retried on the next save
+
+    def preload(self):
+        """
+        Read the vault file ahead of load(), e.g. on another thread while
+        the user types the master password. load() uses the contents if
+        the file has not changed in between. Lazy vaults only read the
+        file to warm the OS cache, since they never hold all of it.
+        """
+
+        try:
+            with open(self.filepath, "rb") as f:
+                if self.lazy and self._has_index_frames(f.read(vault_format.PREFIX_SIZE)):
+                    while f.read(PRELOAD_CHUNK_SIZE):
+                        pass
+                    return
+
+                signature = self._file_signature(f)
+                self._preloaded = (signature, self._read_file(f))
+        except OSError:
+            pass  # load() reports it
+
+    def _take_preloaded(self, f):
+        preloaded = self._preloaded
+
+        if preloaded is None or preloaded[0] != self._file_signature(f):
+            return None
+
+        return preloaded[1]
+
+    @staticmethod
+    def _file_signature(f) -> tuple:
+        info = os.fstat(f.fileno())
+        return info.st_ino, info.st_size, info.st_mtime_ns
+
+    @staticmethod
+    def _read_file(f) -> bytearray:
+        """
+        Read the whole file into one preallocated buffer. Everything
+        downstream works on memoryviews of it, so the ciphertext is never
+        copied again.
+        """
+
+        size = os.fstat(f.fileno()).st_size
+        blob = bytearray(size)
+
+        f.seek(0)
+        with timing.span("vault.read"), memoryview(blob) as view:
+            filled = 0
+            while filled < size:
+                n = f.readinto(view[filled:])
+                if not n:
+                    break
+                filled += n
+
+        # File shrank while reading; keep what we got
+        del blob[filled:]
+
+        return blob
+
+    def _load_legacy(self, blob: bytes, master_password: str):
+        """
+        Load a version 1 file (one ciphertext for the whole vault).
+        It is then rewritten in the record-level format.
+        """
+
+        # Extract salt (first 16 bytes); the ciphertext is a view, not a copy
+        view = memoryview(blob)
+        self.salt = bytes(view[:16])
+        encrypted = view[16:]
+
+        self.kdf_params = dict(vault_format.LEGACY_KDF)
+        self.compression = None
+
+        # Every record gets re-sealed on upgrade, so use the current codec
+        self.encoding = DEFAULT_ENCODING
+        key = derive_key_from_params(master_password, self.salt, self.kdf_params)
 
         try:
             data = decrypt_data(key, encrypted)
         except Exception:
             raise ValueError("Incorrect master password.")
 
-        # Convert dicts → Account objects
-        self.accounts = [
-            Account.from_dict(acc) for acc in data.get("accounts", [])
-        ]
+        # Keep the key for the rest of the session so saves skip the KDF
+        self._set_key(key)
+
+        # Convert dicts → Account objects; version 1 had no ids
+        self._accounts = {}
+        with timing.span("unlock.from_dict"):
+            for acc in data.get("accounts", []):
+                account = Account.from_dict(acc)
+                account.id = self._new_record_id()
+                self._accounts[account.id] = account
+
+        self._spans = {}
+        self._reset_pending()
+        self._reset_search()
+
+        self._needs_compaction = True
+
+    def _unlock_header(self, header_blob: bytes, master_password: str):
+        """
+        Derive the key with the salt and KDF settings from the header
+        and verify it.
+        Returns: (version, key, offset of the first frame)
+        """
+
+        info = vault_format.read_header(header_blob)
+
+        # Fail before the KDF if we can't read the records anyway
+        get_codec(info["encoding"])
+        check_compression(info["compression"])
+
+        self.salt = info["salt"]
+        self.kdf_params = info["kdf"]
+        self.encoding = info["encoding"]
+        self.compression = info["compression"]
+
+        key = derive_key_from_params(master_password, self.salt, self.kdf_params)
+
+        try:
+            decrypt_bytes(key, info["key_check"], info["header"])
+        except Exception:
+            raise ValueError("Incorrect master password.")
+
+        return info["version"], key, info["offset"]
+
+    def _load_records(self, blob: bytes, master_password: str):
+        """
+        Load a record-level file by replaying its frames in order,
+        decrypting every live record.
+        """
+
+        version, key, offset = self._unlock_header(blob, master_password)
+
+        with timing.span("unlock.replay"):
+            live, stale, end = vault_format.replay(vault_format.iter_frames(blob, offset), version)
+
+        # One plaintext buffer reused for every record
+        scratch = bytearray()
+
+        # AES, payload decoding and Account construction, summed over records
+        laps = timing.laps("unlock")
+
+        accounts = []
+        for record_id, (index_span, body_span) in live.items():
+            data = {}
+
+            if index_span is not None:
+                data.update(self._open(key, blob, OP_INDEX, record_id, index_span, scratch, laps))
+
+            op = OP_BODY if index_span is not None else OP_PUT
+            data.update(self._open(key, blob, op, record_id, body_span, scratch, laps))
+
+            account = Account.from_dict(data)
+            account.id = record_id
+            accounts.append(account)
+            laps.mark("from_dict")
+
+        laps.done()
+
+        self._set_key(key)
+        self._apply_replay(version, live, stale, end or offset, accounts)
+
+    @staticmethod
+    def _has_index_frames(prefix: bytes) -> bool:
+        """
+        Only record files with INDEX frames can be loaded lazily.
+        """
+
+        if not vault_format.is_record_format(prefix) or len(prefix) < vault_format.PREFIX_SIZE:
+            return False
+
+        return prefix[len(vault_format.MAGIC)] >= vault_format.INDEX_FRAMES_VERSION
+
+    def _load_index(self, f, master_password: str):
+        """
+        Lazy load: decrypt only the INDEX frames, reading frame headers
+        and index payloads straight from the file.
+        """
+
+        f.seek(0)
+        size = vault_format.header_size(f.read(vault_format.PREFIX_SIZE))
+
+        f.seek(0)
+        version, key, offset = self._unlock_header(f.read(size), master_password)
+
+        with timing.span("unlock.replay"):
+            live, stale, end = vault_format.replay(vault_format.iter_file_frames(f, offset), version)
+
+        laps = timing.laps("unlock")
+
+        accounts = []
+        for record_id, (index_span, _) in live.items():
+            f.seek(index_span[0])
+            sealed = f.read(index_span[1] - index_span[0])
+            laps.mark("read")
+
+            data = self._open(key, sealed, OP_INDEX, record_id, (0, len(sealed)), laps=laps)
+            account = Account.from_dict(data)
+            account.id = record_id
+            self._clear_body(account)
+            accounts.append(account)
+            laps.mark("from_dict")
+
+        laps.done()
+
+        self._set_key(key)
+        self._apply_replay(version, live, stale, end or offset, accounts)
+
+    def _apply_replay(self, version: int, live: dict, stale: int, end: int, accounts: list):
+        self._accounts = dict(zip(live, accounts))
+        self._spans = live
+        self._reset_pending()
+        self._reset_search()
+
+        self._file_size = end
+        self._stale_frames = stale
+
+        # Upgrade older record files
+        self._needs_compaction = version < vault_format.FORMAT_VERSION
+
+    def _open(self, key, blob, op: int, record_id: bytes, span, scratch: bytearray = None,
+              laps=timing.NULL) -> dict:
+        """
+        Decrypt and decode one frame payload located at span in blob.
+        Uncompressed payloads are decrypted into scratch when given.
+        laps (see timing.laps) gets a "decrypt" and a "decode" mark.
+        """
+
+        start, end = span
+        associated_data = vault_format.frame_associated_data(op, record_id)
+        compression = self._compression_for(op)
+        codec = get_codec(self.encoding)
+
+        try:
+            with memoryview(blob) as view:
+                sealed = view[start:end]
+
+                if scratch is None or compression is not None:
+                    payload = decrypt_bytes(key, sealed, associated_data, compression)
+                    laps.mark("decrypt")
+
+                    data = codec.decode(payload, FIELDS_BY_OP[op])
+                    laps.mark("decode")
+                    return data
+
+                size = decrypt_into(key, sealed, scratch, associated_data)
+                laps.mark("decrypt")
+
+            # The view is released before scratch can be resized by the next record
+            with memoryview(scratch) as plain:
+                data = codec.decode(plain[:size], FIELDS_BY_OP[op])
+
+            laps.mark("decode")
+            return data
+        except Exception:
+            raise ValueError(f"Vault record {record_id.hex()} is corrupted.")
+
+    def reveal(self, record_id: bytes) -> Account:
+        """
+        Return the account with its username, password and notes loaded,
+        decrypting its BODY frame from disk if needed.
+        """
+
+        account = self._accounts[record_id]
+
+        if account.password is not None:
+            return account
+
+        # A background save may be swapping the file underneath us
+        with self._io_lock:
+            start, end = self._spans[record_id][1]
+
+            with open(self.filepath, "rb") as f:
+                f.seek(start)
+                sealed = f.read(end - start)
+
+        with timing.span("vault.reveal"):
+            data = self._open(self.key.material, sealed, OP_BODY, record_id, (0, len(sealed)))
+
+        account.username = data.get("username", "")
+        account.password = data.get("password", "")
+        account.notes = data.get("notes", "")
+
+        return account
+
+    def evict(self, record_id: bytes):
+        """
+        Drop the decrypted body of an account loaded lazily.
+        Unsaved changes are kept in memory.
+        """
+
+        if not self.lazy or record_id not in self._accounts:
+            return
+
+        # Also keep bodies whose latest version is not on disk yet
+        if record_id in self._dirty or record_id in self._in_flight or record_id not in self._spans:
+            return
+
+        self._clear_body(self._accounts[record_id])
+
+    @staticmethod
+    def _clear_body(account: Account):
+        account.username = None
+        account.password = None
+        account.notes = None
+
+    def save(self):
+        """
+        Write pending changes with the session key.
+        Only records added, edited or deleted since the last save are
+        appended, as one COMMIT-terminated group with a single fsync; the
+        file is compacted once enough stale frames pile up.
+        """
+
+        batch = self.prepare_save()
+
+        if not batch:
+            return
+
+        try:
+            self.write_batch(batch)
+        except Exception:
+            self._requeue(batch)
+            raise
+
+    def prepare_save(self) -> "SaveBatch":
+        """
+        Snapshot the pending changes into a SaveBatch and clear them.
+        Cheap (no encryption or I/O); call it on the thread that changes
+        the accounts, then hand the batch to write_batch() on any thread.
+        """
+
+        if self.key is None:
+            raise RuntimeError("Vault is locked.")
+
+        with timing.span("save.prepare"):
+            return self._prepare_save()
+
+    def _prepare_save(self) -> "SaveBatch":
+        if self._needs_compaction:
+            rewrite = list(self._accounts)
+            changed = [rid for rid in rewrite if rid in self._dirty or not self._copyable(rid)]
+        else:
+            # Only the changed records, in the order they were first changed
+            rewrite = None
+            changed = self._dirty
+
+        with self._state_lock:
+            self._generation += 1
+            generation = self._generation
+
+            puts = {}
+            for record_id in changed:
+                puts[record_id] = self._accounts[record_id].to_dict()
+                self._in_flight[record_id] = generation
+
+        batch = SaveBatch(puts, list(self._deleted), rewrite, generation)
+
+        self._needs_compaction = False
+        self._reset_pending()
 
-    def save(self, master_password: str):
+        return batch
+
+    def write_batch(self, batch: "SaveBatch"):
         """
-        Encrypt and save the current vault state.
+        Seal and write a batch from prepare_save(). Safe to run on a worker
+        thread: the storage state and the file are only touched while
+        holding the I/O lock, which reveal() also takes.
         """
 
-        key = derive_key(master_password, self.salt)
+        if self.key is None:
+            raise RuntimeError("Vault is locked.")
+
+        with self._io_lock, timing.span("save.write"):
+            if batch.rewrite is not None:
+                self._rewrite(batch.rewrite, batch.puts)
+            else:
+                self._append(batch)
+
+                if self._should_compact():
+                    self._rewrite(list(self._spans), {})
+
+        with self._state_lock:
+            for record_id in batch.puts:
+                if self._in_flight.get(record_id, 0) <= batch.generation:
+                    self._in_flight.pop(record_id, None)
+
+    def _requeue(self, batch: "SaveBatch"):
+        """
+        Put the changes of a batch that failed to write back into the
+        pending state, so the next save retries them.
+        """
+
+        for record_id in batch.puts:
+            if record_id in self._accounts:
+                self._dirty[record_id] = None
+
+                if record_id not in self._spans:
+                    self._new.add(record_id)
+
+        self._deleted.extend(batch.deletes)
+
+        if batch.rewrite is not None:
+            self._needs_compaction = True
+
+    def _copyable(self, record_id: bytes) -> bool:
+        """
+        Whether the record's current frames on disk can be copied as-is.
+        """
+
+        spans = self._spans.get(record_id)
+        return spans is not None and spans[0] is not None
+
+    def _append(self, batch: "SaveBatch"):
+        chunk = bytearray()
+        stale = 1  # the COMMIT frame only marks the group
+
+        for record_id in batch.deletes:
+            chunk += self._seal_frame(OP_DELETE, record_id, b"")
+
+            # The delete frame, plus the INDEX/BODY pair it removes
+            stale += 3 if self._spans.pop(record_id, None) else 1
+
+        new_spans = {}
+        for record_id, data in batch.puts.items():
+            new_spans[record_id] = self._append_record(chunk, self._file_size, record_id, data)
+
+            if record_id in self._spans:
+                stale += 2
+
+        chunk += vault_format.pack_commit()
+
+        # Overwrites any uncommitted group left behind by an interrupted save
+        with timing.span("save.sync"), open(self.filepath, "r+b") as f:
+            fileio.append_durably(f, self._file_size, chunk)
+
+        self._spans.update(new_spans)
+        self._file_size += len(chunk)
+        self._stale_frames += stale
+
+    def compact(self):
+        """
+        Rewrite the whole file with one INDEX/BODY pair per live record,
+        including any pending changes.
+        Unchanged records are copied as-is from the current file, without
+        decrypting them. Written to a temporary file, fsynced and swapped
+        in atomically (see fileio.atomic_write).
+        """
 
-        # Convert Account objects → dicts
-        data = {
-            "accounts": [acc.to_dict() for acc in self.accounts]
-        }
+        self._needs_compaction = True
+        self.save()
 
-        encrypted = encrypt_data(key, data)
+    def _rewrite(self, order: list, puts: dict):
+        """
+        Write a fresh file holding the records in order: sealed from puts
+        when present there, otherwise copied from the current file.
+        """
+
+        header = vault_format.pack_header(
+            self.salt, self.kdf_params, self.encoding, self.compression
+        )
+        key_check = encrypt_bytes(self.key.material, b"", header)
+
+        out = bytearray(header + key_check)
+        spans = {}
+
+        source = None
+        if len(puts) < len(order):
+            source = open(self.filepath, "rb")
+
+        try:
+            for record_id in order:
+                data = puts.get(record_id)
+
+                if data is not None:
+                    spans[record_id] = self._append_record(out, 0, record_id, data)
+                else:
+                    spans[record_id] = self._copy_record(out, source, self._spans[record_id])
+        finally:
+            if source is not None:
+                source.close()
+
+        out += vault_format.pack_commit()
+
+        with timing.span("save.sync"):
+            fileio.atomic_write(self.filepath, out)
+
+        self._spans = spans
+        self._file_size = len(out)
+        self._stale_frames = 0
+
+    def _append_record(self, out: bytearray, base: int, record_id: bytes, data: dict):
+        """
+        Seal an account dict as an INDEX/BODY pair onto out, which will be
+        written at file offset base. Returns the new (index span, body span).
+        """
+
+        codec = get_codec(self.encoding)
+
+        spans = []
+        for op in (OP_INDEX, OP_BODY):
+            payload = codec.encode(data, FIELDS_BY_OP[op])
+            frame = self._seal_frame(op, record_id, payload)
+
+            start = base + len(out) + FRAME_HEADER.size
+            out += frame
+            spans.append((start, base + len(out)))
+
+        return tuple(spans)
+
+    @staticmethod
+    def _copy_record(out: bytearray, source, old_spans):
+        """
+        Copy an unchanged INDEX/BODY pair verbatim from the current file.
+        """
+
+        spans = []
+        for start, end in old_spans:
+            source.seek(start - FRAME_HEADER.size)
+            frame = source.read(end - start + FRAME_HEADER.size)
+
+            new_start = len(out) + FRAME_HEADER.size
+            out += frame
+            spans.append((new_start, len(out)))
+
+        return tuple(spans)
+
+    def rekey(self, master_password: str, kdf_params: dict = None):
+        """
+        Re-encrypt the whole vault under a new salt, and optionally new KDF
+        settings or a new master password. Keeps the current KDF settings
+        if kdf_params is None. Records are re-encoded with the default codec.
+        """
+
+        if self.key is None:
+            raise RuntimeError("Vault is locked.")
+
+        self._reveal_all()
+
+        self.salt = os.urandom(vault_format.SALT_SIZE)
+        self.kdf_params = dict(kdf_params or self.kdf_params)
+        self.encoding = DEFAULT_ENCODING
+        self._set_key(derive_key_from_params(master_password, self.salt, self.kdf_params))
+
+        self._reseal_all()
+
+    def set_compression(self, compression: dict):
+        """
+        Switch BODY compression on (e.g. {"algorithm": "lzma", "level": 9})
+        or off (None). Rewrites every record.
+        """
 
-        with open(self.filepath, "wb") as f:
-            f.write(self.salt + encrypted)
+        if self.key is None:
+            raise RuntimeError("Vault is locked.")
+
+        check_compression(compression)
+
+        self._reveal_all()
+        self.compression = compression
+        self._reseal_all()
+
+    def _reveal_all(self):
+        # Every record is about to be re-sealed, so lazily loaded bodies are needed
+        for record_id in self._accounts:
+            self.reveal(record_id)
+
+    def _reseal_all(self):
+        # Frames on disk no longer match the settings, so none can be copied
+        self._spans = {}
+        self.compact()
+
+    def lock(self):
+        """
+        End the session: wipe the key and drop decrypted accounts.
+        """
+
+        if self.key is not None:
+            self.key.wipe()
+            self.key = None
+
+        self._accounts = {}
+        self._spans = {}
+        self._in_flight = {}
+        self._preloaded = None
+        self._reset_pending()
+        self._reset_search()
+
+    @property
+    def is_unlocked(self) -> bool:
+        return self.key is not None
+
+    def _set_key(self, key: bytes):
+        if self.key is not None:
+            self.key.wipe()
+
+        self.key = SessionKey(key)
+
+    def _should_compact(self) -> bool:
+        return (
+            self._stale_frames >= COMPACT_MIN_STALE_FRAMES
+            and self._stale_frames > 2 * len(self._spans)
+        )
+
+    def _seal_frame(self, op: int, record_id: bytes, payload: bytes) -> bytes:
+        sealed = encrypt_bytes(
+            self.key.material, payload,
+            vault_format.frame_associated_data(op, record_id),
+            self._compression_for(op)
+        )
+        return vault_format.pack_frame(op, record_id, sealed)
+
+    def _compression_for(self, op: int):
+        # Only BODY frames (which hold the notes) are worth compressing
+        return self.compression if op == OP_BODY else None
+
+    @staticmethod
+    def _new_record_id() -> bytes:
+        return uuid.uuid4().bytes
+
+    def _reset_pending(self):
+        self._dirty = {}
+        self._new = set()
+        self._deleted = []
+
+    @property
+    def accounts(self):
+        """
+        All accounts in vault order (a live, read-only view).
+        """
+
+        return self._accounts.values()
+
+    def __len__(self):
+        return len(self._accounts)
+
+    def get(self, account_id: bytes) -> Account:
+        """
+        The account with account_id, or None. Bodies of a lazily loaded
+        vault may be None; use reveal() to read them.
+        """
+
+        return self._accounts.get(account_id)
+
+    def account_ids(self) -> list:
+        """
+        Ids of all accounts, in vault order.
+        """
+
+        return list(self._accounts)
+
+    def search(self, query: str, limit: int = None) -> list:
+        """
+        Ids of the accounts matching query, in vault order.
+        With limit, only the best matches (at most limit), best first.
+        See search_index for the matching and ranking rules.
+        """
+
+        self.build_search_index()
+
+        with timing.span("search.query"):
+            if limit is not None:
+                return self._search_index.rank(query, limit)
+
+            matches = self._search_index.search(query)
+
+            if len(matches) == len(self._accounts):
+                return list(self._accounts)
+
+            return [account_id for account_id in self._accounts if account_id in matches]
+
+    def build_search_index(self):
+        """
+        Index the accounts for search(), if not done yet. Done on the
+        first search otherwise; call it after load() off the UI thread,
+        since it takes seconds on a six-figure vault.
+        """
+
+        if self._search_index is None:
+            with timing.span("search.build"):
+                self._search_index = SearchIndex()
+                self._search_index.add_many(self._accounts.items())
+
+    def _reset_search(self):
+        self._search_index = None
+
+    def add_account(self, account: Account) -> bytes:
+        """
+        Add an account and return its id. A new id is assigned unless
+        the account already has one that is not in use.
+        """
+
+        if account.id is None or account.id in self._accounts:
+            account.id = self._new_record_id()
+
+        record_id = account.id
+
+        self._accounts[record_id] = account
+        self._dirty[record_id] = None
+        self._new.add(record_id)
+
+        if self._search_index is not None:
+            self._search_index.add(record_id, account)
+
+        return record_id
+
+    def add_accounts(self, accounts) -> list:
+        """
+        Add many accounts at once (e.g. an import) and return their ids.
+        The search index, if built, is updated in one bulk pass.
+        """
+
+        added = []
+
+        for account in accounts:
+            if account.id is None or account.id in self._accounts:
+                account.id = self._new_record_id()
+
+            self._accounts[account.id] = account
+            self._dirty[account.id] = None
+            self._new.add(account.id)
+            added.append(account)
+
+        if self._search_index is not None:
+            self._search_index.add_many((account.id, account) for account in added)
+
+        return [account.id for account in added]
+
+    def delete_account(self, account_id: bytes):
+        del self._accounts[account_id]
+
+        self._dirty.pop(account_id, None)
+
+        if self._search_index is not None:
+            self._search_index.remove(account_id)
+
+        with self._state_lock:
+            self._in_flight.pop(account_id, None)
+
+        # Never written, so there is nothing on disk to delete
+        if account_id in self._new:
+            self._new.discard(account_id)
+            return
+
+        self._deleted.append(account_id)
+
+    def update_account(self, account_id: bytes, updated: Account):
+        """
+        Replace the account with account_id (keeping its id and position).
+        """
 
-    def add_account(self, account: Account):
-        self.accounts.append(account)
+        if account_id not in self._accounts:
+            raise KeyError(account_id)
 
-    def delete_account(self, index: int):
-        del self.accounts[index]
+        updated.id = account_id
+        self._accounts[account_id] = updated
+        self._dirty[account_id] = None
 
-    def update_account(self, index: int, updated: Account):
-        self.accounts[index] = updated
+        if self._search_index is not None:
+            self._search_index.add(account_id, updated)
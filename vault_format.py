@@ -0,0 +1,302 @@
+"""
+On-disk layout of the record-level vault file.
+
+    header : MAGIC (4) | version (1) | settings length (2) | settings | key check (28)
+    frames : op (1) | record id (16) | length (4) | sealed payload
+
+The settings block is UTF-8 JSON describing how to open the file, e.g.
+
+    {"salt": "<hex>",
+     "kdf": {"algorithm": "pbkdf2-sha256", "iterations": 200000},
+     "encoding": "binary",
+     "compression": {"algorithm": "zlib", "level": 6}}
+
+so KDF cost can be tuned per vault without breaking older files.
+"compression" is null when BODY payloads are stored uncompressed; when
+set, each BODY payload is compressed before it is sealed. INDEX payloads
+are small and never compressed.
+
+Every account is stored as two frames, each sealed on its own with
+AES-GCM (nonce + tag + ciphertext): an INDEX frame with the fields needed
+to list and search the vault (name, category) immediately followed by a
+BODY frame with the secrets (username, password, notes). A lazy load only
+decrypts INDEX frames and remembers where each BODY lives.
+
+Edits are appended as new frames, so the file is a change log: the last
+INDEX/BODY pair for a record id wins and a DELETE removes it. Each save
+appends its changes as one group terminated by a COMMIT frame (empty
+payload, all-zero record id) and fsyncs once, so several edits cost one
+durable write. On load, frames after the last COMMIT belong to a save
+that never finished and are ignored; the next save overwrites them.
+Vault.compact() rewrites the file with only the live records into a
+temporary file and atomically renames it over the vault.
+
+The key check is an empty payload sealed with the header as associated
+data; it lets load() reject a wrong password even for an empty vault.
+
+Older files are still readable and are upgraded when loaded:
+    version 1 (no MAGIC): salt (16) | nonce (12) | tag (16) | whole-vault JSON ciphertext
+    version 2: MAGIC | version | salt (16) | key check, one PUT frame per account
+    version 3: as version 2 but with INDEX/BODY frames
+    version 4: settings block without "compression"
+    version 5: no COMMIT frames; every complete INDEX/BODY pair or DELETE
+               counts as committed
+Versions 1-3 always use PBKDF2-SHA256 with 200,000 iterations and JSON
+payloads; versions 1-4 are never compressed.
+"""
+
+import json
+import struct
+
+
+MAGIC = b"PVLT"
+
+LEGACY_VERSION = 1
+FORMAT_VERSION = 6
+SUPPORTED_VERSIONS = (2, 3, 4, 5, 6)
+
+# First version with INDEX/BODY frames (lazy loading needs them)
+INDEX_FRAMES_VERSION = 3
+
+# First version whose saves are grouped by COMMIT frames
+COMMIT_FRAMES_VERSION = 6
+
+OP_PUT = 1  # version 2 only
+OP_DELETE = 2
+OP_INDEX = 3
+OP_BODY = 4
+OP_COMMIT = 5
+
+OPS = (OP_PUT, OP_DELETE, OP_INDEX, OP_BODY, OP_COMMIT)
+
+SALT_SIZE = 16
+RECORD_ID_SIZE = 16
+COMMIT_RECORD_ID = bytes(RECORD_ID_SIZE)
+KEY_CHECK_SIZE = 12 + 16  # nonce + tag, no ciphertext
+
+PREFIX = struct.Struct(">4sB")
+SETTINGS_LENGTH = struct.Struct(">H")
+FIXED_HEADER = struct.Struct(">4sB16s")  # versions 2 and 3
+FRAME_HEADER = struct.Struct(">B16sI")
+
+# Enough bytes to work out the full header size with header_size()
+PREFIX_SIZE = PREFIX.size + SETTINGS_LENGTH.size
+
+# What versions 1-3 implicitly used
+LEGACY_KDF = {"algorithm": "pbkdf2-sha256", "iterations": 200_000}
+LEGACY_ENCODING = "json"
+
+
+def is_record_format(blob: bytes) -> bool:
+    return blob[:len(MAGIC)] == MAGIC
+
+
+def pack_header(salt: bytes, kdf: dict, encoding: str, compression: dict = None) -> bytes:
+    """
+    Header bytes without the key check (they are its associated data).
+    """
+
+    settings = json.dumps(
+        {"salt": salt.hex(), "kdf": kdf, "encoding": encoding, "compression": compression},
+        sort_keys=True, separators=(",", ":")
+    ).encode("utf-8")
+
+    return PREFIX.pack(MAGIC, FORMAT_VERSION) + SETTINGS_LENGTH.pack(len(settings)) + settings
+
+
+def header_size(prefix: bytes) -> int:
+    """
+    Total header size (including the key check), from the first
+    PREFIX_SIZE bytes of the file.
+    """
+
+    if len(prefix) < PREFIX_SIZE:
+        raise ValueError("Vault file is truncated.")
+
+    magic, version = PREFIX.unpack_from(prefix, 0)
+
+    if magic != MAGIC:
+        raise ValueError("Not a record-format vault file.")
+
+    if version not in SUPPORTED_VERSIONS:
+        raise ValueError(f"Unsupported vault format version: {version}")
+
+    if version < 4:
+        return FIXED_HEADER.size + KEY_CHECK_SIZE
+
+    (length,) = SETTINGS_LENGTH.unpack_from(prefix, PREFIX.size)
+    return PREFIX_SIZE + length + KEY_CHECK_SIZE
+
+
+def read_header(blob: bytes) -> dict:
+    """
+    Parse the file header.
+    Returns a dict with: version, salt, kdf, encoding, compression,
+    header (the bytes authenticated by the key check), key_check and
+    offset (first frame).
+    """
+
+    offset = header_size(blob[:PREFIX_SIZE])
+
+    if len(blob) < offset:
+        raise ValueError("Vault file is truncated.")
+
+    version = blob[len(MAGIC)]
+    header_end = offset - KEY_CHECK_SIZE
+
+    if version < 4:
+        salt = bytes(blob[FIXED_HEADER.size - SALT_SIZE:FIXED_HEADER.size])
+        kdf = dict(LEGACY_KDF)
+        encoding = LEGACY_ENCODING
+        compression = None
+    else:
+        try:
+            settings = json.loads(bytes(blob[PREFIX_SIZE:header_end]).decode("utf-8"))
+            salt = bytes.fromhex(settings["salt"])
+            kdf = settings["kdf"]
+            encoding = settings["encoding"]
+            compression = settings.get("compression") if version >= 5 else None
+        except (ValueError, KeyError, TypeError):
+            raise ValueError("Vault header is corrupted.")
+
+    return {
+        "version": version,
+        "salt": salt,
+        "kdf": kdf,
+        "encoding": encoding,
+        "compression": compression,
+        "header": bytes(blob[:header_end]),
+        "key_check": bytes(blob[header_end:offset]),
+        "offset": offset,
+    }
+
+
+def frame_associated_data(op: int, record_id: bytes) -> bytes:
+    """
+    Binds a sealed payload to its op and record id.
+    """
+
+    return bytes([op]) + record_id
+
+
+def pack_frame(op: int, record_id: bytes, sealed: bytes) -> bytes:
+    return FRAME_HEADER.pack(op, record_id, len(sealed)) + sealed
+
+
+def pack_commit() -> bytes:
+    return FRAME_HEADER.pack(OP_COMMIT, COMMIT_RECORD_ID, 0)
+
+
+def iter_frames(blob: bytes, offset: int):
+    """
+    Walk the frames after the header.
+    Yields: (op, record id, payload start, payload end)
+
+    Stops at the first incomplete frame (e.g. a torn write at the end of
+    the file); the caller can compare the last payload end with the file
+    size to detect it.
+    """
+
+    size = len(blob)
+
+    while offset + FRAME_HEADER.size <= size:
+        op, record_id, length = FRAME_HEADER.unpack_from(blob, offset)
+        start = offset + FRAME_HEADER.size
+        end = start + length
+
+        if end > size or op not in OPS:
+            return
+
+        yield op, record_id, start, end
+        offset = end
+
+
+def iter_file_frames(f, offset: int):
+    """
+    Same as iter_frames() but reads only frame headers from an open file,
+    seeking over payloads. The file is positioned at the payload start
+    while the caller handles each frame, so it may read the payload.
+    """
+
+    f.seek(0, 2)
+    size = f.tell()
+
+    while offset + FRAME_HEADER.size <= size:
+        f.seek(offset)
+        op, record_id, length = FRAME_HEADER.unpack(f.read(FRAME_HEADER.size))
+        start = offset + FRAME_HEADER.size
+        end = start + length
+
+        if end > size or op not in OPS:
+            return
+
+        yield op, record_id, start, end
+        offset = end
+
+
+def replay(frames, version: int = FORMAT_VERSION):
+    """
+    Fold a frame stream into the live records.
+    Returns: (live, stale frame count, end of the last committed change)
+
+    live maps record id -> (index span, body span) in file order, where a
+    span is (payload start, payload end). For version 2 PUT frames the
+    index span is None and the body span covers the whole account.
+
+    From COMMIT_FRAMES_VERSION on, changes only take effect at the COMMIT
+    frame that closes their group; a trailing group without one is dropped.
+
+    Stale frames are those of committed changes that a later change made
+    unnecessary: superseded INDEX/BODY pairs, deletes, and every COMMIT
+    frame but the last. The dropped trailing group isn't counted; the
+    next save overwrites it.
+    """
+
+    grouped = version >= COMMIT_FRAMES_VERSION
+
+    live = {}
+    frames_seen = 0
+    committed = 0  # frames up to the last committed change
+    complete_end = None
+    pending = None  # INDEX frame waiting for its BODY
+    group = []  # (record id, spans or None for a delete) awaiting COMMIT
+
+    for op, record_id, start, end in frames:
+        frames_seen += 1
+
+        if op == OP_INDEX:
+            pending = (record_id, (start, end))
+            continue
+
+        if op == OP_BODY:
+            if pending is None or pending[0] != record_id:
+                pending = None
+                continue
+
+            group.append((record_id, (pending[1], (start, end))))
+            pending = None
+        elif op == OP_PUT:
+            group.append((record_id, (None, (start, end))))
+        elif op == OP_DELETE:
+            group.append((record_id, None))
+
+        if grouped and op != OP_COMMIT:
+            continue
+
+        for changed_id, spans in group:
+            if spans is None:
+                live.pop(changed_id, None)
+            else:
+                live[changed_id] = spans
+
+        group = []
+        pending = None
+        complete_end = end
+        committed = frames_seen
+
+    needed = sum(1 if index is None else 2 for index, _ in live.values())
+
+    if grouped and complete_end is not None:
+        needed += 1  # the COMMIT closing the last group
+
+    return live, committed - needed, complete_end